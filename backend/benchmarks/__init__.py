@@ -0,0 +1 @@
+"""Micro-benchmarks for backend hot paths (run with python -m benchmarks.<name>)."""
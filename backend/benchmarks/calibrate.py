@@ -0,0 +1,52 @@
+"""
+Calibration sweep benchmark: OutfitTable + sweep vs. score_outfit per (config, outfit).
+
+Usage: python -m benchmarks.calibrate --outfits 100000 --configs 1000 (from backend directory)
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scoring import score_outfit, load_config
+from scoring.calibrate import SEARCH_SPACE, OutfitTable, random_configs, random_outfits, sweep
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--outfits", type=int, default=100_000)
+    ap.add_argument("--configs", type=int, default=1000)
+    args = ap.parse_args()
+
+    base = load_config()
+    features = random_outfits(args.outfits)
+    labels = np.random.default_rng(0).uniform(1, 5, args.outfits)
+    configs = random_configs(base, SEARCH_SPACE, args.configs)
+
+    t0 = time.perf_counter()
+    table = OutfitTable(features)
+    prep = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    sweep(table, labels, configs)
+    per_cfg = (time.perf_counter() - t0) / args.configs
+
+    t0 = time.perf_counter()
+    for f in features[:2000]:
+        score_outfit(f, base)
+    naive = (time.perf_counter() - t0) / 2000 * args.outfits
+
+    print(f"{args.outfits} outfits, {args.configs} random configs (all thresholds distinct)")
+    print(f"  table prep        : {prep:8.1f} s (once)")
+    print(f"  sweep             : {per_cfg * 1e3:8.1f} ms/config")
+    print(f"  score_outfit loop : {naive * 1e3:8.1f} ms/config  ({naive / per_cfg:.0f}x)")
+    print(f"  10k configs       : {(prep + 1e4 * per_cfg) / 60:6.1f} min vs {1e4 * naive / 3600:.1f} h")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Color index benchmark: LabColorIndex radius / k-NN queries vs. a full ΔE00 scan.
+
+Usage: python -m benchmarks.color_index --items 300000 --queries 50 (from backend directory)
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scoring import LabColorIndex
+from scoring.color_distance import delta_e_00_matrix
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, default=300_000)
+    ap.add_argument("--queries", type=int, default=50)
+    ap.add_argument("--margin", type=float, default=None)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    labs = np.c_[rng.uniform(5, 95, args.items), rng.normal(0, 30, args.items), rng.normal(5, 30, args.items)]
+    queries = np.c_[rng.uniform(10, 90, args.queries), rng.normal(0, 30, args.queries), rng.normal(0, 30, args.queries)]
+
+    index = LabColorIndex() if args.margin is None else LabColorIndex(margin=args.margin)
+    t0 = time.perf_counter()
+    index.bulk_load(range(args.items), labs)
+    print(f"{args.items} items, bulk_load {1e3 * (time.perf_counter() - t0):.0f} ms")
+
+    t0 = time.perf_counter()
+    for q in queries[:5]:
+        delta_e_00_matrix(q, labs)
+    scan = (time.perf_counter() - t0) / 5 * 1e3
+    print(f"  full scan        : {scan:8.1f} ms/query")
+
+    for r in (5.0, 10.0, 18.0):
+        t0 = time.perf_counter()
+        for q in queries:
+            index.radius(q, r)
+        ms = (time.perf_counter() - t0) / args.queries * 1e3
+        print(f"  radius(ΔE {r:4.1f}) : {ms:8.1f} ms/query  ({scan / ms:.1f}x)")
+
+    t0 = time.perf_counter()
+    for q in queries:
+        index.knn(q, 10)
+    ms = (time.perf_counter() - t0) / args.queries * 1e3
+    print(f"  knn(10)          : {ms:8.1f} ms/query  ({scan / ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+sRGB → LAB benchmark: preprocess.color_lab vs. the float64 reference conversion.
+
+Usage: python -m benchmarks.color_lab --width 640 --height 480 (from backend directory)
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from preprocess.color_lab import srgb_to_lab, srgb_to_lab_reference
+
+
+def _ms(fn, reps: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - t0) / reps * 1e3
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--width", type=int, default=640)
+    ap.add_argument("--height", type=int, default=480)
+    ap.add_argument("--reps", type=int, default=20)
+    args = ap.parse_args()
+
+    frame = np.random.default_rng(0).integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    out = np.empty(frame.shape, dtype=np.float32)
+    ref = srgb_to_lab_reference(frame)
+
+    base = _ms(lambda: srgb_to_lab_reference(frame), args.reps)
+    print(f"{args.width}x{args.height} frame")
+    print(f"  reference float64 : {base:7.2f} ms")
+    for name, bits in (("exact float32", None), ("lut_bits=6", 6), ("lut_bits=7", 7)):
+        ms = _ms(lambda: srgb_to_lab(frame, out, lut_bits=bits), args.reps)
+        err = np.linalg.norm(out - ref, axis=-1)
+        print(f"  {name:17} : {ms:7.2f} ms  ({base / ms:.1f}x)  max ΔE76 {err.max():.4f}")
+
+
+if __name__ == "__main__":
+    main()
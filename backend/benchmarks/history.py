@@ -0,0 +1,78 @@
+"""
+Score history benchmark: bulk ingest rate and query latency at N rows.
+
+Usage: python -m benchmarks.history --rows 10000000 (from backend directory)
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scoring import load_config, score_outfit
+from scoring.calibrate import random_outfits
+from services.history import HistoryStore
+
+
+def _rows(n: int, versions: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    t0 = time.time() - 365 * 86400.0
+    for start in range(0, n, 100_000):
+        m = min(100_000, n - start)
+        ts = t0 + (start + np.arange(m)) * (365 * 86400.0 / n)   # one year, in insertion order
+        score = np.round(np.clip(rng.normal(62, 12, m), 0, 100), 1)
+        subs = rng.uniform(0, 1, (m, 6))
+        lab = rng.uniform(-40, 80, (m, 3))
+        ver = rng.integers(0, versions, m)
+        for i in range(m):
+            yield (float(ts[i]), f"1.{ver[i]}.0", f"{start + i:032x}", None, float(score[i]),
+                   *map(float, subs[i]), *map(float, lab[i]))
+
+
+def _timed(fn, repeat: int = 20) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000.0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--versions", type=int, default=3)
+    ap.add_argument("--db", type=Path, default=None, help="database path (default: temp dir)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(args.db or Path(tmp) / "history.sqlite3")
+        t0 = time.perf_counter()
+        n = store.bulk_insert(_rows(args.rows, args.versions))
+        ingest = time.perf_counter() - t0
+        print(f"bulk_insert: {n} rows in {ingest:.1f}s ({n / ingest:,.0f} rows/s)")
+
+        now = time.time()
+        print(f"top(10):                 {_timed(lambda: store.top('1.0.0', 10)):.2f} ms")
+        print(f"score_range(90, 92, 100): {_timed(lambda: store.score_range(90.0, 92.0, '1.0.0', 100)):.2f} ms")
+        print(f"time_range(last day):    {_timed(lambda: store.time_range(now - 86400.0, limit=1000)):.2f} ms")
+        print(f"recent(1000):            {_timed(lambda: store.recent('1.0.0', 1000)):.2f} ms")
+
+        cfg = load_config()
+        scored = [(f, score_outfit(f, cfg)) for f in random_outfits(10_000)]
+        t0 = time.perf_counter()
+        for f, r in scored:
+            store.add(f, r)
+        per_add = (time.perf_counter() - t0) / len(scored) * 1e6
+        store.flush()
+        print(f"add (request path): {per_add:.1f} µs/row; writer: {store.metrics()}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+What-if rescoring benchmark: ScoringSession.apply vs. full score_outfit.
+
+Usage: python -m benchmarks.rescoring --garments 12 --edits 2000 (from backend directory)
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scoring import score_outfit, load_config, ScoringSession, OutfitFeatures
+
+
+def _outfit(n: int, rng: random.Random) -> OutfitFeatures:
+    types = ["top", "bottom", "outer", "accessory", "accessory"]
+    materials = ["denim", "cotton", "wool", "knit", "leather", "satin", "silk", "synthetic"]
+    return {
+        "outfitId": "bench",
+        "garments": [
+            {
+                "id": f"g{i}", "type": types[i % len(types)], "areaPct": 0.1,
+                "colorLAB": (rng.uniform(20, 80), rng.uniform(-30, 30), rng.uniform(-30, 30)),
+                "material": rng.choice(materials), "patternType": rng.choice(["none", "plaid", "stripe"]),
+                "patternStrength": rng.random(), "glossIndex": rng.random(),
+            }
+            for i in range(n)
+        ],
+        "colorClusters": [
+            {"lab": (60, -5, -7), "pct": 0.5}, {"lab": (48, 2, 4), "pct": 0.3}, {"lab": (70, -6, -10), "pct": 0.2},
+        ],
+        "thirdsArea": {"top": 0.35, "mid": 0.30, "bottom": 0.35},
+        "domainZ": {"skin": 0.2, "hue": 1.4, "texture": 0.5, "pattern": 0.1},
+        "extractionVersion": "bench",
+        "body": None,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--garments", type=int, default=12)
+    ap.add_argument("--edits", type=int, default=2000)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    cfg = load_config()
+    features = _outfit(args.garments, rng)
+    session = ScoringSession(features, cfg)
+    edits = [
+        {"op": "updateGarment", "id": f"g{rng.randrange(args.garments)}",
+         "fields": {"colorLAB": (rng.uniform(20, 80), rng.uniform(-30, 30), rng.uniform(-30, 30))}}
+        for _ in range(args.edits)
+    ]
+
+    t0 = time.perf_counter()
+    for op in edits:
+        session.apply([op])
+    inc = (time.perf_counter() - t0) / args.edits * 1e6
+
+    t0 = time.perf_counter()
+    for op in edits:
+        g = next(g for g in features["garments"] if g["id"] == op["id"])
+        g.update(op["fields"])
+        score_outfit(features, cfg)
+    full = (time.perf_counter() - t0) / args.edits * 1e6
+
+    print(f"{args.garments} garments, {args.edits} single-garment recolors")
+    print(f"  full score_outfit : {full:8.1f} us/edit")
+    print(f"  session.apply     : {inc:8.1f} us/edit  ({full / inc:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
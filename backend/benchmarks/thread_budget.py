@@ -0,0 +1,103 @@
+"""
+Thread budget benchmark: library defaults vs. config/threads.py budget.
+
+Runs N concurrent synthetic mirror sessions (OpenCV blur/resize + a small
+torch conv stack standing in for the detector) and reports per-frame latency.
+Each mode runs in a fresh subprocess because thread pools are process-global.
+
+Usage: python -m benchmarks.thread_budget --sessions 2 --frames 60 (from backend directory)
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+
+def _session(frames: int, out: list[float]) -> None:
+    import cv2
+    try:
+        import torch
+        net = torch.nn.Sequential(
+            torch.nn.Conv2d(3, 16, 3, stride=2, padding=1), torch.nn.ReLU(),
+            torch.nn.Conv2d(16, 32, 3, stride=2, padding=1), torch.nn.ReLU(),
+            torch.nn.Conv2d(32, 64, 3, stride=2, padding=1),
+        ).eval()
+    except ImportError:
+        torch, net = None, None
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (360, 640, 3), dtype=np.uint8)
+    for _ in range(frames):
+        t0 = time.perf_counter()
+        blurred = cv2.GaussianBlur(frame, (31, 31), 0)
+        det_in = cv2.resize(blurred, (416, 416))
+        if net is not None:
+            with torch.no_grad():
+                x = torch.from_numpy(det_in).permute(2, 0, 1)[None].float() / 255.0
+                net(x)
+        else:
+            det_in.astype(np.float32).reshape(-1, 3) @ rng.random((3, 64), dtype=np.float32)
+        out.append((time.perf_counter() - t0) * 1000.0)
+
+
+def run(mode: str, sessions: int, frames: int) -> dict:
+    from config.threads import apply_thread_budget, plan_thread_budget, thread_report
+
+    if mode == "budget":
+        report = apply_thread_budget(plan_thread_budget(sessions=sessions))
+    else:
+        report = thread_report()
+
+    lat: list[float] = []
+    threads = [threading.Thread(target=_session, args=(frames, lat)) for _ in range(sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    arr = np.array(lat)
+    return {
+        "mode": mode,
+        "p50_ms": round(float(np.percentile(arr, 50)), 2),
+        "p95_ms": round(float(np.percentile(arr, 95)), 2),
+        "fps_total": round(len(arr) / wall, 1),
+        "threads": {k: report[k] for k in ("torch_intra", "torch_interop", "opencv")},
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=2)
+    ap.add_argument("--frames", type=int, default=60)
+    ap.add_argument("--mode", choices=["default", "budget"], help="internal: run one mode in-process")
+    args = ap.parse_args()
+
+    if args.mode:
+        print(json.dumps(run(args.mode, args.sessions, args.frames)))
+        return
+
+    print(f"{args.sessions} sessions x {args.frames} frames")
+    for mode in ("default", "budget"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.thread_budget", "--mode", mode,
+             "--sessions", str(args.sessions), "--frames", str(args.frames)],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent.parent,
+        )
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"  {mode:8s} p50={r['p50_ms']:7.2f}ms  p95={r['p95_ms']:7.2f}ms  "
+              f"total={r['fps_total']:6.1f} fps  threads={r['threads']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,60 @@ MAIN_WIN = "Smart Mirror (MVP)"
 # Model
 MODEL_PATH = Path("backend/models/yolov8n.pt")  # <-- update if needed
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
-IMGSZ = 960        # YOLO inference size (try 640/768/960/1280)
+IMGSZ = 960        # YOLO inference size (pick from python -m detection.evaluate)
 CONF_THRESH = 0.25 # detection confidence
 
+# Resolution cascade (see detection/cascade.py): detect at CASCADE_LOW_IMGSZ, re-run at
+# IMGSZ when nothing is found / top score < CASCADE_MIN_TOP_CONF / every N frames
+CASCADE_ENABLED = True
+CASCADE_LOW_IMGSZ = 416
+CASCADE_MIN_TOP_CONF = 0.5
+CASCADE_REFRESH_EVERY = 30
+
+# Detection input: "blur" = whole frame with blurred background,
+# "roi" = crop to the padded person mask and detect at ROI_IMGSZ (see preprocess/person_roi.py)
+DETECT_MODE = "blur"
+ROI_IMGSZ = 640
+ROI_PAD = 0.08     # padding per side, fraction of the person box
+
 # Background
 BG_BLUR_KSIZE = (55, 55)
 
+# Style score percentile ranks (scoring/percentile.py), snapshotted every N scores and at exit
+SCORE_RANKS_PATH = Path("backend/data/score_ranks.json")
+SCORE_RANKS_SNAPSHOT_EVERY = 1000
+
+# Scored outfit history (SQLite, see services/history.py); writes are batched on a background thread
+HISTORY_PATH = Path("backend/data/history.sqlite3")
+
+# Segmentation emits (opt-in compact/delta protocol)
+SEG_DELTA_TOLERANCE_PX = 4   # bbox movement below this is not re-sent
+SEG_KEYFRAME_EVERY = 30      # full keyframe after this many deltas
+SEG_MASK_MAX_SIDE = 64       # per-item RLE masks (opt-in) are downsampled to this longer side
+
+# Capture hints (server-driven client frame size/quality/fps)
+CAPTURE_TARGET_MS = 90.0                       # per-frame processing budget
+CAPTURE_WIDTHS = (320, 480, 640, 800, 960)     # width ladder the client steps along
+CAPTURE_START_WIDTH = 640
+CAPTURE_QUALITY_RANGE = (0.6, 0.85)            # WebP quality at no / full headroom
+CAPTURE_MAX_FPS = 30
+
+# Server-wide degradation ladder (see services/degrade.py): full → no blur → low-res
+# detection → detect every 3rd frame → refuse new sessions, driven by slot wait + frame latency
+DEGRADE_ENABLED = True
+DEGRADE_TARGET_MS = 150.0
+DEGRADE_MAX_CONCURRENT = 2     # frames processed at once across sessions
+DEGRADE_MAX_WAIT_MS = 500.0    # frames waiting longer for a slot are dropped
+DEGRADE_IDLE_S = 5.0           # no frames for this long: step one level back up (so "shed" can recover)
+
+# CPU thread budget (see config/threads.py)
+THREADS_EXPECTED_SESSIONS = 2  # concurrent mirror sessions to size pools for
+THREADS_AI_WORKERS = 3         # AIClient pool (I/O bound VLM calls)
+THREADS_PIN_AFFINITY = False   # pin pipeline / AI stages to disjoint CPUs (Linux)
+
+# Pattern VLM calls (hedged at p90, see services/hedge.py)
+VLM_BUDGET_MS = 8000           # latency budget per analyze_patterns batch
+
 # Keys
 KEY_QUIT = ("q", 27)   # q or ESC
 KEY_RESET = "r"
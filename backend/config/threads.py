@@ -0,0 +1,146 @@
+"""
+CPU thread budget for the backend process.
+
+Torch intra/inter-op pools, OpenCV's internal pool and the AIClient worker
+pool all share one process; left at their defaults each sizes itself to the
+whole machine and concurrent mirror sessions oversubscribe the cores. The
+budget splits the available CPUs between them once at startup and can pin
+pipeline stages to disjoint CPU sets.
+
+Pinning is per thread: `pin_stage` binds only the calling thread, so it
+bounds work that runs on that thread (the frame handler, the AI workers).
+MediaPipe exposes no thread knob in its Python solutions API, and its
+calculator threads are created with the graph at startup, keeping the
+affinity they had then; they are not bounded by the "pipeline" stage.
+"""
+
+from __future__ import annotations
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass
+class ThreadBudget:
+    torch_intra: int
+    torch_interop: int
+    opencv: int
+    ai_workers: int
+    # stage name ("pipeline", "ai") → CPU ids; empty means no pinning
+    affinity: Dict[str, Tuple[int, ...]] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "torch_intra": self.torch_intra,
+            "torch_interop": self.torch_interop,
+            "opencv": self.opencv,
+            "ai_workers": self.ai_workers,
+            "affinity": {k: list(v) for k, v in self.affinity.items()},
+        }
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (affinity-aware where supported)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def plan_thread_budget(
+    n_cpus: Optional[int] = None,
+    sessions: int = 1,
+    ai_workers: int = 3,
+    pin: bool = False,
+) -> ThreadBudget:
+    """
+    Split `n_cpus` between the libraries for `sessions` concurrent frame pipelines.
+
+    Detection gets half the cores, OpenCV a quarter, shared across sessions;
+    the AIClient pool is I/O bound (remote VLM calls) and keeps its own size.
+    With `pin`, the pipeline stage gets all but one core and the AI workers the last.
+    """
+    n = n_cpus if n_cpus is not None else available_cpus()
+    s = max(1, sessions)
+    budget = ThreadBudget(
+        torch_intra=max(1, (n // 2) // s),
+        torch_interop=1,
+        opencv=max(1, (n // 4) // s),
+        ai_workers=ai_workers,
+    )
+    if pin and n >= 2:
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(n))
+        budget.affinity = {"pipeline": tuple(cpus[:-1]), "ai": (cpus[-1],)}
+    return budget
+
+
+_active: Optional[ThreadBudget] = None
+_pinned = threading.local()
+
+
+def apply_thread_budget(budget: ThreadBudget) -> Dict[str, Any]:
+    """Apply the budget to torch and OpenCV (call once at startup). Returns `thread_report()`."""
+    global _active
+    _active = budget
+
+    try:
+        import torch
+        torch.set_num_threads(budget.torch_intra)
+        try:
+            torch.set_num_interop_threads(budget.torch_interop)
+        except RuntimeError:
+            pass  # inter-op pool already started; can only be set once per process
+    except ImportError:
+        pass
+
+    try:
+        import cv2
+        cv2.setNumThreads(budget.opencv)
+    except ImportError:
+        pass
+
+    return thread_report()
+
+
+def pin_stage(stage: str) -> None:
+    """Pin the calling thread to the CPUs configured for `stage` (once per thread)."""
+    if _active is None or not hasattr(os, "sched_setaffinity"):
+        return
+    cpus = _active.affinity.get(stage)
+    if not cpus or getattr(_pinned, "stage", None) == stage:
+        return
+    os.sched_setaffinity(0, cpus)  # 0 = calling thread on Linux
+    _pinned.stage = stage
+
+
+def thread_report() -> Dict[str, Any]:
+    """How threads are actually allocated right now (read back from each library)."""
+    report: Dict[str, Any] = {
+        "cpus": available_cpus(),
+        "budget": _active.to_dict() if _active is not None else None,
+    }
+    try:
+        import torch
+        report["torch_intra"] = torch.get_num_threads()
+        report["torch_interop"] = torch.get_num_interop_threads()
+    except ImportError:
+        report["torch_intra"] = report["torch_interop"] = None
+    try:
+        import cv2
+        report["opencv"] = cv2.getNumThreads()
+    except ImportError:
+        report["opencv"] = None
+    report["process_threads"] = threading.active_count()
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"[threads] cpus={report['cpus']} python_threads={report['process_threads']}"]
+    lines.append(
+        f"[threads] torch intra={report['torch_intra']} interop={report['torch_interop']}"
+        f" | opencv={report['opencv']}"
+    )
+    b = report.get("budget")
+    if b:
+        lines.append(f"[threads] ai_workers={b['ai_workers']} affinity={b['affinity'] or 'none'}")
+    return "\n".join(lines)
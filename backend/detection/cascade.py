@@ -0,0 +1,79 @@
+"""
+Multi-resolution detection cascade.
+
+Most mirror frames are easy: one person, large garments. The cascade runs the
+detector at a low inference size first and only re-runs at full size when the
+cheap pass looks unreliable (nothing found, or the best confidence is low), or
+every `refresh_every` frames so a session periodically gets a full-accuracy
+pass. Refresh frames skip the low pass entirely.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from .results import Detections
+
+
+@dataclass
+class CascadeConfig:
+    low_imgsz: int = 416
+    high_imgsz: int = 960
+    min_top_conf: float = 0.5  # escalate when the best low-res score is below this
+    refresh_every: int = 30    # full-size pass every N frames; 0 disables
+
+
+class CascadeState:
+    """Per-session frame counter and pass statistics."""
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.low_only = 0
+        self.escalations: Dict[str, int] = {"empty": 0, "low_conf": 0, "refresh": 0}
+
+    def next_frame(self, cfg: CascadeConfig) -> bool:
+        """Advance the counter; True when this frame is a scheduled full-size refresh."""
+        refresh = cfg.refresh_every > 0 and self.frames % cfg.refresh_every == 0
+        self.frames += 1
+        return refresh
+
+    def record(self, dets: Detections) -> None:
+        if dets.escalated is None:
+            self.low_only += 1
+        else:
+            self.escalations[dets.escalated] = self.escalations.get(dets.escalated, 0) + 1
+
+    def metrics(self) -> Dict[str, object]:
+        return {"frames": self.frames, "lowOnly": self.low_only, "escalations": dict(self.escalations)}
+
+
+def escalation_reason(dets: Detections, cfg: CascadeConfig) -> Optional[str]:
+    """Why a low-resolution result should be re-run at full size, or None to keep it."""
+    if len(dets) == 0:
+        return "empty"
+    if float(dets.scores.max()) < cfg.min_top_conf:
+        return "low_conf"
+    return None
+
+
+def run_cascade(
+    predict: Callable[[np.ndarray, int], Detections],
+    image: np.ndarray,
+    cfg: CascadeConfig,
+    state: Optional[CascadeState] = None,
+) -> Detections:
+    """Drive `predict(image, imgsz)` through the cascade; the result records its imgsz and escalation."""
+    if state is not None and state.next_frame(cfg):
+        dets = predict(image, cfg.high_imgsz)
+        dets.escalated = "refresh"
+    else:
+        dets = predict(image, cfg.low_imgsz)
+        reason = escalation_reason(dets, cfg)
+        if reason is not None:
+            dets = predict(image, cfg.high_imgsz)
+            dets.escalated = reason
+    if state is not None:
+        state.record(dets)
+    return dets
@@ -0,0 +1,386 @@
+"""
+Detector accuracy-vs-latency evaluation on a DeepFashion2 validation subset.
+
+Streams `<root>/image/*.jpg` with their `<root>/annos/*.json` through
+`YoloClothesDetector` for every combination of
+
+    backend (pt / onnx / openvino / engine ...) × quantization (fp32 / fp16 / int8)
+    × imgsz × conf
+
+and reports mAP@0.5, per-class recall and per-image latency percentiles, with
+the Pareto frontier (lowest latency for a given mAP) marked.
+
+Inference runs once per (backend, quant, imgsz) at the lowest conf in the
+matrix. Greedy matching visits detections in descending score order, so the
+matches for a higher conf are exactly the matches of the surviving detections:
+every conf is evaluated by thresholding the same run. Detection latency hardly
+depends on conf (NMS only), so each conf shares the measured latencies.
+
+Images are fed as RGB, like the live pipeline (server.segment_frame).
+
+Usage (from backend directory):
+    python -m detection.evaluate ../datasets/deepfashion2/validation \\
+        --weights models/best.pt --imgsz 416 640 960 --conf 0.25 0.4 \\
+        --backend pt onnx --quant fp32 fp16 --limit 500 --out eval_report
+"""
+
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import random
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .results import Detections
+
+# DeepFashion2 category_id 1..13, in order (see datasets/README.md)
+DF2_CATEGORIES = (
+    "short_sleeve_top", "long_sleeve_top", "short_sleeve_outwear", "long_sleeve_outwear",
+    "vest", "sling", "shorts", "trousers", "skirt",
+    "short_sleeve_dress", "long_sleeve_dress", "vest_dress", "sling_dress",
+)
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+@dataclass(frozen=True)
+class EvalSetting:
+    imgsz: int
+    conf: float
+    backend: str = "pt"
+    quant: str = "fp32"
+
+    def key(self) -> str:
+        return f"{self.backend}-{self.quant}-{self.imgsz}-c{self.conf:g}"
+
+
+@dataclass
+class EvalResult:
+    setting: EvalSetting
+    images: int
+    map50: float
+    recall: Dict[str, float]          # per class, at setting.conf
+    latency_ms: Dict[str, float]      # mean, p50, p90, p99
+    pareto: bool = False
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "setting": self.setting.__dict__, "key": self.setting.key(), "images": self.images,
+            "map50": self.map50, "recall": self.recall, "latency_ms": self.latency_ms, "pareto": self.pareto,
+        }
+
+
+# ---------------------------------------------------------------- dataset
+
+def iter_deepfashion2(
+    root: str | Path, limit: Optional[int] = None, seed: int = 0,
+) -> Iterator[Tuple[Path, np.ndarray, np.ndarray]]:
+    """
+    Yield (image_path, gt_boxes (n, 4) float32 xyxy, gt_classes (n,) int64 0-based category)
+    for a split directory laid out as `image/` + `annos/`. With `limit`, a
+    seeded random subset of that size (stable across runs) is streamed.
+    """
+    root = Path(root)
+    annos = sorted((root / "annos").glob("*.json"))
+    if limit is not None and limit < len(annos):
+        annos = sorted(random.Random(seed).sample(annos, limit))
+    for anno in annos:
+        with open(anno, "r") as f:
+            data = json.load(f)
+        boxes, classes = [], []
+        for key, item in data.items():
+            if not key.startswith("item") or not isinstance(item, dict):
+                continue
+            boxes.append(item["bounding_box"])
+            classes.append(int(item["category_id"]) - 1)
+        yield (
+            root / "image" / (anno.stem + ".jpg"),
+            np.array(boxes, dtype=np.float32).reshape(-1, 4),
+            np.array(classes, dtype=np.int64),
+        )
+
+
+def class_mapping(class_names: Any, categories: Sequence[str] = DF2_CATEGORIES) -> np.ndarray:
+    """
+    Model class id → dataset category index (-1 = not a dataset class), matched
+    by normalized name; models whose names match none fall back to id == index.
+    """
+    names = dict(class_names) if isinstance(class_names, dict) else dict(enumerate(class_names))
+    n = (max(int(k) for k in names) + 1) if names else 0
+    norm = {c.lower().replace(" ", "_").replace("-", "_"): i for i, c in enumerate(categories)}
+    table = np.full(n, -1, dtype=np.int64)
+    for k, v in names.items():
+        table[int(k)] = norm.get(str(v).lower().replace(" ", "_").replace("-", "_"), -1)
+    if n and (table < 0).all():
+        table = np.where(np.arange(n) < len(categories), np.arange(n), -1)
+    return table
+
+
+def map_classes(class_map: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """Apply a class_mapping table; ids outside it map to -1."""
+    out = np.full(ids.shape, -1, dtype=np.int64)
+    valid = (ids >= 0) & (ids < len(class_map))
+    out[valid] = class_map[ids[valid]]
+    return out
+
+
+# ---------------------------------------------------------------- metrics
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """(N, 4) × (M, 4) xyxy → (N, M) IoU."""
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-12), 0.0)
+
+
+def match_detections(
+    boxes: np.ndarray, classes: np.ndarray, scores: np.ndarray,
+    gt_boxes: np.ndarray, gt_classes: np.ndarray, iou_thresh: float = 0.5,
+) -> np.ndarray:
+    """Greedy per-class matching (highest score first, each GT at most once) → TP flag per detection."""
+    tp = np.zeros(len(scores), dtype=bool)
+    if len(scores) == 0 or len(gt_boxes) == 0:
+        return tp
+    iou = box_iou(boxes, gt_boxes)
+    iou[classes[:, None] != gt_classes[None, :]] = -1.0
+    taken = np.zeros(len(gt_boxes), dtype=bool)
+    for i in np.argsort(-scores, kind="stable"):
+        cand = np.where(taken, -1.0, iou[i])
+        j = int(np.argmax(cand))
+        if cand[j] >= iou_thresh:
+            taken[j] = True
+            tp[i] = True
+    return tp
+
+
+def average_precision(scores: np.ndarray, tp: np.ndarray, n_gt: int) -> float:
+    """COCO-style 101-point interpolated AP for one class."""
+    if n_gt == 0:
+        return float("nan")
+    if len(scores) == 0:
+        return 0.0
+    order = np.argsort(-scores, kind="stable")
+    hits = np.cumsum(tp[order])
+    recall = hits / n_gt
+    precision = hits / np.arange(1, len(order) + 1)
+    precision = np.maximum.accumulate(precision[::-1])[::-1]  # monotone envelope
+    idx = np.searchsorted(recall, np.linspace(0.0, 1.0, 101), side="left")
+    return float(np.where(idx < len(precision), precision[np.minimum(idx, len(precision) - 1)], 0.0).mean())
+
+
+def latency_summary(ms: Sequence[float]) -> Dict[str, float]:
+    arr = np.asarray(ms, dtype=np.float64)
+    if arr.size == 0:
+        return {"mean": float("nan"), **{f"p{p}": float("nan") for p in LATENCY_PERCENTILES}}
+    out = {"mean": round(float(arr.mean()), 3)}
+    for p in LATENCY_PERCENTILES:
+        out[f"p{p}"] = round(float(np.percentile(arr, p)), 3)
+    return out
+
+
+class MatchAccumulator:
+    """Per-detection (class, score, TP) records and GT counts for one inference run."""
+
+    def __init__(self, n_classes: int) -> None:
+        self.n_classes = n_classes
+        self.n_gt = np.zeros(n_classes, dtype=np.int64)
+        self._classes: List[np.ndarray] = []
+        self._scores: List[np.ndarray] = []
+        self._tp: List[np.ndarray] = []
+        self.images = 0
+
+    def add(self, boxes: np.ndarray, classes: np.ndarray, scores: np.ndarray,
+            gt_boxes: np.ndarray, gt_classes: np.ndarray) -> None:
+        keep = classes >= 0
+        boxes, classes, scores = boxes[keep], classes[keep], scores[keep]
+        self._tp.append(match_detections(boxes, classes, scores, gt_boxes, gt_classes))
+        self._classes.append(classes)
+        self._scores.append(scores)
+        self.n_gt += np.bincount(gt_classes, minlength=self.n_classes)[: self.n_classes]
+        self.images += 1
+
+    def summary(self, conf: float, names: Sequence[str]) -> Tuple[float, Dict[str, float]]:
+        """(mAP@0.5, per-class recall) over detections with score >= conf."""
+        classes = np.concatenate(self._classes) if self._classes else np.zeros(0, np.int64)
+        scores = np.concatenate(self._scores) if self._scores else np.zeros(0, np.float32)
+        tp = np.concatenate(self._tp) if self._tp else np.zeros(0, bool)
+        keep = scores >= conf
+        classes, scores, tp = classes[keep], scores[keep], tp[keep]
+        aps, recall = [], {}
+        for c in range(self.n_classes):
+            if self.n_gt[c] == 0:
+                continue
+            sel = classes == c
+            aps.append(average_precision(scores[sel], tp[sel], int(self.n_gt[c])))
+            recall[names[c]] = round(float(tp[sel].sum()) / float(self.n_gt[c]), 4)
+        return (round(float(np.mean(aps)), 4) if aps else float("nan")), recall
+
+
+def pareto_front(results: Sequence[EvalResult], latency_key: str = "p50") -> List[EvalResult]:
+    """Mark and return results no other result beats on both latency and mAP (fastest first)."""
+    front: List[EvalResult] = []
+    best = -np.inf
+    for r in sorted(results, key=lambda r: (r.latency_ms[latency_key], -r.map50)):
+        r.pareto = r.map50 > best
+        if r.pareto:
+            front.append(r)
+            best = r.map50
+    return front
+
+
+# ---------------------------------------------------------------- runs
+
+def evaluate_run(
+    predict: Callable[[np.ndarray], Detections],
+    samples: Iterable[Tuple[Path, np.ndarray, np.ndarray]],
+    class_map: np.ndarray,
+    n_classes: int = len(DF2_CATEGORIES),
+    warmup: int = 3,
+) -> Tuple[MatchAccumulator, List[float]]:
+    """One inference pass over the streamed samples → matches and per-image latencies (ms)."""
+    acc = MatchAccumulator(n_classes)
+    latencies: List[float] = []
+    for i, (path, gt_boxes, gt_classes) in enumerate(samples):
+        bgr = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if bgr is None:
+            continue
+        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+        t0 = time.perf_counter()
+        dets = predict(rgb)
+        dt = (time.perf_counter() - t0) * 1000.0
+        if i >= warmup:
+            latencies.append(dt)
+        acc.add(dets.boxes, map_classes(class_map, dets.classes), dets.scores, gt_boxes, gt_classes)
+    return acc, latencies
+
+
+def cached_export(target: Path, export: Callable[[], Path]) -> Path:
+    """
+    Artifact in cache directory `target`, produced by `export()` on a miss.
+
+    The export is moved into a temporary sibling directory that is renamed to
+    `target` only once it holds the artifact, so an export that fails partway
+    leaves no cache entry; an empty `target` (from older runs) counts as a miss.
+    """
+    if target.is_dir():
+        found = sorted(p for p in target.iterdir() if not p.name.startswith("."))
+        if found:
+            return found[0]
+        shutil.rmtree(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{target.name}-", dir=target.parent))
+    try:
+        out = Path(export())
+        out.rename(tmp / out.name)
+        tmp.rename(target)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return target / out.name
+
+
+def export_weights(weights: Path, backend: str, quant: str, imgsz: int, cache_dir: Path) -> Path:
+    """Exported model for (backend, quant, imgsz), reusing an earlier export in `cache_dir`."""
+    if backend == "pt":
+        if quant != "fp32":
+            raise ValueError("pt weights run as-is; quantize via an export backend (onnx/openvino/engine)")
+        return weights
+    from ultralytics import YOLO
+
+    return cached_export(
+        cache_dir / f"{weights.stem}-{backend}-{quant}-{imgsz}",
+        lambda: YOLO(str(weights)).export(format=backend, imgsz=imgsz, half=quant == "fp16", int8=quant == "int8"),
+    )
+
+
+def run_matrix(
+    weights: Path, root: Path, imgszs: Sequence[int], confs: Sequence[float],
+    backends: Sequence[str] = ("pt",), quants: Sequence[str] = ("fp32",),
+    limit: Optional[int] = None, seed: int = 0, device: str = "cpu", cache_dir: Optional[Path] = None,
+    log: Callable[[str], None] = print,
+) -> List[EvalResult]:
+    from .yolo_detector import YoloClothesDetector
+
+    cache_dir = cache_dir or Path(weights).parent / "exports"
+    results: List[EvalResult] = []
+    min_conf = min(confs)
+    for backend, quant, imgsz in itertools.product(backends, quants, imgszs):
+        try:
+            model_path = export_weights(Path(weights), backend, quant, imgsz, cache_dir)
+        except ValueError as e:
+            log(f"skip {backend}/{quant}: {e}")
+            continue
+        det = YoloClothesDetector(model_path, device=device, imgsz=imgsz, conf=min_conf)
+        acc, lat = evaluate_run(det.predict_arrays, iter_deepfashion2(root, limit, seed), class_mapping(det.class_names))
+        latency = latency_summary(lat)
+        for conf in confs:
+            map50, recall = acc.summary(conf, DF2_CATEGORIES)
+            r = EvalResult(EvalSetting(imgsz, conf, backend, quant), acc.images, map50, recall, latency)
+            results.append(r)
+            log(f"{r.setting.key():<28} mAP50={map50:.4f} p50={latency['p50']:.1f}ms p90={latency['p90']:.1f}ms")
+    return results
+
+
+def write_report(results: Sequence[EvalResult], out_dir: Path, latency_key: str = "p50") -> None:
+    """report.json (all results) and report.md (table, Pareto frontier marked, fastest first)."""
+    front = pareto_front(results, latency_key)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / "report.json", "w") as f:
+        json.dump({"latency_key": latency_key, "results": [r.to_json() for r in results]}, f, indent=2)
+
+    lines = [
+        f"# Detector accuracy vs latency ({results[0].images if results else 0} images)", "",
+        f"Pareto frontier on mAP@0.5 vs {latency_key} latency is marked with ★.", "",
+        "| | backend | quant | imgsz | conf | mAP@0.5 | mean ms | p50 ms | p90 ms | p99 ms |",
+        "|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    for r in sorted(results, key=lambda r: r.latency_ms[latency_key]):
+        s, lat = r.setting, r.latency_ms
+        lines.append(f"| {'★' if r.pareto else ''} | {s.backend} | {s.quant} | {s.imgsz} | {s.conf:g} | "
+                     f"{r.map50:.4f} | {lat['mean']:.1f} | {lat['p50']:.1f} | {lat['p90']:.1f} | {lat['p99']:.1f} |")
+    lines += ["", "## Per-class recall (frontier settings)", "",
+              "| class | " + " | ".join(r.setting.key() for r in front) + " |",
+              "|---|" + "---|" * len(front)]
+    for name in DF2_CATEGORIES:
+        lines.append(f"| {name} | " + " | ".join(
+            f"{r.recall[name]:.3f}" if name in r.recall else "–" for r in front) + " |")
+    (out_dir / "report.md").write_text("\n".join(lines) + "\n")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Evaluate detector settings on DeepFashion2 validation.")
+    ap.add_argument("root", help="split directory with image/ and annos/")
+    ap.add_argument("--weights", required=True)
+    ap.add_argument("--imgsz", type=int, nargs="+", default=[416, 640, 960])
+    ap.add_argument("--conf", type=float, nargs="+", default=[0.25])
+    ap.add_argument("--backend", nargs="+", default=["pt"], help="pt or an ultralytics export format")
+    ap.add_argument("--quant", nargs="+", default=["fp32"], choices=["fp32", "fp16", "int8"])
+    ap.add_argument("--limit", type=int, default=None, help="random subset size")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--device", default="cpu")
+    ap.add_argument("--latency-key", default="p50", choices=["mean"] + [f"p{p}" for p in LATENCY_PERCENTILES])
+    ap.add_argument("--out", default="eval_report")
+    args = ap.parse_args()
+
+    results = run_matrix(Path(args.weights), Path(args.root), args.imgsz, args.conf,
+                         args.backend, args.quant, args.limit, args.seed, args.device)
+    write_report(results, Path(args.out), args.latency_key)
+    print(f"wrote {args.out}/report.md and report.json")
+
+
+if __name__ == "__main__":
+    main()
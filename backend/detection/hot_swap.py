@@ -0,0 +1,179 @@
+"""
+Double-buffered detector holder for swapping YOLO weights without a restart.
+
+Frames take the live detector with `acquire()` for the whole segmentation
+pass, so boxes and the label table always come from one model. `swap()` loads
+the new weights on a background thread, warms them up and checks them on a
+canary frame while the old detector keeps serving, then replaces the live
+reference under a lock: the next frame to call `acquire()` gets the new
+model. The old detector is released (`on_release`) only once every frame
+that acquired it has finished.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generic, Iterator, Optional, Sequence, TypeVar
+
+import numpy as np
+
+from .results import Detections
+
+D = TypeVar("D")
+
+
+def check_detections(dets: Detections, n_classes: int, shape: Sequence[int]) -> Optional[str]:
+    """Why `dets` from a canary frame of `shape` (H, W, ...) is not plausible, or None if it is."""
+    n = len(dets)
+    if dets.boxes.shape != (n, 4) or dets.classes.shape != (n,) or dets.scores.shape != (n,):
+        return f"inconsistent shapes {dets.boxes.shape} / {dets.classes.shape} / {dets.scores.shape}"
+    if n == 0:
+        return None
+    if not (np.isfinite(dets.boxes).all() and np.isfinite(dets.scores).all()):
+        return "non-finite boxes or scores"
+    if ((dets.scores < 0) | (dets.scores > 1)).any():
+        return "scores outside [0, 1]"
+    if ((dets.classes < 0) | (dets.classes >= n_classes)).any():
+        return f"class ids outside 0..{n_classes - 1}"
+    H, W = shape[:2]
+    b = dets.boxes
+    slack = 0.05 * max(H, W)
+    if (b[:, 2] < b[:, 0]).any() or (b[:, 3] < b[:, 1]).any() \
+            or (b < -slack).any() or (b[:, [0, 2]] > W + slack).any() or (b[:, [1, 3]] > H + slack).any():
+        return "boxes outside the canary frame"
+    return None
+
+
+def warm_and_check(detector: Any, frame: np.ndarray, sizes: Sequence[int] = ()) -> Dict[str, Any] | str:
+    """
+    Run `detector.predict_arrays` once per inference size in `sizes` (first
+    calls allocate buffers / pick kernels), then time a canary prediction at the
+    default size. Returns canary stats, or the reason the output is implausible.
+    """
+    for size in sizes:
+        detector.predict_arrays(frame, imgsz=size)
+    t0 = time.perf_counter()
+    dets = detector.predict_arrays(frame)
+    ms = (time.perf_counter() - t0) * 1000.0
+    err = check_detections(dets, len(detector.label_table) - 1, frame.shape)
+    if err is not None:
+        return err
+    return {"detections": len(dets), "ms": round(ms, 1), "warmedSizes": sorted(set(sizes))}
+
+
+class _Slot(Generic[D]):
+    __slots__ = ("detector", "generation", "source", "users", "retired")
+
+    def __init__(self, detector: D, generation: int, source: str) -> None:
+        self.detector = detector
+        self.generation = generation
+        self.source = source
+        self.users = 0
+        self.retired = False
+
+
+class DetectorHolder(Generic[D]):
+    """
+    Live detector + at most one replacement being prepared.
+
+    load(source) builds a detector; prepare(detector) warms it up and raises
+    (or returns an error string) when the canary check fails, otherwise returns
+    a dict of canary stats; on_release(detector) frees a retired detector.
+    """
+
+    def __init__(
+        self,
+        detector: D,
+        source: str = "",
+        load: Optional[Callable[[str], D]] = None,
+        prepare: Optional[Callable[[D], Any]] = None,
+        on_release: Optional[Callable[[D], None]] = None,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._live: _Slot[D] = _Slot(detector, 0, source)
+        self._load = load
+        self._prepare = prepare
+        self._on_release = on_release
+        self._thread: Optional[threading.Thread] = None
+        self.status: Dict[str, Any] = {"state": "idle", "generation": 0, "source": source}
+
+    @property
+    def current(self) -> D:
+        return self._live.detector
+
+    @contextmanager
+    def acquire(self) -> Iterator[D]:
+        """The live detector, held until the block exits (a swap never frees it mid-frame)."""
+        with self._lock:
+            slot = self._live
+            slot.users += 1
+        try:
+            yield slot.detector
+        finally:
+            with self._lock:
+                slot.users -= 1
+                free = slot.retired and slot.users == 0
+            if free:
+                self._release(slot)
+
+    def swap(self, source: str, wait: bool = False) -> Dict[str, Any]:
+        """Start loading `source` in the background; RuntimeError if a swap is already running."""
+        if self._load is None:
+            raise RuntimeError("holder has no loader")
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                raise RuntimeError("a swap is already in progress")
+            self.status = {"state": "loading", "generation": self._live.generation,
+                           "source": self._live.source, "pending": source, "startedAt": time.time()}
+            self._thread = threading.Thread(target=self._swap, args=(source,), name="detector-swap", daemon=True)
+            self._thread.start()
+        if wait:
+            self._thread.join()
+        return self.report()
+
+    def _swap(self, source: str) -> None:
+        t0 = time.perf_counter()
+        new: Optional[D] = None
+        try:
+            new = self._load(source)  # type: ignore[misc]
+            self._set(state="warming", loadS=round(time.perf_counter() - t0, 3))
+            t1 = time.perf_counter()
+            canary = self._prepare(new) if self._prepare is not None else None
+            if isinstance(canary, str):
+                raise ValueError(f"canary check failed: {canary}")
+        except Exception as e:
+            # the live detector was never touched; drop the rejected one
+            if new is not None and self._on_release is not None:
+                self._on_release(new)
+            self._set(state="failed", error=f"{type(e).__name__}: {e}")
+            return
+
+        with self._lock:
+            old = self._live
+            self._live = _Slot(new, old.generation + 1, source)
+            old.retired = True
+            free = old.users == 0
+            self.status.update({
+                "state": "swapped", "generation": self._live.generation, "source": source,
+                "warmupS": round(time.perf_counter() - t1, 3), "canary": canary,
+                "swappedAt": time.time(), "previous": old.source,
+            })
+            self.status.pop("pending", None)
+        if free:
+            self._release(old)
+
+    def _set(self, **kw: Any) -> None:
+        with self._lock:
+            self.status.update(kw)
+
+    def _release(self, slot: _Slot[D]) -> None:
+        if self._on_release is not None:
+            self._on_release(slot.detector)
+        self._set(released=slot.generation)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self.status)
+            out["inFlight"] = self._live.users
+        return out
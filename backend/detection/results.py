@@ -0,0 +1,68 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import numpy as np
+
+
+@dataclass
+class Detections:
+    """
+    Structured detector output (array-native, one row per detection).
+
+    boxes:   (N, 4) float32 xyxy in detector-input pixel space
+    classes: (N,)   int64 class ids
+    scores:  (N,)   float32 confidences
+    imgsz:   inference size that produced these detections (None if unknown)
+    escalated: why a cascade re-ran at high resolution ("empty" / "low_conf" /
+             "refresh"), None if this is a single-pass result
+    masks:   (N, H, W) bool instance masks over the detector input, from
+             segmentation weights only (None for box-only models)
+    """
+    boxes: np.ndarray
+    classes: np.ndarray
+    scores: np.ndarray
+    imgsz: Optional[int] = None
+    escalated: Optional[str] = None
+    masks: Optional[np.ndarray] = None
+
+    @classmethod
+    def empty(cls, imgsz: Optional[int] = None) -> Detections:
+        return cls(
+            boxes=np.zeros((0, 4), dtype=np.float32),
+            classes=np.zeros((0,), dtype=np.int64),
+            scores=np.zeros((0,), dtype=np.float32),
+            imgsz=imgsz,
+        )
+
+    def __len__(self) -> int:
+        return int(self.boxes.shape[0])
+
+    def to_tuples(self) -> List[Tuple[int, int, int, int, int, float]]:
+        """Legacy view: [(x1, y1, x2, y2, class_id, score)] with int pixel coords."""
+        xyxy = self.boxes.astype(int)
+        return [
+            (int(x1), int(y1), int(x2), int(y2), int(c), float(s))
+            for (x1, y1, x2, y2), c, s in zip(xyxy, self.classes, self.scores)
+        ]
+
+
+def build_label_table(class_names, fallback: str = "garment") -> np.ndarray:
+    """
+    names dict/list → object array indexed by class id; gaps become `fallback`.
+    The last slot is always `fallback` so out-of-range ids can be mapped to it.
+    """
+    if isinstance(class_names, dict):
+        n = (max(int(k) for k in class_names) + 1) if class_names else 0
+        table = np.full(n + 1, fallback, dtype=object)
+        for k, v in class_names.items():
+            table[int(k)] = v
+    else:
+        table = np.array(list(class_names) + [fallback], dtype=object)
+    return table
+
+
+def lookup_labels(label_table: np.ndarray, classes: np.ndarray) -> np.ndarray:
+    """Vectorized class id → label; ids outside the table map to the fallback slot."""
+    n = label_table.shape[0] - 1
+    idx = np.where((classes >= 0) & (classes < n), classes, n)
+    return label_table[idx]
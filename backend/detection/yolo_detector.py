@@ -3,11 +3,16 @@ import numpy as np
 import torch
 from typing import List, Tuple, Optional
 
+from .cascade import CascadeConfig, CascadeState, run_cascade
+from .results import Detections, build_label_table
+
+
 class YoloClothesDetector:
     """
     Wraps Ultralytics YOLO for clothes detection.
 
-    Returns list of detections: [(x1, y1, x2, y2, class_id, score)]
+    `predict_arrays` returns a `Detections` (boxes/classes/scores arrays);
+    `predict` keeps the legacy list form: [(x1, y1, x2, y2, class_id, score)]
     """
     def __init__(self, weights_path, device="cpu", imgsz=640, conf=0.25, classes: Optional[list[int]] = None):
         self.model = YOLO(str(weights_path))
@@ -18,27 +23,51 @@ class YoloClothesDetector:
         if torch.cuda.is_available() and device == "cuda":
             self.model.to("cuda")
 
+        # segmentation weights (e.g. *-seg.pt) also give per-instance masks
+        self.segments = getattr(self.model, "task", "detect") == "segment"
+
         # names dict: {id: "class_name", ...}
         self.class_names = self.model.model.names
+        self.label_table = build_label_table(self.class_names)
 
-    def predict(self, bgr_image: np.ndarray) -> List[Tuple[int, int, int, int, int, float]]:
+    def predict_arrays(self, bgr_image: np.ndarray, imgsz: Optional[int] = None) -> Detections:
+        """`imgsz` overrides the configured inference size for this call (e.g. for ROI crops)."""
         res = self.model.predict(
             bgr_image,
-            imgsz=self.imgsz,
+            imgsz=imgsz or self.imgsz,
             conf=self.conf,
             verbose=False,
             device=self.device,
-            classes=self.classes
+            classes=self.classes,
+            **({"retina_masks": True} if self.segments else {}),  # masks at input resolution
         )[0]
 
-        out = []
         if not hasattr(res, "boxes") or res.boxes is None or len(res.boxes) == 0:
-            return out
+            return Detections.empty(imgsz=imgsz or self.imgsz)
+
+        return Detections(
+            boxes=res.boxes.xyxy.detach().cpu().numpy().astype(np.float32, copy=False),
+            classes=res.boxes.cls.detach().cpu().numpy().astype(np.int64),
+            scores=res.boxes.conf.detach().cpu().numpy().astype(np.float32, copy=False),
+            imgsz=imgsz or self.imgsz,
+            masks=(res.masks.data.detach().cpu().numpy() > 0.5)
+            if self.segments and getattr(res, "masks", None) is not None else None,
+        )
+
+    def predict_cascade(self, bgr_image: np.ndarray, cfg: CascadeConfig,
+                        state: Optional[CascadeState] = None) -> Detections:
+        """
+        Low-resolution pass first; re-run at `cfg.high_imgsz` when it finds nothing,
+        its best score is below `cfg.min_top_conf`, or a refresh is due (see detection/cascade.py).
+        """
+        return run_cascade(lambda img, size: self.predict_arrays(img, imgsz=size), bgr_image, cfg, state)
+
+    def predict(self, bgr_image: np.ndarray) -> List[Tuple[int, int, int, int, int, float]]:
+        return self.predict_arrays(bgr_image).to_tuples()
 
-        xyxy = res.boxes.xyxy.detach().cpu().numpy().astype(int)
-        cls  = res.boxes.cls.detach().cpu().numpy().astype(int)
-        conf = res.boxes.conf.detach().cpu().numpy()
+    def close(self) -> None:
+        """Drop the model (after a hot swap, see detection/hot_swap.py) and return cached GPU memory."""
+        self.model = None
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
 
-        for (x1, y1, x2, y2), c, s in zip(xyxy, cls, conf):
-            out.append((int(x1), int(y1), int(x2), int(y2), int(c), float(s)))
-        return out
@@ -1,9 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import Optional
 import numpy as np
 import cv2
 import mediapipe as mp
 
+from .frame_pool import FramePool
+
 
 @dataclass
 class BgBlurConfig:
@@ -20,34 +23,50 @@ class BgBlur:
         self._mp_selfie = mp.solutions.selfie_segmentation.SelfieSegmentation(  # type: ignore
             model_selection=cfg.model_selection
         )
+        # structuring elements are fixed per config; build them once
+        self._dilate_k = (cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (cfg.dilate*2+1, cfg.dilate*2+1))
+                          if cfg.dilate > 0 else None)
+        self._erode_k = (cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (cfg.erode*2+1, cfg.erode*2+1))
+                         if cfg.erode > 0 else None)
 
-    def _refine_mask(self, mask: np.ndarray) -> np.ndarray:
+    def _refine_mask(self, mask: np.ndarray, pool: Optional[FramePool] = None) -> np.ndarray:
         """mask: HxW float32 0..1 → returns HxW uint8 0/255 with morph ops."""
-        m = (mask > float(self.cfg.mask_thresh)).astype(np.uint8) * 255
-        if self.cfg.dilate > 0:
-            k = cv2.getStructuringElement(cv2.MORPH_ELLIPSE,
-                                          (self.cfg.dilate*2+1, self.cfg.dilate*2+1))
-            m = cv2.dilate(m, k, iterations=1)
-        if self.cfg.erode > 0:
-            k = cv2.getStructuringElement(cv2.MORPH_ELLIPSE,
-                                          (self.cfg.erode*2+1, self.cfg.erode*2+1))
-            m = cv2.erode(m, k, iterations=1)
+        shape = mask.shape[:2]
+        m = pool.get("blur.mask", shape) if pool is not None else None
+        m = cv2.compare(mask, float(self.cfg.mask_thresh), cv2.CMP_GT, dst=m)
+        tmp = pool.get("blur.mask_tmp", shape) if pool is not None else None
+        if self._dilate_k is not None:
+            tmp = cv2.dilate(m, self._dilate_k, dst=tmp, iterations=1)
+            m, tmp = tmp, m
+        if self._erode_k is not None:
+            tmp = cv2.erode(m, self._erode_k, dst=tmp, iterations=1)
+            m, tmp = tmp, m
         return m
 
-    def apply(self, rgb: np.ndarray) -> np.ndarray:
-        """Input/Output: RGB uint8 HxWx3. Returns blurred-bg composite (same size)."""
+    def person_mask(self, rgb: np.ndarray, pool: Optional[FramePool] = None) -> np.ndarray:
+        """RGB uint8 HxWx3 → refined HxW uint8 0/255 person mask."""
         # MediaPipe expects RGB
         res = self._mp_selfie.process(rgb)
-        raw = res.segmentation_mask.astype(np.float32)  # HxW float
-        m = self._refine_mask(raw)                      # HxW uint8 0/255
+        raw = np.asarray(res.segmentation_mask, dtype=np.float32)  # HxW float, no copy if already f32
+        return self._refine_mask(raw, pool)
+
+    def apply(self, rgb: np.ndarray, pool: Optional[FramePool] = None,
+              mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Input/Output: RGB uint8 HxWx3. Returns blurred-bg composite (same size).
+
+        With `pool`, the mask and composite live in the pool's buffers and are
+        overwritten by the next frame. Pass `mask` (from `person_mask`) to skip
+        re-running segmentation.
+        """
+        m = self.person_mask(rgb, pool) if mask is None else mask  # HxW uint8 0/255
 
         # Background blur (same size); cv2 works fine in RGB
         k = self.cfg.ksize if self.cfg.ksize % 2 == 1 else self.cfg.ksize + 1
-        blurred = cv2.GaussianBlur(rgb, (k, k), 0)
+        out = pool.get("blur.out", rgb.shape) if pool is not None else None
+        out = cv2.GaussianBlur(rgb, (k, k), 0, dst=out)
 
-        # Composite: keep foreground sharp, background blurred
-        fg = cv2.bitwise_and(rgb, rgb, mask=m)
-        inv = cv2.bitwise_not(m)
-        bg = cv2.bitwise_and(blurred, blurred, mask=inv)
-        out = cv2.add(fg, bg)
+        # Composite: keep foreground sharp over the blurred background
+        # (same result as fg + bg with fg = rgb & m, bg = blurred & ~m)
+        cv2.copyTo(rgb, m, out)
         return out
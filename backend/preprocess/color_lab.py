@@ -0,0 +1,136 @@
+"""
+Fast sRGB → CIELAB (D65) conversion for uint8 frames.
+
+The scoring package expects `colorLAB` / `colorClusters` in D65 CIELAB. Converting
+whole frames the textbook way (float64, pow 2.4 per channel, cube root) costs
+more than detection on small frames, so this module:
+
+  * replaces the sRGB transfer curve with a 256-entry float32 table indexed
+    by the uint8 values (no pow at all);
+  * folds the white-point normalisation into the RGB → XYZ matrix and the
+    L/a/b combination into a second 3×3 matrix, both float32 matmuls;
+  * optionally quantizes RGB to `lut_bits` per channel and reads L/a/b straight
+    from a precomputed 3D table (one gather per pixel).
+
+Accuracy against `srgb_to_lab_reference` (float64, every 8-bit RGB value):
+    exact path          max ΔE76 ≈ 1e-4 (float32 rounding)
+    lut_bits=6 (3 MB)   max ΔE76 ≈ 2.9, mean ≈ 0.9
+    lut_bits=7 (25 MB)  max ΔE76 ≈ 1.0, mean ≈ 0.4
+On a 640×480 frame (one core) the exact path runs 3-4× and lut_bits=6 5-10×
+faster than the reference; the table gather is cache-bound, so it gains most on
+natural images and least on noise (python -m benchmarks.color_lab). The LUT errors stay
+well below the ΔE00 thresholds the scorer works with (dMin/dMax, echo bands of
+10 / 18).
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+# sRGB primaries → XYZ, D65 reference white
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_WHITE_D65 = np.array([0.95047, 1.0, 1.08883])
+_EPS = (6.0 / 29.0) ** 3
+_KAPPA = 1.0 / (3.0 * (6.0 / 29.0) ** 2)
+
+# (x/Xn, y/Yn, z/Zn) from linear RGB, as a right-multiplication matrix
+_RGB_TO_XYZN = (_RGB_TO_XYZ / _WHITE_D65[:, None]).T.astype(np.float32)
+# (fx, fy, fz) → (L, a, b) without the -16 offset on L
+_F_TO_LAB = np.array([
+    [0.0, 500.0, 0.0],
+    [116.0, -500.0, 200.0],
+    [0.0, 0.0, -200.0],
+], dtype=np.float32)
+
+
+def _srgb_to_linear(v: np.ndarray) -> np.ndarray:
+    return np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+
+
+_LINEAR = _srgb_to_linear(np.arange(256) / 255.0).astype(np.float32)
+
+
+def srgb_to_lab_reference(rgb: np.ndarray) -> np.ndarray:
+    """Textbook float64 conversion of (..., 3) sRGB uint8 values; the accuracy baseline."""
+    lin = _srgb_to_linear(np.asarray(rgb, dtype=np.float64) / 255.0)
+    xyz = lin @ _RGB_TO_XYZ.T / _WHITE_D65
+    f = np.where(xyz > _EPS, np.cbrt(xyz), xyz * _KAPPA + 4.0 / 29.0)
+    return np.stack([
+        116.0 * f[..., 1] - 16.0,
+        500.0 * (f[..., 0] - f[..., 1]),
+        200.0 * (f[..., 1] - f[..., 2]),
+    ], axis=-1)
+
+
+@lru_cache(maxsize=4)
+def lab_lut(bits: int) -> np.ndarray:
+    """
+    3D table of L/a/b for RGB quantized to `bits` per channel.
+
+    Channel-planar float32 (3, 2**(3*bits)) so lookups are three 1D gathers; each
+    entry holds the color at the centre of its quantization bucket.
+    """
+    if not 1 <= bits <= 8:
+        raise ValueError(f"lut bits must be in 1..8, got {bits}")
+    n = 1 << bits
+    step = 256 >> bits
+    centres = np.minimum(np.arange(n) * step + (step - 1) / 2.0, 255.0)
+    r, g, b = np.meshgrid(centres, centres, centres, indexing="ij")
+    rgb = np.stack([r, g, b], axis=-1).reshape(-1, 3)
+    return np.ascontiguousarray(srgb_to_lab_reference(rgb).T, dtype=np.float32)
+
+
+def srgb_to_lab(
+    rgb: np.ndarray,
+    out: Optional[np.ndarray] = None,
+    lut_bits: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Convert an (..., 3) uint8 sRGB array (e.g. the decoded frame in on_frame) to float32 LAB.
+
+    Args:
+        rgb: uint8 array, channels in R, G, B order (use frame[..., ::-1] for OpenCV BGR)
+        out: optional float32 array of the same shape to write into; reusing one per
+            session avoids a frame-sized allocation per call
+        lut_bits: quantize through the 3D table instead of computing exactly
+
+    Returns:
+        `out` (or a new float32 array) holding L in [0, 100] and a, b
+    """
+    if rgb.dtype != np.uint8 or rgb.shape[-1] != 3:
+        raise ValueError(f"expected (..., 3) uint8 RGB, got {rgb.dtype} {rgb.shape}")
+    if out is None:
+        out = np.empty(rgb.shape, dtype=np.float32)
+    elif out.shape != rgb.shape or out.dtype != np.float32:
+        raise ValueError(f"out must be float32 {rgb.shape}, got {out.dtype} {out.shape}")
+
+    flat = rgb.reshape(-1, 3)
+    dst = out.reshape(-1, 3)  # a view for contiguous `out`; copied back below otherwise
+
+    if lut_bits is not None:
+        lut = lab_lut(lut_bits)
+        q = flat >> (8 - lut_bits)
+        idx = q[:, 0].astype(np.int32)
+        idx <<= lut_bits
+        idx |= q[:, 1]
+        idx <<= lut_bits
+        idx |= q[:, 2]
+        for k in range(3):
+            dst[:, k] = np.take(lut[k], idx)
+    else:
+        lin = np.take(_LINEAR, flat)               # (N, 3) linear RGB
+        xyz = np.matmul(lin, _RGB_TO_XYZN)
+        f = np.cbrt(xyz, out=lin)
+        np.copyto(f, xyz * np.float32(_KAPPA) + np.float32(4.0 / 29.0), where=xyz <= _EPS)
+        np.matmul(f, _F_TO_LAB, out=dst)
+        dst[:, 0] -= 16.0
+
+    if not np.shares_memory(dst, out):
+        out[...] = dst.reshape(out.shape)
+    return out
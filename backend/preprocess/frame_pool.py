@@ -0,0 +1,117 @@
+"""
+Per-session pool of reusable frame buffers.
+
+Every frame used to allocate the decoded image, its NumPy copy, the blurred
+frame, the fg / inv / bg intermediates and the composite. The pool hands out
+preallocated arrays keyed by (name, shape, dtype) that the pipeline writes
+into with OpenCV `dst=` / NumPy `out=` operations, so once a session's frame
+size settles the pipeline allocates nothing of its own per frame. When the
+capture size changes (see capture hints) a name's old buffer is replaced and
+counted as an allocation.
+
+Counters (`metrics()`) show the steady state: `allocations_last_frame` stays
+at 0 and `bytes_held` flat. Allocations inside third-party code (the image
+decoder, MediaPipe's mask, the detector's letterbox) are outside the pool.
+"""
+
+from __future__ import annotations
+import base64
+import binascii
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None  # type: ignore[assignment]
+
+
+class FramePool:
+    """Named, shape-keyed buffers for one session's frame pipeline (one frame at a time)."""
+
+    def __init__(self) -> None:
+        self._buffers: Dict[str, np.ndarray] = {}
+        self.frames = 0
+        self.allocations = 0
+        self.reuses = 0
+        self.bytes_held = 0
+        self.peak_bytes = 0
+        self._frame_allocs = 0
+        self.allocations_last_frame = 0
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype: Any = np.uint8) -> np.ndarray:
+        """Buffer `name` with the given shape/dtype; contents are whatever the last frame left."""
+        dtype = np.dtype(dtype)
+        buf = self._buffers.get(name)
+        if buf is not None and buf.shape == tuple(shape) and buf.dtype == dtype:
+            self.reuses += 1
+            return buf
+        if buf is not None:
+            self.bytes_held -= buf.nbytes
+        buf = np.empty(shape, dtype=dtype)
+        self._buffers[name] = buf
+        self.bytes_held += buf.nbytes
+        self.peak_bytes = max(self.peak_bytes, self.bytes_held)
+        self.allocations += 1
+        self._frame_allocs += 1
+        return buf
+
+    def peek(self, name: str) -> Optional[np.ndarray]:
+        """Buffer `name` as last written, without allocating; None if never requested."""
+        return self._buffers.get(name)
+
+    @contextmanager
+    def frame(self) -> Iterator[FramePool]:
+        """Delimit one frame so per-frame allocation counts can be reported."""
+        self._frame_allocs = 0
+        try:
+            yield self
+        finally:
+            self.frames += 1
+            self.allocations_last_frame = self._frame_allocs
+
+    def release(self) -> None:
+        self._buffers.clear()
+        self.bytes_held = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "frames": self.frames,
+            "buffers": len(self._buffers),
+            "allocations": self.allocations,
+            "allocations_last_frame": self.allocations_last_frame,
+            "reuses": self.reuses,
+            "bytes_held": self.bytes_held,
+            "peak_bytes": self.peak_bytes,
+        }
+
+
+def process_peak_rss_bytes() -> int | None:
+    """Peak resident set size of the process, or None where unsupported."""
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux
+    return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * 1024
+
+
+def decode_data_url_rgb(data_url: str, pool: FramePool) -> np.ndarray:
+    """
+    Decode a `data:image/...;base64,` frame into the pool's "rgb" buffer (H×W×3 uint8, RGB).
+
+    The codec still returns its own BGR array; the RGB frame the rest of the
+    pipeline reads is written in place.
+    """
+    b64 = data_url.split(",", 1)[1]
+    try:
+        raw = base64.b64decode(b64)
+    except binascii.Error as e:
+        raise ValueError(f"invalid base64 frame: {e}") from None
+    bgr = cv2.imdecode(np.frombuffer(raw, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if bgr is None:
+        raise ValueError("could not decode frame image")
+    rgb = pool.get("rgb", bgr.shape, np.uint8)
+    cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=rgb)
+    return rgb
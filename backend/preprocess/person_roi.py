@@ -0,0 +1,50 @@
+"""
+Person-ROI cropping for detection.
+
+Instead of blurring the background and running the detector on the whole
+frame, take the bounding box of the selfie mask, pad it, and detect on that
+crop at a smaller inference size. Garments then cover more of the detector
+input (better recall on small items) while fewer pixels are inferred per frame.
+Detector boxes come back in crop pixels; `offset_boxes` shifts them into frame
+pixels so the usual `boxes_to_video_xywh` scaling applies unchanged.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+@dataclass
+class PersonRoiConfig:
+    pad: float = 0.08            # padding per side, as a fraction of the box size
+    min_pad_px: int = 8          # ... but at least this many pixels
+    min_area_frac: float = 0.02  # smaller masks are noise → no ROI
+    max_area_frac: float = 0.9   # a crop this close to the frame isn't worth it → no ROI
+    imgsz: int = 640             # detector inference size for the crop
+
+
+def person_roi(mask: np.ndarray, cfg: PersonRoiConfig = PersonRoiConfig()) -> Optional[Tuple[int, int, int, int]]:
+    """
+    mask: HxW uint8 (non-zero = person). Returns the padded (x0, y0, x1, y1)
+    crop clamped to the frame, or None when the full frame should be used.
+    """
+    H, W = mask.shape[:2]
+    x, y, w, h = cv2.boundingRect(mask)  # non-zero pixels of a uint8 image
+    if w == 0 or h == 0 or w * h < cfg.min_area_frac * W * H:
+        return None
+
+    px = max(int(w * cfg.pad), cfg.min_pad_px)
+    py = max(int(h * cfg.pad), cfg.min_pad_px)
+    x0, y0 = max(x - px, 0), max(y - py, 0)
+    x1, y1 = min(x + w + px, W), min(y + h + py, H)
+    if (x1 - x0) * (y1 - y0) > cfg.max_area_frac * W * H:
+        return None
+    return x0, y0, x1, y1
+
+
+def offset_boxes(xyxy: np.ndarray, x0: int, y0: int) -> np.ndarray:
+    """(N, 4) xyxy boxes in crop pixels → frame pixels."""
+    return xyxy + np.array([x0, y0, x0, y0], dtype=xyxy.dtype)
@@ -0,0 +1,140 @@
+"""
+COCO-style run-length encoding for per-garment masks.
+
+A mask is flattened in column-major (Fortran) order and stored as alternating
+run lengths starting with a run of zeros, then packed into the compact COCO
+string form (pycocotools `rleToString`: each count as a delta against the
+count two back, 5 bits per printable character). Run detection and decoding
+are vectorized; only the string packing loops, once per run.
+
+Garment masks are encoded over the garment's own box (crop of the frame the
+detector ran on), downsampled so the longer side is at most `max_side`; the
+client stretches the decoded crop over the item's `bbox`. That keeps a
+typical garment mask to a few dozen bytes per emit.
+"""
+
+from __future__ import annotations
+from typing import List, Optional, Sequence, TypedDict
+
+import cv2
+import numpy as np
+
+
+class Rle(TypedDict):
+    size: List[int]   # [height, width]
+    counts: str       # COCO compressed counts
+
+
+def rle_counts(mask: np.ndarray) -> np.ndarray:
+    """HxW bool/0-1 mask → uncompressed run lengths (column-major, zeros first)."""
+    flat = np.asarray(mask, dtype=bool).ravel(order="F")
+    n = flat.size
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    change = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    edges = np.concatenate(([0], change, [n]))
+    runs = np.diff(edges)
+    if flat[0]:
+        runs = np.concatenate(([0], runs))
+    return runs.astype(np.int64)
+
+
+def counts_to_string(counts: Sequence[int]) -> str:
+    """pycocotools-compatible compressed counts string."""
+    out: List[str] = []
+    for i, x in enumerate(int(c) for c in counts):
+        if i > 2:
+            x -= int(counts[i - 2])
+        more = True
+        while more:
+            c = x & 0x1F
+            x >>= 5
+            more = (x != -1) if (c & 0x10) else (x != 0)
+            if more:
+                c |= 0x20
+            out.append(chr(c + 48))
+    return "".join(out)
+
+
+def string_to_counts(s: str) -> np.ndarray:
+    counts: List[int] = []
+    p, n = 0, len(s)
+    while p < n:
+        x = k = 0
+        more = True
+        while more:
+            c = ord(s[p]) - 48
+            x |= (c & 0x1F) << (5 * k)
+            more = bool(c & 0x20)
+            p += 1
+            k += 1
+            if not more and (c & 0x10):
+                x |= -1 << (5 * k)
+        if len(counts) > 2:
+            x += counts[-2]
+        counts.append(x)
+    return np.asarray(counts, dtype=np.int64)
+
+
+def rle_encode(mask: np.ndarray) -> Rle:
+    h, w = mask.shape[:2]
+    return {"size": [int(h), int(w)], "counts": counts_to_string(rle_counts(mask).tolist())}
+
+
+def rle_decode(rle: Rle) -> np.ndarray:
+    """Rle → HxW bool mask."""
+    h, w = rle["size"]
+    counts = string_to_counts(rle["counts"]) if isinstance(rle["counts"], str) else np.asarray(rle["counts"])
+    values = np.arange(counts.size) % 2 == 1
+    flat = np.repeat(values, counts)
+    if flat.size != h * w:
+        raise ValueError(f"RLE covers {flat.size} pixels, expected {h * w}")
+    return flat.reshape((w, h)).T
+
+
+def rle_area(rle: Rle) -> int:
+    counts = string_to_counts(rle["counts"]) if isinstance(rle["counts"], str) else np.asarray(rle["counts"])
+    return int(counts[1::2].sum())
+
+
+def _box_crop(box: Sequence[float], W: int, H: int):
+    x0, y0, x1, y1 = (int(round(float(v))) for v in box)
+    x0, y0 = min(max(x0, 0), W), min(max(y0, 0), H)
+    return x0, y0, max(min(x1, W), x0), max(min(y1, H), y0)
+
+
+def garment_masks(
+    boxes: np.ndarray,
+    masks: Optional[np.ndarray] = None,
+    person: Optional[np.ndarray] = None,
+    max_side: int = 64,
+) -> List[Optional[Rle]]:
+    """
+    Per-box RLE over the box crop (longer side ≤ `max_side`).
+
+    boxes: (N, 4) xyxy in the space of `masks` / `person`;
+    masks: (N, H, W) per-instance masks from a segmentation model, used when given;
+    person: HxW person mask (nonzero = person), intersected with each box otherwise.
+    Entries are None for empty boxes or when there is no mask source.
+    """
+    src = masks if masks is not None else person
+    if src is None:
+        return [None] * len(boxes)
+    H, W = src.shape[-2:]
+    out: List[Optional[Rle]] = []
+    for i, box in enumerate(boxes):
+        x0, y0, x1, y1 = _box_crop(box, W, H)
+        if x1 <= x0 or y1 <= y0:
+            out.append(None)
+            continue
+        plane = masks[i] if masks is not None else person
+        crop = np.asarray(plane[y0:y1, x0:x1])
+        h, w = crop.shape
+        scale = min(1.0, max_side / float(max(h, w)))
+        binary = (crop > 0).astype(np.uint8)
+        if scale < 1.0:
+            # area-average then re-threshold: smoother edges than nearest-neighbour picking
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            binary = cv2.resize(binary * 255, size, interpolation=cv2.INTER_AREA) > 127
+        out.append(rle_encode(binary))
+    return out
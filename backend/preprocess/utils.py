@@ -1,5 +1,6 @@
 
 from typing import Any, Tuple
+import numpy as np
 
 
 def xyxy_to_xywh(x1: float, y1: float, x2: float, y2: float) -> Tuple[int, int, int, int]:
@@ -38,3 +39,31 @@ def parse_det(det: Any) -> Tuple[float, float, float, float, float, int]:
         return x1, y1, x2, y2, conf, cls_idx
     x1, y1, x2, y2, cls_idx, conf = det[:6]
     return float(x1), float(y1), float(x2), float(y2), float(conf), int(cls_idx)
+
+
+def boxes_to_video_xywh(
+    xyxy: np.ndarray, sx: float, sy: float, W: int, H: int, min_size: int = 8
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized form of parse_det → scale → xyxy_to_xywh → clamp_xywh → size filter.
+
+    xyxy: (N, 4) boxes in detector space. Returns (xywh int32 (N, 4), keep bool (N,))
+    with the same truncation/clamping semantics as the scalar helpers.
+    """
+    if xyxy.shape[0] == 0:
+        return np.zeros((0, 4), dtype=np.int32), np.zeros((0,), dtype=bool)
+
+    scaled = xyxy.astype(np.float64) * np.array([sx, sy, sx, sy])
+    x = np.trunc(scaled[:, 0])
+    y = np.trunc(scaled[:, 1])
+    w = np.trunc(scaled[:, 2] - scaled[:, 0])
+    h = np.trunc(scaled[:, 3] - scaled[:, 1])
+
+    x = np.clip(x, 0, W - 1)
+    y = np.clip(y, 0, H - 1)
+    w = np.maximum(np.minimum(w, W - x), 1)
+    h = np.maximum(np.minimum(h, H - y), 1)
+
+    xywh = np.stack([x, y, w, h], axis=1).astype(np.int32)
+    keep = (xywh[:, 2] >= min_size) & (xywh[:, 3] >= min_size)
+    return xywh, keep
@@ -13,7 +13,12 @@ from .types import (
     StyleScore,
 )
 from .scorer import score_outfit
+from .parsed import ParsedOutfit, ParseError, parse_outfit
 from .config import load_config, ScoreConfig
+from .session import ScoringSession, ScoringSessionStore
+from .optimizer import top_k_outfits
+from .color_index import LabColorIndex
+from .percentile import ScoreHistogram, ScoreRanks
 
 __all__ = [
     "Material",
@@ -21,7 +26,16 @@ __all__ = [
     "OutfitFeatures",
     "StyleScore",
     "score_outfit",
+    "ParsedOutfit",
+    "ParseError",
+    "parse_outfit",
     "load_config",
     "ScoreConfig",
+    "ScoringSession",
+    "ScoringSessionStore",
+    "top_k_outfits",
+    "LabColorIndex",
+    "ScoreHistogram",
+    "ScoreRanks",
 ]
 
@@ -0,0 +1,366 @@
+"""
+Weight/threshold calibration sweeps for ScoreConfig over labelled outfits.
+
+Dataset: JSONL, one labelled outfit per line:
+    {"features": <OutfitFeatures>, "label": <human rating>}
+
+Calling score_outfit per (config, outfit) recomputes CIEDE2000 distances,
+cluster sorting and material sets that no config parameter touches. Instead
+`OutfitTable` extracts those once per outfit (mean cluster ΔE00 `dbar`, ratio
+fit `r`, `rho`, material / glossy counts, pattern strengths, domain z-scores,
+the B2 body term and the whole R subscore) into columns. A config then costs:
+
+  * one vectorized pass per subscore whose parameters changed (columns are
+    cached by parameter tuple, so grid sweeps over weights reuse them);
+  * one (N, 6) @ (6, K) matrix multiply for all configs sharing thresholds;
+  * a rank transform for the Spearman correlation against the labels.
+
+Scores equal score_outfit's styleScore before its 1-decimal rounding.
+
+Usage (from backend directory):
+    python -m scoring.calibrate data.jsonl --space space.json --random 10000 --top 10
+
+space.json maps "section.param" to a list (grid values) or {"min", "max"}
+(uniform range, random mode only), e.g.
+    {"weights.C": [0.2, 0.25, 0.3], "color.dMin": {"min": 4, "max": 12}}
+Weights are renormalised to sum to 1.
+"""
+
+from __future__ import annotations
+import argparse
+import copy
+import itertools
+import json
+import math
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+from .types import OutfitFeatures
+from .config import ScoreConfig, load_config
+from .color_distance import delta_e_00
+from .scorer import clamp, repetition_from_min_delta, ACCESSORY_TYPES
+
+SUBSCORES = ("C", "P", "T", "H", "B", "R")
+
+# parameters each subscore column depends on
+_PARAMS = {
+    "C": ("color.dMin", "color.dMax", "color.tauH"),
+    "P": ("pattern.strong", "pattern.mild"),
+    "T": ("texture.glossBonus",),
+    "H": ("highlight.zThreshold",),
+    "B": ("proportion.idealTop", "proportion.tolerance"),
+    "R": (),
+}
+
+
+def load_labelled(path: str | Path) -> tuple[list[OutfitFeatures], np.ndarray]:
+    """Read a labelled JSONL dataset into (features, labels)."""
+    features: list[OutfitFeatures] = []
+    labels: list[float] = []
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if "features" not in row or "label" not in row:
+                raise ValueError(f"{path}:{line_no}: expected 'features' and 'label'")
+            features.append(row["features"])
+            labels.append(float(row["label"]))
+    return features, np.asarray(labels, dtype=np.float64)
+
+
+def get_param(cfg: ScoreConfig, name: str) -> float:
+    section, key = name.split(".", 1)
+    if section == "weights":
+        return float(cfg.weights[key])
+    return float(getattr(getattr(cfg, section), key))
+
+
+def set_param(cfg: ScoreConfig, name: str, value: float) -> None:
+    section, key = name.split(".", 1)
+    if section == "weights":
+        if key not in SUBSCORES:
+            raise KeyError(f"unknown config parameter {name!r}")
+        cfg.weights[key] = float(value)
+    elif not hasattr(getattr(cfg, section, None), key):
+        raise KeyError(f"unknown config parameter {name!r}")
+    else:
+        setattr(getattr(cfg, section), key, float(value))
+
+
+def _normalised(cfg: ScoreConfig) -> ScoreConfig:
+    total = sum(cfg.weights.values())
+    if total > 0:
+        cfg.weights = {k: v / total for k, v in cfg.weights.items()}
+    return cfg
+
+
+def grid_configs(base: ScoreConfig, space: dict[str, Sequence[float]]) -> list[ScoreConfig]:
+    """Every combination of the listed values, on top of `base`."""
+    names = list(space)
+    out = []
+    for values in itertools.product(*(space[n] for n in names)):
+        cfg = copy.deepcopy(base)
+        for n, v in zip(names, values):
+            set_param(cfg, n, v)
+        out.append(_normalised(cfg))
+    return out
+
+
+def random_configs(
+    base: ScoreConfig, space: dict[str, Any], n: int, seed: int = 0
+) -> list[ScoreConfig]:
+    """`n` configs with each parameter drawn from its list or {"min", "max"} range."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        cfg = copy.deepcopy(base)
+        for name, spec in space.items():
+            if isinstance(spec, dict):
+                set_param(cfg, name, rng.uniform(float(spec["min"]), float(spec["max"])))
+            else:
+                set_param(cfg, name, rng.choice(list(spec)))
+        out.append(_normalised(cfg))
+    return out
+
+
+# search space over every tunable parameter, for benchmarks and tests
+SEARCH_SPACE: dict[str, Any] = {
+    "weights.C": {"min": 0.05, "max": 0.4}, "weights.H": {"min": 0.05, "max": 0.4},
+    "color.dMin": {"min": 2, "max": 15}, "color.dMax": {"min": 20, "max": 50},
+    "color.tauH": {"min": 3, "max": 20}, "pattern.strong": {"min": 0.5, "max": 0.8},
+    "pattern.mild": {"min": 0.1, "max": 0.45}, "texture.glossBonus": [0.0, 0.1, 0.2],
+    "highlight.zThreshold": {"min": 0.5, "max": 1.5},
+    "proportion.idealTop": {"min": 0.25, "max": 0.45}, "proportion.tolerance": {"min": 0.1, "max": 0.3},
+}
+
+
+def random_outfits(n: int, seed: int = 0) -> list[OutfitFeatures]:
+    """`n` synthetic, valid OutfitFeatures (deterministic for a seed), for benchmarks and tests."""
+    rng = random.Random(seed)
+    mats = ["denim", "cotton", "wool", "knit", "leather", "satin", "silk", "synthetic"]
+    types = ["top", "bottom", "outer", "accessory", "shoes"]
+    out = []
+    for i in range(n):
+        garments = [{
+            "id": f"g{j}", "type": rng.choice(types), "areaPct": rng.uniform(0.02, 0.4),
+            "colorLAB": (rng.uniform(20, 80), rng.uniform(-30, 30), rng.uniform(-30, 30)),
+            "material": rng.choice(mats), "patternType": rng.choice(["none", "plaid", "stripe"]),
+            "patternStrength": rng.random(), "glossIndex": rng.random(),
+        } for j in range(rng.randint(1, 5))]
+        clusters = [{"lab": (rng.uniform(20, 80), rng.uniform(-30, 30), rng.uniform(-30, 30)),
+                     "pct": rng.random()} for _ in range(rng.randint(1, 4))]
+        out.append({
+            "outfitId": f"o{i}", "garments": garments, "colorClusters": clusters,
+            "thirdsArea": {"top": rng.random(), "mid": 0.3, "bottom": rng.random() * (i % 7 != 0)},
+            "domainZ": {k: rng.uniform(-1, 2) for k in ("skin", "hue", "texture", "pattern")},
+            "body": {"waist": rng.uniform(10, 20), "neck": rng.uniform(40, 80)} if i % 3 == 0 else None,
+            "extractionVersion": "test",
+        })
+    return out  # type: ignore[return-value]
+
+
+class OutfitTable:
+    """Config-independent per-outfit intermediates, as columns over N outfits."""
+
+    def __init__(self, features: Sequence[OutfitFeatures]) -> None:
+        n = len(features)
+        self.n = n
+        self.r = np.zeros(n)           # C: 50/30/20 ratio fit
+        self.dbar = np.zeros(n)        # C: mean pairwise ΔE00 of the top clusters
+        self.tb = np.zeros(n)          # T: base score from the material count
+        self.one_glossy = np.zeros(n, dtype=bool)
+        self.rho = np.zeros(n)         # B: top / (top + bottom)
+        self.b2 = np.full(n, np.nan)   # B: waist/neck echo, NaN without body data
+        self.R = np.zeros(n)
+        zkeys = sorted({k for f in features for k in f["domainZ"]})
+        self.z = np.full((n, len(zkeys)), -np.inf)
+        gmax = max((len(f["garments"]) for f in features), default=0)
+        self.strengths = np.full((n, gmax), np.nan)  # P: patterned garments only
+
+        for i, f in enumerate(features):
+            clusters = sorted(f["colorClusters"], key=lambda c: c["pct"], reverse=True)
+            self._color(i, clusters)
+            garments = f["garments"]
+            s = [g["patternStrength"] for g in garments if g.get("patternType", "none") != "none"]
+            self.strengths[i, : len(s)] = s
+            m = len({g["material"] for g in garments})
+            self.tb[i] = clamp(1.0 - min(abs(m - 2.5), 2.0) / 2.0, 0.0, 1.0)
+            self.one_glossy[i] = sum(1 for g in garments if g.get("glossIndex", 0.0) >= 0.7) == 1
+            for j, k in enumerate(zkeys):
+                if k in f["domainZ"]:
+                    self.z[i, j] = f["domainZ"][k]
+            self._proportion(i, f["thirdsArea"], f.get("body"))
+            self.R[i] = self._repetition(garments, clusters)
+
+    def _color(self, i: int, clusters: list[dict[str, Any]]) -> None:
+        p = [c["pct"] for c in clusters[:3]] + [0.0] * max(0, 3 - len(clusters))
+        total = sum(p)
+        p = [pi / total for pi in p] if total > 0 else [0.5, 0.3, 0.2]
+        self.r[i] = clamp(1.0 - 0.5 * sum(abs(a - b) for a, b in zip(p, (0.5, 0.3, 0.2))), 0.0, 1.0)
+        labs = [c["lab"] for c in clusters[:3]]
+        if len(labs) == 3:
+            self.dbar[i] = (delta_e_00(labs[0], labs[1]) + delta_e_00(labs[0], labs[2])
+                            + delta_e_00(labs[1], labs[2])) / 3.0
+        elif len(labs) == 2:
+            self.dbar[i] = delta_e_00(labs[0], labs[1])
+
+    def _proportion(self, i: int, thirds: dict[str, float], body: dict[str, Any] | None) -> None:
+        top, bottom = thirds.get("top", 0.0), thirds.get("bottom", 0.0)
+        self.rho[i] = math.nan if top + bottom < 1e-6 else top / (top + bottom)
+        if body and body.get("waist") and body.get("neck") and float(body["neck"]) > 0:
+            wn = float(body["waist"]) / float(body["neck"])
+            self.b2[i] = clamp(math.exp(-abs(wn - 0.2) / 0.1), 0.0, 1.0)
+
+    @staticmethod
+    def _repetition(garments: list[dict[str, Any]], clusters: list[dict[str, Any]]) -> float:
+        if len(clusters) < 2:
+            return 0.3
+        deltas = [delta_e_00(g["colorLAB"], clusters[1]["lab"])
+                  for g in garments if g.get("type") in ACCESSORY_TYPES]
+        return repetition_from_min_delta(min(deltas)) if deltas else 0.3
+
+    # ------------------------------------------------------------- subscores
+
+    def column(self, name: str, cfg: ScoreConfig) -> np.ndarray:
+        """One subscore for every outfit under `cfg`."""
+        return getattr(self, f"_col_{name}")(cfg)
+
+    def _col_C(self, cfg: ScoreConfig) -> np.ndarray:
+        c = cfg.color
+        h = np.exp(-np.maximum(0.0, self.dbar - c.dMax) / c.tauH) * np.exp(-np.maximum(0.0, c.dMin - self.dbar) / c.tauH)
+        return np.clip(0.7 * self.r + 0.3 * np.clip(h, 0.0, 1.0), 0.0, 1.0)
+
+    def _col_P(self, cfg: ScoreConfig) -> np.ndarray:
+        s = self.strengths
+        with np.errstate(invalid="ignore"):
+            strong = (s >= cfg.pattern.strong).sum(axis=1)
+            mild = ((s >= cfg.pattern.mild) & (s < cfg.pattern.strong)).sum(axis=1)
+        P = np.maximum(0.0, 1.0 - 0.25 * (strong - 1) - 0.15 * mild)
+        P = np.where((strong == 0) & (mild <= 2), 0.7, P)
+        P = np.where((strong == 1) & (mild == 0), 1.0, P)
+        return np.clip(P, 0.0, 1.0)
+
+    def _col_T(self, cfg: ScoreConfig) -> np.ndarray:
+        return np.minimum(1.0, self.tb + np.where(self.one_glossy, cfg.texture.glossBonus, 0.0))
+
+    def _col_H(self, cfg: ScoreConfig) -> np.ndarray:
+        k = (self.z >= cfg.highlight.zThreshold).sum(axis=1)
+        H = np.where(k == 1, 1.0, np.where(k == 0, 0.6, np.maximum(0.0, 1.0 - 0.25 * (k - 1))))
+        return np.clip(H, 0.0, 1.0)
+
+    def _col_B(self, cfg: ScoreConfig) -> np.ndarray:
+        p = cfg.proportion
+        rho = np.where(np.isnan(self.rho), p.idealTop, self.rho)
+        B1 = np.clip(1.0 - np.minimum(np.abs(rho - p.idealTop) / p.tolerance, 1.0), 0.0, 1.0)
+        return np.clip(np.where(np.isnan(self.b2), B1, 0.8 * B1 + 0.2 * self.b2), 0.0, 1.0)
+
+    def _col_R(self, cfg: ScoreConfig) -> np.ndarray:
+        return self.R
+
+
+def rank_average(x: np.ndarray) -> np.ndarray:
+    """Ranks (1-based) with ties sharing their average rank."""
+    order = np.argsort(x, kind="stable")
+    xs = x[order]
+    starts = np.flatnonzero(np.r_[True, xs[1:] != xs[:-1]])
+    ends = np.r_[starts[1:], len(xs)]
+    avg = (starts + ends + 1) / 2.0
+    ranks = np.empty(len(x))
+    ranks[order] = np.repeat(avg, ends - starts)
+    return ranks
+
+
+def _pearson(a: np.ndarray, b: np.ndarray) -> float:
+    a = a - a.mean()
+    b = b - b.mean()
+    den = math.sqrt(float(a @ a) * float(b @ b))
+    return float(a @ b) / den if den > 0 else 0.0
+
+
+@dataclass
+class SweepResult:
+    config: ScoreConfig
+    spearman: float
+    pearson: float
+
+
+def sweep(
+    table: OutfitTable, labels: np.ndarray, configs: Iterable[ScoreConfig], chunk: int = 256
+) -> list[SweepResult]:
+    """
+    Score every config over the table; results sorted by Spearman correlation (best first).
+
+    Configs sharing thresholds are scored `chunk` at a time, so memory stays
+    O(N * chunk) however many weight vectors a group holds.
+    """
+    labels = np.asarray(labels, dtype=np.float64)
+    label_ranks = rank_average(labels)
+    cache: dict[tuple[str, tuple[float, ...]], np.ndarray] = {}
+
+    # group configs that share all thresholds: their scores differ only by weights
+    groups: dict[tuple[float, ...], list[ScoreConfig]] = {}
+    for cfg in configs:
+        key = tuple(get_param(cfg, p) for s in SUBSCORES for p in _PARAMS[s])
+        groups.setdefault(key, []).append(cfg)
+
+    results = []
+    for group in groups.values():
+        cols = []
+        for s in SUBSCORES:
+            ckey = (s, tuple(get_param(group[0], p) for p in _PARAMS[s]))
+            if ckey not in cache:
+                cache[ckey] = table.column(s, group[0])
+            cols.append(cache[ckey])
+        subs = np.stack(cols, axis=1)                                     # (N, 6)
+        for i in range(0, len(group), max(1, chunk)):
+            part = group[i:i + max(1, chunk)]
+            W = np.array([[cfg.weights[s] for s in SUBSCORES] for cfg in part])  # (k, 6)
+            scores = 100.0 * subs @ W.T                                          # (N, k)
+            for j, cfg in enumerate(part):
+                col = scores[:, j]
+                results.append(SweepResult(cfg, _pearson(rank_average(col), label_ranks), _pearson(col, labels)))
+
+    results.sort(key=lambda r: r.spearman, reverse=True)
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Calibrate ScoreConfig against labelled outfits.")
+    ap.add_argument("dataset", help="JSONL with {features, label} per line")
+    ap.add_argument("--space", required=True, help="JSON search space (see module docstring)")
+    ap.add_argument("--random", type=int, default=0, help="sample N configs instead of the full grid")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--config", default=None, help="base config JSON (default: scores-0.1.0)")
+    args = ap.parse_args()
+
+    base = load_config(args.config)
+    with open(args.space, "r") as f:
+        space = json.load(f)
+
+    t0 = time.perf_counter()
+    features, labels = load_labelled(args.dataset)
+    table = OutfitTable(features)
+    t1 = time.perf_counter()
+    configs = random_configs(base, space, args.random, args.seed) if args.random else grid_configs(base, space)
+    results = sweep(table, labels, configs)
+    t2 = time.perf_counter()
+
+    print(f"{len(features)} outfits prepared in {t1 - t0:.1f}s; {len(configs)} configs swept in {t2 - t1:.1f}s")
+    baseline = sweep(table, labels, [base])[0]
+    print(f"base config: spearman={baseline.spearman:.4f} pearson={baseline.pearson:.4f}")
+    for r in results[: args.top]:
+        params = {name: round(get_param(r.config, name), 4) for name in space}
+        if not any(n.startswith("weights.") for n in space):
+            params.update({f"weights.{k}": round(v, 4) for k, v in r.config.weights.items()})
+        print(f"spearman={r.spearman:.4f} pearson={r.pearson:.4f} {json.dumps(params)}")
+
+
+if __name__ == "__main__":
+    main()
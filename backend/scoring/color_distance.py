@@ -112,3 +112,73 @@ def delta_e_00(lab1: tuple[float, float, float], lab2: tuple[float, float, float
     
     return dE00
 
+
+
+def delta_e_00_matrix(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """
+    Vectorized CIEDE2000 between every row of `lab1` (n, 3) and `lab2` (m, 3).
+    
+    Same formula and branch rules as delta_e_00; returns an (n, m) float64 array.
+    """
+    lab1 = np.asarray(lab1, dtype=np.float64).reshape(-1, 3)
+    lab2 = np.asarray(lab2, dtype=np.float64).reshape(-1, 3)
+    L1, a1, b1 = (lab1[:, k][:, None] for k in range(3))
+    L2, a2, b2 = (lab2[:, k][None, :] for k in range(3))
+    
+    C1 = np.sqrt(a1**2 + b1**2)
+    C2 = np.sqrt(a2**2 + b2**2)
+    C_avg = (C1 + C2) / 2.0
+    C_avg7 = C_avg**7
+    G = 0.5 * (1 - np.sqrt(C_avg7 / (C_avg7 + 25**7)))
+    
+    a1_prime = (1 + G) * a1
+    a2_prime = (1 + G) * a2
+    C1_prime = np.sqrt(a1_prime**2 + b1**2)
+    C2_prime = np.sqrt(a2_prime**2 + b2**2)
+    
+    h1_prime = np.degrees(np.arctan2(b1, a1_prime))
+    h2_prime = np.degrees(np.arctan2(b2, a2_prime))
+    h1_prime = np.where(h1_prime < 0, h1_prime + 360, h1_prime)
+    h2_prime = np.where(h2_prime < 0, h2_prime + 360, h2_prime)
+    
+    dL_prime = L2 - L1
+    dC_prime = C2_prime - C1_prime
+    
+    zero_c = (C1_prime * C2_prime) == 0
+    dh = h2_prime - h1_prime
+    dh_prime = np.where(
+        zero_c, 0.0,
+        np.where(np.abs(dh) <= 180, dh, np.where(dh > 180, dh - 360, dh + 360)),
+    )
+    dH_prime = 2 * np.sqrt(C1_prime * C2_prime) * np.sin(np.radians(dh_prime / 2.0))
+    
+    L_avg_prime = (L1 + L2) / 2.0
+    C_avg_prime = (C1_prime + C2_prime) / 2.0
+    
+    h_sum = h1_prime + h2_prime
+    h_avg_prime = np.where(
+        zero_c, h_sum,
+        np.where(
+            np.abs(dh) <= 180, h_sum / 2.0,
+            np.where(h_sum < 360, (h_sum + 360) / 2.0, (h_sum - 360) / 2.0),
+        ),
+    )
+    
+    T = (1 - 0.17 * np.cos(np.radians(h_avg_prime - 30)) +
+         0.24 * np.cos(np.radians(2 * h_avg_prime)) +
+         0.32 * np.cos(np.radians(3 * h_avg_prime + 6)) -
+         0.20 * np.cos(np.radians(4 * h_avg_prime - 63)))
+    
+    dTheta = 30 * np.exp(-((h_avg_prime - 275) / 25)**2)
+    C_avg_prime7 = C_avg_prime**7
+    R_C = 2 * np.sqrt(C_avg_prime7 / (C_avg_prime7 + 25**7))
+    R_T = -np.sin(np.radians(2 * dTheta)) * R_C
+    
+    S_L = 1 + (0.015 * (L_avg_prime - 50)**2) / np.sqrt(20 + (L_avg_prime - 50)**2)
+    S_C = 1 + 0.045 * C_avg_prime
+    S_H = 1 + 0.015 * C_avg_prime * T
+    
+    tL = dL_prime / S_L
+    tC = dC_prime / S_C
+    tH = dH_prime / S_H
+    return np.sqrt(np.maximum(tL**2 + tC**2 + tH**2 + R_T * tC * tH, 0.0))
@@ -0,0 +1,328 @@
+"""
+LAB nearest-color index for CIEDE2000 lookups over large garment inventories.
+
+Answers "which items lie within ΔE00 r of this color" and "the k nearest items"
+without scanning the whole catalog. Items live on a uniform grid over Euclidean
+LAB; a query gathers the cells that can contain a match, drops candidates with
+a cheap per-item Euclidean test, and re-ranks the survivors with the exact
+vectorized CIEDE2000.
+
+The prefilter never drops a true match. From the CIEDE2000 definition
+(ΔE00² = x² + y² + z² + R_T·y·z with |R_T| ≤ √3):
+
+    |ΔL|  ≤ S_L · ΔE00
+    |Δab| ≤ S_C(C̄') · ΔE00 / sqrt(1 - √3/2)
+
+since |Δab| ≤ sqrt(ΔC'² + ΔH'²), S_C ≥ S_H and C̄' ≤ (1 + G)·C̄. `margin`
+replaces the 1/sqrt(1 - √3/2) ≈ 2.73 factor; measured over the sRGB gamut the
+worst case is ≈ 2.1, so a smaller margin trades guaranteed recall for speed.
+
+Updates are in place: an item that stays in its grid cell is overwritten, one
+that moves is tombstoned and appended to an overflow tail that every query
+scans linearly. The grid is rebuilt once the tail or the tombstones grow past
+`rebuild_ratio` of the indexed items.
+"""
+
+from __future__ import annotations
+import math
+from typing import Hashable, Iterable, Optional, Sequence
+
+import numpy as np
+
+from .color_distance import delta_e_00_matrix
+
+RIGOROUS_MARGIN = 1.0 / math.sqrt(1.0 - math.sqrt(3.0) / 2.0)
+
+_L_RANGE = (0.0, 100.0)
+_AB_RANGE = (-128.0, 128.0)
+
+
+def _s_l(l_bar: np.ndarray | float) -> np.ndarray | float:
+    d2 = (np.asarray(l_bar, dtype=np.float64) - 50.0) ** 2
+    return 1.0 + 0.015 * d2 / np.sqrt(20.0 + d2)
+
+
+def _s_c_bound(c_bar: np.ndarray | float) -> np.ndarray | float:
+    """Upper bound on S_C given the mean (unprimed) chroma of the pair."""
+    c = np.asarray(c_bar, dtype=np.float64)
+    c7 = c**7
+    g = 0.5 * (1.0 - np.sqrt(c7 / (c7 + 25.0**7)))
+    return 1.0 + 0.045 * (1.0 + g) * c
+
+
+class LabColorIndex:
+    """
+    Grid index over LAB colors keyed by arbitrary hashable ids.
+
+    Args:
+        cell_l: grid cell size along L*
+        cell_ab: grid cell size along a* and b*
+        margin: a*b* prefilter factor (RIGOROUS_MARGIN keeps results exact)
+        rebuild_ratio: rebuild when tail or tombstones exceed this share of indexed items
+    """
+
+    def __init__(
+        self,
+        cell_l: float = 5.0,
+        cell_ab: float = 8.0,
+        margin: float = RIGOROUS_MARGIN,
+        rebuild_ratio: float = 0.25,
+    ) -> None:
+        self.cell_l = float(cell_l)
+        self.cell_ab = float(cell_ab)
+        self.margin = float(margin)
+        self.rebuild_ratio = float(rebuild_ratio)
+
+        self._nl = int(math.ceil((_L_RANGE[1] - _L_RANGE[0]) / self.cell_l))
+        self._nab = int(math.ceil((_AB_RANGE[1] - _AB_RANGE[0]) / self.cell_ab))
+        # a*b* cell bounds; the outermost cells absorb everything beyond the range
+        edges = _AB_RANGE[0] + self.cell_ab * np.arange(self._nab + 1, dtype=np.float64)
+        edges[0], edges[-1] = -np.inf, np.inf
+        ai, bi = np.divmod(np.arange(self._nab * self._nab), self._nab)
+        self._cell_lo = np.stack([edges[ai], edges[bi]], axis=1)
+        self._cell_hi = np.stack([edges[ai + 1], edges[bi + 1]], axis=1)
+
+        self._clear(capacity=16)
+
+    # ------------------------------------------------------------------ storage
+
+    def _clear(self, capacity: int) -> None:
+        self._lab = np.zeros((capacity, 3), dtype=np.float64)
+        self._chroma = np.zeros(capacity, dtype=np.float64)
+        self._cell = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._ids: list[Optional[Hashable]] = []
+        self._slot: dict[Hashable, int] = {}
+        self._n = 0          # slots in use (alive or tombstoned)
+        self._n_base = 0     # slots [0, n_base) are on the grid, the rest is the tail
+        self._dead = 0
+        self._order = np.zeros(0, dtype=np.int64)
+        self._cell_start = np.zeros(self._nab * self._nab * self._nl + 1, dtype=np.int64)
+        self._cell_cmax = np.zeros(self._nab * self._nab, dtype=np.float64)
+        self._l_min = math.inf
+        self._l_max = -math.inf
+        self.rebuilds = 0
+
+    def _grow(self, need: int) -> None:
+        cap = len(self._alive)
+        if need <= cap:
+            return
+        cap = max(need, cap * 2)
+        for name in ("_lab", "_chroma", "_cell", "_alive"):
+            old = getattr(self, name)
+            new = np.zeros((cap,) + old.shape[1:], dtype=old.dtype)
+            new[: self._n] = old[: self._n]
+            setattr(self, name, new)
+
+    def _cells_of(self, lab: np.ndarray) -> np.ndarray:
+        li = np.clip(((lab[:, 0] - _L_RANGE[0]) // self.cell_l).astype(np.int64), 0, self._nl - 1)
+        ai = np.clip(((lab[:, 1] - _AB_RANGE[0]) // self.cell_ab).astype(np.int64), 0, self._nab - 1)
+        bi = np.clip(((lab[:, 2] - _AB_RANGE[0]) // self.cell_ab).astype(np.int64), 0, self._nab - 1)
+        # L is the fastest axis so one a*b* cell's L range is a contiguous slice
+        return (ai * self._nab + bi) * self._nl + li
+
+    def _rebuild(self) -> None:
+        """Compact tombstones and put every live item on the grid."""
+        keep = np.flatnonzero(self._alive[: self._n])
+        ids = [self._ids[i] for i in keep]
+        lab = self._lab[keep]
+        rebuilds = self.rebuilds
+        self._clear(capacity=max(16, len(keep)))
+        self.rebuilds = rebuilds
+        self._append(ids, lab)
+        self._index_all()
+
+    def _index_all(self) -> None:
+        n = self._n
+        cells = self._cell[:n]
+        self._order = np.argsort(cells, kind="stable")
+        counts = np.bincount(cells, minlength=len(self._cell_start) - 1)
+        self._cell_start = np.concatenate([[0], np.cumsum(counts)])
+        self._cell_cmax = np.zeros(self._nab * self._nab, dtype=np.float64)
+        np.maximum.at(self._cell_cmax, cells // self._nl, self._chroma[:n])
+        self._n_base = n
+        self.rebuilds += 1
+
+    def _append(self, ids: Sequence[Hashable], lab: np.ndarray) -> None:
+        m = len(ids)
+        self._grow(self._n + m)
+        s = slice(self._n, self._n + m)
+        self._lab[s] = lab
+        self._chroma[s] = np.hypot(lab[:, 1], lab[:, 2])
+        self._cell[s] = self._cells_of(lab)
+        self._alive[s] = True
+        for k, item_id in enumerate(ids):
+            self._slot[item_id] = self._n + k
+        self._ids.extend(ids)
+        self._n += m
+        if m:
+            self._l_min = min(self._l_min, float(lab[:, 0].min()))
+            self._l_max = max(self._l_max, float(lab[:, 0].max()))
+
+    def _maybe_rebuild(self) -> None:
+        limit = self.rebuild_ratio * max(self._n_base, 64)
+        if self._n - self._n_base > limit or self._dead > limit:
+            self._rebuild()
+
+    # --------------------------------------------------------------- mutation
+
+    def bulk_load(self, ids: Sequence[Hashable], labs: Iterable[Sequence[float]]) -> None:
+        """Replace the contents of the index with `ids` / `labs` (n, 3)."""
+        lab = np.asarray(labs, dtype=np.float64).reshape(-1, 3)
+        ids = list(ids)
+        if len(ids) != len(lab):
+            raise ValueError(f"got {len(ids)} ids for {len(lab)} colors")
+        if len(set(ids)) != len(ids):
+            raise ValueError("duplicate ids in bulk_load")
+        self._clear(capacity=max(16, len(ids)))
+        self._append(ids, lab)
+        self._index_all()
+
+    def upsert(self, item_id: Hashable, lab: Sequence[float]) -> None:
+        """Insert `item_id` or move it to a new color."""
+        row = np.asarray(lab, dtype=np.float64).reshape(1, 3)
+        slot = self._slot.get(item_id)
+        if slot is not None:
+            cell = int(self._cells_of(row)[0])
+            if slot >= self._n_base or cell == self._cell[slot]:
+                # tail slot, or still in the same grid cell: overwrite in place
+                self._lab[slot] = row[0]
+                self._chroma[slot] = math.hypot(row[0, 1], row[0, 2])
+                self._cell[slot] = cell
+                if slot < self._n_base:
+                    ab = cell // self._nl
+                    self._cell_cmax[ab] = max(self._cell_cmax[ab], self._chroma[slot])
+                self._l_min = min(self._l_min, float(row[0, 0]))
+                self._l_max = max(self._l_max, float(row[0, 0]))
+                return
+            self._kill(slot)
+        self._append([item_id], row)
+        self._maybe_rebuild()
+
+    def remove(self, item_id: Hashable) -> bool:
+        """Remove `item_id`; returns False if it was not indexed."""
+        slot = self._slot.get(item_id)
+        if slot is None:
+            return False
+        self._kill(slot)
+        self._maybe_rebuild()
+        return True
+
+    def _kill(self, slot: int) -> None:
+        self._alive[slot] = False
+        self._slot.pop(self._ids[slot], None)
+        self._ids[slot] = None
+        self._dead += 1
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self._slot
+
+    def get(self, item_id: Hashable) -> Optional[tuple[float, float, float]]:
+        slot = self._slot.get(item_id)
+        if slot is None:
+            return None
+        L, a, b = self._lab[slot]
+        return (float(L), float(a), float(b))
+
+    # ----------------------------------------------------------------- queries
+
+    def _candidates(self, q: np.ndarray, r: float) -> np.ndarray:
+        """Slots that may lie within ΔE00 `r` of `q` (superset of the true matches)."""
+        if not self._slot:
+            return np.zeros(0, dtype=np.int64)
+        cq = math.hypot(q[1], q[2])
+
+        # |ΔL| ≤ S_L(L̄)·r, with L̄ between the query and the catalog's L extremes
+        far = max(abs((q[0] + self._l_min) / 2 - 50.0), abs((q[0] + self._l_max) / 2 - 50.0))
+        r_l = float(_s_l(50.0 + far)) * r
+
+        parts = []
+        if self._n_base:
+            cmax = self._cell_cmax
+            r_ab = self.margin * r * _s_c_bound((cq + cmax) / 2.0)
+            gap = np.maximum(np.maximum(self._cell_lo - q[1:], q[1:] - self._cell_hi), 0.0)
+            near = np.flatnonzero(np.hypot(gap[:, 0], gap[:, 1]) <= r_ab)
+            li0 = max(int((q[0] - r_l - _L_RANGE[0]) // self.cell_l), 0)
+            li1 = min(int((q[0] + r_l - _L_RANGE[0]) // self.cell_l), self._nl - 1)
+            if near.size and li0 <= li1:
+                base = near * self._nl
+                starts = self._cell_start[base + li0]
+                ends = self._cell_start[base + li1 + 1]
+                lens = ends - starts
+                keep = lens > 0
+                starts, lens = starts[keep], lens[keep]
+                if lens.size:
+                    # concatenated aranges over [starts, ends)
+                    offs = np.repeat(starts - np.concatenate([[0], np.cumsum(lens)[:-1]]), lens)
+                    parts.append(self._order[np.arange(int(lens.sum())) + offs])
+        if self._n > self._n_base:
+            parts.append(np.arange(self._n_base, self._n))
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+
+        cand = np.concatenate(parts)
+        cand = cand[self._alive[cand]]
+        lab = self._lab[cand]
+        d_ab = np.hypot(lab[:, 1] - q[1], lab[:, 2] - q[2])
+        ok = (np.abs(lab[:, 0] - q[0]) <= r_l) & (
+            d_ab <= self.margin * r * _s_c_bound((cq + self._chroma[cand]) / 2.0)
+        )
+        return cand[ok]
+
+    def radius(
+        self, lab: Sequence[float], r: float, limit: Optional[int] = None
+    ) -> list[tuple[Hashable, float]]:
+        """
+        Items within ΔE00 `r` of `lab`, nearest first.
+
+        Returns:
+            [(id, delta_e), ...], at most `limit` entries
+        """
+        q = np.asarray(lab, dtype=np.float64).reshape(3)
+        cand = self._candidates(q, float(r))
+        if cand.size == 0:
+            return []
+        d = delta_e_00_matrix(q, self._lab[cand])[0]
+        hit = d <= r
+        cand, d = cand[hit], d[hit]
+        order = np.lexsort((cand, d))
+        if limit is not None:
+            order = order[:limit]
+        return [(self._ids[cand[i]], float(d[i])) for i in order]
+
+    def knn(
+        self, lab: Sequence[float], k: int, r0: float = 4.0
+    ) -> list[tuple[Hashable, float]]:
+        """
+        The `k` items nearest to `lab` by ΔE00, nearest first.
+
+        Runs radius queries from `r0`, doubling until k matches are found; any
+        item closer than the k-th match lies inside the last radius, so the
+        result is exact.
+        """
+        k = min(int(k), len(self))
+        if k <= 0:
+            return []
+        r = float(r0)
+        while r < 256.0:
+            hits = self.radius(lab, r, limit=k)
+            if len(hits) >= k:
+                return hits
+            r *= 2.0
+        # ΔE00 within the LAB gamut stays far below this; scan everything
+        slots = np.flatnonzero(self._alive[: self._n])
+        d = delta_e_00_matrix(np.asarray(lab, dtype=np.float64), self._lab[slots])[0]
+        order = np.lexsort((slots, d))[:k]
+        return [(self._ids[slots[i]], float(d[i])) for i in order]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "items": len(self),
+            "indexed": self._n_base,
+            "tail": self._n - self._n_base,
+            "tombstones": self._dead,
+            "rebuilds": self.rebuilds,
+        }
@@ -0,0 +1,315 @@
+"""
+Wardrobe outfit optimizer: top-K search over garment combinations.
+
+An outfit is a base (top + bottom, or a dress) plus an optional outer layer and
+an optional accessory. Outfit-level features are derived from the garments by
+`outfit_features_from_garments` (clusters = garment colors weighted by area,
+thirds from top/bottom areas), so every candidate can be checked with
+score_outfit.
+
+Instead of calling score_outfit per combination, the search
+  * precomputes per-garment pattern class, material, gloss and area, and the
+    pairwise CIEDE2000 matrix for the whole wardrobe;
+  * bounds each base from above (exact P and B maxima over the remaining slots,
+    a count-based T bound, C = R = 1, H is constant) and visits bases in
+    bound order, stopping once no remaining base can beat the current K-th best;
+  * scores all outer × accessory completions of a batch of bases at once with
+    NumPy (branch-free versions of the six subscores).
+The final K outfits are rescored with score_outfit, so returned scores are exact.
+"""
+
+from __future__ import annotations
+import heapq
+import itertools
+from dataclasses import dataclass
+from typing import Any, Sequence, TypedDict
+
+import numpy as np
+
+from .types import GarmentFeatures, OutfitFeatures, StyleScore
+from .config import ScoreConfig, load_config
+from .color_distance import delta_e_00_matrix
+from .scorer import ACCESSORY_TYPES, pattern_score_from_counts, score_outfit, texture_score_from_counts
+
+_TOP_THIRD = ("top", "outer")
+
+
+class RankedOutfit(TypedDict):
+    garmentIds: list[str]
+    styleScore: float
+    score: StyleScore
+
+
+@dataclass
+class SearchStats:
+    bases: int = 0            # top×bottom pairs + dresses
+    bases_scored: int = 0     # bases whose completions were scored
+    leaves_scored: int = 0    # full outfits scored (vectorized)
+    combinations: int = 0     # total outfits in the search space
+
+
+def outfit_features_from_garments(
+    garments: Sequence[GarmentFeatures],
+    domain_z: dict[str, float],
+    body: dict[str, Any] | None = None,
+    outfit_id: str = "wardrobe",
+    extraction_version: str = "wardrobe-0.1.0",
+) -> OutfitFeatures:
+    """
+    Derive outfit-level features from a garment set:
+    one color cluster per garment (pct = area share), thirds from top/outer vs bottom area.
+    """
+    total = sum(g["areaPct"] for g in garments)
+    clusters = [
+        {"lab": tuple(g["colorLAB"]), "pct": (g["areaPct"] / total) if total > 0 else 0.0}
+        for g in garments
+    ]
+    clusters.sort(key=lambda c: c["pct"], reverse=True)
+
+    top = sum(g["areaPct"] for g in garments if g["type"] in _TOP_THIRD)
+    bottom = sum(g["areaPct"] for g in garments if g["type"] == "bottom")
+    mid = total - top - bottom
+    if total > 0:
+        thirds = {"top": top / total, "mid": mid / total, "bottom": bottom / total}
+    else:
+        thirds = {"top": 0.33, "mid": 0.34, "bottom": 0.33}
+
+    return {
+        "outfitId": outfit_id,
+        "garments": list(garments),
+        "colorClusters": clusters,  # type: ignore[typeddict-item]
+        "thirdsArea": thirds,  # type: ignore[typeddict-item]
+        "domainZ": domain_z,  # type: ignore[typeddict-item]
+        "body": body,  # type: ignore[typeddict-item]
+        "extractionVersion": extraction_version,
+    }
+
+
+class _Wardrobe:
+    """Column arrays over all garments; index n is the "no garment" sentinel."""
+
+    def __init__(self, garments: Sequence[GarmentFeatures], cfg: ScoreConfig) -> None:
+        n = len(garments)
+        self.n = n
+        has_pattern = np.array([g.get("patternType", "none") != "none" for g in garments] + [False])
+        strength = np.array([float(g.get("patternStrength", 0.0)) for g in garments] + [0.0])
+        self.strong = has_pattern & (strength >= cfg.pattern.strong)
+        self.mild = has_pattern & (strength >= cfg.pattern.mild) & ~self.strong
+
+        mats = {m: i for i, m in enumerate(sorted({g["material"] for g in garments}))}
+        self.material = np.array([mats[g["material"]] for g in garments] + [-1])
+        self.glossy = np.array([g.get("glossIndex", 0.0) >= 0.7 for g in garments] + [False])
+        self.area = np.array([float(g["areaPct"]) for g in garments] + [0.0])
+        types = [g["type"] for g in garments] + [""]
+        self.is_acc = np.array([t in ACCESSORY_TYPES for t in types])
+        self.is_top3 = np.array([t in _TOP_THIRD for t in types])
+        self.is_bottom = np.array([t == "bottom" for t in types])
+
+        lab = np.array([g["colorLAB"] for g in garments], dtype=np.float64).reshape(-1, 3)
+        D = np.zeros((n + 1, n + 1))
+        if n:
+            D[:n, :n] = delta_e_00_matrix(lab, lab)
+        self.D = D
+
+        self.by_type: dict[str, list[int]] = {}
+        for i, t in enumerate(types[:n]):
+            self.by_type.setdefault(t, []).append(i)
+
+
+def _leaf_scores(
+    w: _Wardrobe,
+    idx: np.ndarray,
+    cfg: ScoreConfig,
+    H: float,
+    B2: float | None,
+) -> np.ndarray:
+    """
+    Vectorized style score (0..100, unrounded) for outfits given as garment
+    index tuples: idx (..., 4) with sentinel w.n for empty slots.
+    """
+    n = w.n
+    present = idx != n
+
+    # Pattern balance
+    strong = w.strong[idx].sum(-1)
+    mild = w.mild[idx].sum(-1)
+    P = np.where(
+        (strong == 1) & (mild == 0), 1.0,
+        np.where((strong == 0) & (mild <= 2), 0.7,
+                 np.maximum(0.0, 1.0 - 0.25 * (strong - 1) - 0.15 * mild)),
+    )
+    P = np.clip(P, 0.0, 1.0)
+
+    # Texture mix: unique materials among present slots
+    mats = w.material[idx]
+    m = np.zeros(idx.shape[:-1], dtype=np.int64)
+    for k in range(idx.shape[-1]):
+        new = present[..., k].copy()
+        for j in range(k):
+            new &= ~(present[..., j] & (mats[..., j] == mats[..., k]))
+        m += new
+    glossy = w.glossy[idx].sum(-1)
+    Tb = np.clip(1.0 - np.minimum(np.abs(m - 2.5), 2.0) / 2.0, 0.0, 1.0)
+    T = np.minimum(1.0, Tb + np.where(glossy == 1, cfg.texture.glossBonus, 0.0))
+
+    # Color clusters: garments ordered by area (stable, like sorted() on slot order)
+    area = np.where(present, w.area[idx], -1.0)
+    order = np.argsort(-area, axis=-1, kind="stable")
+    sidx = np.take_along_axis(idx, order, axis=-1)
+    sarea = np.maximum(np.take_along_axis(area, order, axis=-1), 0.0)
+    npres = present.sum(-1)
+
+    p = sarea[..., :3]
+    ptot = p.sum(-1, keepdims=True)
+    fallback = np.array([0.5, 0.3, 0.2])
+    p = np.where(ptot > 0, p / np.where(ptot > 0, ptot, 1.0), fallback)
+    r = np.clip(1.0 - 0.5 * np.abs(p - fallback).sum(-1), 0.0, 1.0)
+
+    c0, c1, c2 = sidx[..., 0], sidx[..., 1], sidx[..., 2]
+    d01 = w.D[c0, c1]
+    dbar = np.where(npres >= 3, (d01 + w.D[c0, c2] + w.D[c1, c2]) / 3.0, np.where(npres == 2, d01, 0.0))
+    h = (np.exp(-np.maximum(0.0, dbar - cfg.color.dMax) / cfg.color.tauH) *
+         np.exp(-np.maximum(0.0, cfg.color.dMin - dbar) / cfg.color.tauH))
+    C = np.clip(0.7 * r + 0.3 * np.clip(h, 0.0, 1.0), 0.0, 1.0)
+
+    # Proportion
+    top = (w.area[idx] * w.is_top3[idx]).sum(-1)
+    bottom = (w.area[idx] * w.is_bottom[idx]).sum(-1)
+    tb = top + bottom
+    rho = np.where(tb < 1e-6, cfg.proportion.idealTop, top / np.where(tb < 1e-6, 1.0, tb))
+    B1 = np.clip(1.0 - np.minimum(np.abs(rho - cfg.proportion.idealTop) / cfg.proportion.tolerance, 1.0), 0.0, 1.0)
+    B = B1 if B2 is None else 0.8 * B1 + 0.2 * B2
+
+    # Repetition: accessory-type slots vs accent (second-largest cluster)
+    acc = present & w.is_acc[idx]
+    deltas = np.where(acc, w.D[idx, c1[..., None]], np.inf)
+    min_delta = deltas.min(-1)
+    R = np.where(min_delta <= 10, 1.0, np.where(min_delta <= 18, 0.7, 0.3))
+    R = np.where((npres < 2) | ~acc.any(-1), 0.3, R)
+
+    W = cfg.weights
+    return 100.0 * (W["C"] * C + W["P"] * P + W["T"] * T + W["H"] * H + W["B"] * B + W["R"] * R)
+
+
+def top_k_outfits(
+    wardrobe: Sequence[GarmentFeatures],
+    k: int = 10,
+    domain_z: dict[str, float] | None = None,
+    body: dict[str, Any] | None = None,
+    cfg: ScoreConfig | None = None,
+    batch_size: int = 32,
+) -> tuple[list[RankedOutfit], SearchStats]:
+    """
+    Best `k` outfits from `wardrobe` by style score (ties broken by search order).
+
+    domain_z: outfit-level highlight z-scores (not derivable from garments);
+    defaults to all zeros, which makes H constant across outfits.
+    """
+    if cfg is None:
+        cfg = load_config()
+    if domain_z is None:
+        domain_z = {"skin": 0.0, "hue": 0.0, "texture": 0.0, "pattern": 0.0}
+
+    w = _Wardrobe(wardrobe, cfg)
+    n = w.n
+    none = n
+    tops, bottoms = w.by_type.get("top", []), w.by_type.get("bottom", [])
+    dresses = w.by_type.get("dress", [])
+    outers = [none] + w.by_type.get("outer", [])
+    accs = [none] + w.by_type.get("accessory", [])
+
+    bases = np.array(
+        [(t, b) for t in tops for b in bottoms] + [(d, none) for d in dresses],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    stats = SearchStats(bases=len(bases), combinations=len(bases) * len(outers) * len(accs))
+    if len(bases) == 0 or k <= 0:
+        return [], stats
+
+    # Constant / exact per-outfit pieces
+    zs = domain_z
+    k_hi = sum(1 for v in zs.values() if v >= cfg.highlight.zThreshold)
+    H = 1.0 if k_hi == 1 else 0.6 if k_hi == 0 else max(0.0, 1.0 - 0.25 * (k_hi - 1))
+    B2: float | None = None
+    if body and body.get("waist") and body.get("neck") and float(body["neck"]) > 0:
+        B2 = float(np.clip(np.exp(-abs(float(body["waist"]) / float(body["neck"]) - 0.2) / 0.1), 0.0, 1.0))
+
+    # Upper bounds per base -------------------------------------------------
+    O = np.array(outers)
+    A = np.array(accs)
+    # achievable (Δstrong, Δmild) and max extra materials / glossy from outer+accessory
+    inc = {
+        (int(w.strong[o]) + int(w.strong[a]), int(w.mild[o]) + int(w.mild[a]))
+        for o in set(O.tolist()) for a in set(A.tolist())
+    }
+    extra_slots = int(len(O) > 1) + int(len(A) > 1)
+
+    s_base = w.strong[bases].sum(-1)
+    m_base = w.mild[bases].sum(-1)
+    P_ub = np.array([
+        max(pattern_score_from_counts(int(s) + ds, int(mm) + dm) for ds, dm in inc)
+        for s, mm in zip(s_base, m_base)
+    ])
+
+    mat_b = w.material[bases]
+    m_base_mats = np.where(bases[:, 1] == none, 1, np.where(mat_b[:, 0] == mat_b[:, 1], 1, 2))
+    g_base = w.glossy[bases].sum(-1)
+    T_ub = np.array([
+        max(texture_score_from_counts(int(mb) + dm, int(gb) + dg, cfg)
+            for dm in range(extra_slots + 1) for dg in range(extra_slots + 1))
+        for mb, gb in zip(m_base_mats, g_base)
+    ])
+
+    # exact B maximum over outer choices (accessories never enter thirds)
+    top0 = (w.area[bases] * w.is_top3[bases]).sum(-1)[:, None] + (w.area[O] * w.is_top3[O])[None, :]
+    bot0 = (w.area[bases] * w.is_bottom[bases]).sum(-1)[:, None]
+    tb = top0 + bot0
+    rho = np.where(tb < 1e-6, cfg.proportion.idealTop, top0 / np.where(tb < 1e-6, 1.0, tb))
+    B1 = np.clip(1.0 - np.minimum(np.abs(rho - cfg.proportion.idealTop) / cfg.proportion.tolerance, 1.0), 0.0, 1.0)
+    B_ub = (B1 if B2 is None else 0.8 * B1 + 0.2 * B2).max(-1)
+
+    W = cfg.weights
+    ub = 100.0 * (W["C"] + W["P"] * P_ub + W["T"] * T_ub + W["H"] * H + W["B"] * B_ub + W["R"])
+    visit = np.argsort(-ub, kind="stable")
+
+    # Branch and bound over bases, vectorized leaves ---------------------------
+    heap: list[tuple[float, int, tuple[int, ...]]] = []
+    counter = itertools.count()
+    grid_o, grid_a = np.meshgrid(O, A, indexing="ij")
+    tail = np.stack([grid_o, grid_a], axis=-1)  # (nO, nA, 2)
+
+    for start in range(0, len(visit), batch_size):
+        chunk = visit[start:start + batch_size]
+        threshold = heap[0][0] if len(heap) >= k else -np.inf
+        chunk = chunk[ub[chunk] > threshold]
+        if chunk.size == 0:
+            break  # bases are visited in bound order: nothing left can enter the top-K
+
+        head = np.broadcast_to(bases[chunk][:, None, None, :], (chunk.size,) + tail.shape)
+        idx = np.concatenate([head, np.broadcast_to(tail, (chunk.size,) + tail.shape)], axis=-1)
+        scores = _leaf_scores(w, idx, cfg, H, B2).reshape(-1)
+        flat_idx = idx.reshape(-1, 4)
+        stats.bases_scored += int(chunk.size)
+        stats.leaves_scored += int(scores.size)
+
+        cand = np.flatnonzero(scores > threshold)
+        if cand.size > k:
+            cand = cand[np.argpartition(-scores[cand], k - 1)[:k]]
+        for c in cand.tolist():
+            entry = (float(scores[c]), -next(counter), tuple(int(i) for i in flat_idx[c] if i != none))
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[0] > heap[0][0]:
+                heapq.heapreplace(heap, entry)
+
+    results: list[RankedOutfit] = []
+    for _, _, combo in sorted(heap, reverse=True):
+        garments = [wardrobe[i] for i in combo]
+        score = score_outfit(outfit_features_from_garments(garments, domain_z, body), cfg)
+        results.append({
+            "garmentIds": [g["id"] for g in garments],
+            "styleScore": score["styleScore"],
+            "score": score,
+        })
+    results.sort(key=lambda r: r["styleScore"], reverse=True)
+    return results, stats
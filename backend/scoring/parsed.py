@@ -0,0 +1,290 @@
+"""
+Parse-once compact representation of OutfitFeatures.
+
+`parse_outfit` validates a request body in one pass and builds a `ParsedOutfit`:
+garment fields as NumPy columns, color clusters as an (n, 3) LAB array plus pct
+(already sorted by pct, descending), thirds / body as plain floats. Every
+scoring function accepts a ParsedOutfit in place of the dict inputs, so the
+REST path never copies the request into OutfitFeatures dicts or re-walks them
+with `.get` lookups per subscore.
+
+Validation errors raise ParseError carrying the JSON path of the bad value,
+e.g. `garments[2].colorLAB[1]: expected a finite number, got 'x'`.
+"""
+
+from __future__ import annotations
+import math
+from typing import Any, Callable
+
+import numpy as np
+
+from .types import OutfitFeatures
+
+__all__ = ["ParseError", "ParsedOutfit", "parse_outfit"]
+
+
+class ParseError(ValueError):
+    """Malformed OutfitFeatures input; `path` locates the offending value."""
+
+    def __init__(self, path: str, message: str) -> None:
+        super().__init__(f"{path}: {message}" if path else message)
+        self.path = path
+        self.message = message
+
+
+class ParsedOutfit:
+    """Array-backed outfit; build with parse_outfit (or from_features)."""
+
+    __slots__ = (
+        "outfit_id", "extraction_version",
+        # garment columns, one entry per garment
+        "garment_ids", "garment_types", "materials", "pattern_types",
+        "area", "lab", "patterned", "pattern_strength", "gloss",
+        # clusters sorted by pct, descending
+        "cluster_lab", "cluster_pct",
+        "thirds", "domain_z", "waist", "neck",
+    )
+
+    outfit_id: str
+    extraction_version: str
+    garment_ids: tuple[str, ...]
+    garment_types: tuple[str, ...]
+    materials: tuple[str, ...]
+    pattern_types: tuple[str, ...]
+    area: np.ndarray              # (n,) float64
+    lab: np.ndarray               # (n, 3) float64
+    patterned: np.ndarray         # (n,) bool, patternType != "none"
+    pattern_strength: np.ndarray  # (n,) float64
+    gloss: np.ndarray             # (n,) float64
+    cluster_lab: np.ndarray       # (k, 3) float64
+    cluster_pct: np.ndarray       # (k,) float64
+    thirds: tuple[float, float, float]  # top, mid, bottom
+    domain_z: dict[str, float]
+    waist: float | None
+    neck: float | None
+
+    def __len__(self) -> int:
+        return len(self.garment_ids)
+
+    @classmethod
+    def from_features(cls, features: OutfitFeatures) -> ParsedOutfit:
+        return parse_outfit(features)  # type: ignore[arg-type]
+
+    def body(self) -> dict[str, float] | None:
+        if self.waist is None and self.neck is None:
+            return None
+        body = {}
+        if self.waist is not None:
+            body["waist"] = self.waist
+        if self.neck is not None:
+            body["neck"] = self.neck
+        return body
+
+    def to_features(self) -> OutfitFeatures:
+        """Back to the dict form (for ScoringSession and other dict consumers)."""
+        labs = self.lab.tolist()
+        return {
+            "outfitId": self.outfit_id,
+            "garments": [
+                {
+                    "id": self.garment_ids[i], "type": self.garment_types[i],  # type: ignore[typeddict-item]
+                    "areaPct": float(self.area[i]), "colorLAB": tuple(labs[i]),
+                    "material": self.materials[i], "patternType": self.pattern_types[i],  # type: ignore[typeddict-item]
+                    "patternStrength": float(self.pattern_strength[i]), "glossIndex": float(self.gloss[i]),
+                }
+                for i in range(len(self))
+            ],
+            "colorClusters": [
+                {"lab": tuple(lab), "pct": pct}  # type: ignore[typeddict-item]
+                for lab, pct in zip(self.cluster_lab.tolist(), self.cluster_pct.tolist())
+            ],
+            "thirdsArea": dict(zip(("top", "mid", "bottom"), self.thirds)),  # type: ignore[typeddict-item]
+            "domainZ": dict(self.domain_z),  # type: ignore[typeddict-item]
+            "body": self.body(),  # type: ignore[typeddict-item]
+            "extractionVersion": self.extraction_version,
+        }
+
+
+# ---------------------------------------------------------------- validators
+#
+# Each field spec compiles to a checker `value -> parsed value`; the object
+# checkers below run a fixed tuple of (key, checker, default) specs, so
+# per-request work is one dict lookup and one call per field. Checkers raise
+# _Invalid without a path; the JSON path is only built when reporting it.
+
+_MISSING = object()
+_NUMBER_TYPES = (int, float)
+
+
+class _Invalid(Exception):
+    def __init__(self, message: str, suffix: str = "") -> None:
+        self.message = message
+        self.suffix = suffix
+
+
+def _number(value: Any) -> float:
+    if type(value) not in _NUMBER_TYPES:  # rejects bool, which subclasses int
+        raise _Invalid(f"expected a finite number, got {value!r}")
+    value = float(value)
+    if not math.isfinite(value):
+        raise _Invalid(f"expected a finite number, got {value!r}")
+    return value
+
+
+def _string(value: Any) -> str:
+    if type(value) is not str:
+        raise _Invalid(f"expected a string, got {value!r}")
+    return value
+
+
+def _id(value: Any) -> str:
+    # ids and versions are coerced like the old handler did (str(...))
+    if type(value) in (str, int):
+        return str(value)
+    raise _Invalid(f"expected a string, got {value!r}")
+
+
+def _unit(value: Any) -> float:
+    v = _number(value)
+    if not 0.0 <= v <= 1.0:
+        raise _Invalid(f"expected a value in [0, 1], got {v}")
+    return v
+
+
+def _lab(value: Any) -> tuple[float, float, float]:
+    if type(value) not in (list, tuple) or len(value) != 3:
+        raise _Invalid(f"expected [L, a, b], got {value!r}")
+    for i, v in enumerate(value):
+        if type(v) not in _NUMBER_TYPES or not math.isfinite(v):
+            raise _Invalid(f"expected a finite number, got {v!r}", f"[{i}]")
+    return (float(value[0]), float(value[1]), float(value[2]))
+
+
+def _obj(value: Any) -> dict[str, Any]:
+    if type(value) is not dict:
+        raise _Invalid(f"expected an object, got {type(value).__name__}")
+    return value
+
+
+def _array(value: Any) -> list[Any]:
+    if type(value) is not list:
+        raise _Invalid(f"expected an array, got {type(value).__name__}")
+    return value
+
+
+def _any(value: Any) -> Any:
+    return value
+
+
+def _join(path: str, key: str) -> str:
+    return f"{path}.{key}" if path else key
+
+
+def _fields(
+    specs: tuple[tuple[str, Callable[[Any], Any], Any], ...],
+) -> Callable[[Any, Callable[[], str]], list[Any]]:
+    """Compile (key, checker, default) specs into one object checker returning values in spec order."""
+
+    def check(value: Any, path: Callable[[], str]) -> list[Any]:
+        if type(value) is not dict:
+            raise ParseError(path(), f"expected an object, got {type(value).__name__}")
+        out = []
+        key = ""
+        try:
+            for key, fn, default in specs:
+                v = value.get(key, _MISSING)
+                if v is _MISSING:
+                    if default is _MISSING:
+                        raise _Invalid("required field is missing")
+                    out.append(default)
+                else:
+                    out.append(fn(v))
+        except _Invalid as e:
+            raise ParseError(_join(path(), key) + e.suffix, e.message) from None
+        return out
+
+    return check
+
+
+_garment = _fields((
+    ("id", _id, _MISSING),
+    ("type", _string, _MISSING),
+    ("areaPct", _unit, _MISSING),
+    ("colorLAB", _lab, _MISSING),
+    ("material", _string, _MISSING),
+    ("patternType", _string, "none"),
+    ("patternStrength", _unit, None),  # required for patterned garments, checked below
+    ("glossIndex", _unit, 0.0),
+))
+_cluster = _fields((("lab", _lab, _MISSING), ("pct", _number, _MISSING)))
+_thirds = _fields((("top", _number, 0.0), ("mid", _number, 0.0), ("bottom", _number, 0.0)))
+_body = _fields((("waist", _number, None), ("neck", _number, None)))
+_top = _fields((
+    ("outfitId", _id, _MISSING),
+    ("garments", _array, _MISSING),
+    ("colorClusters", _array, _MISSING),
+    ("thirdsArea", _obj, _MISSING),
+    ("domainZ", _obj, _MISSING),
+    ("body", _any, None),
+    ("extractionVersion", _id, _MISSING),
+))
+
+
+def parse_outfit(data: Any) -> ParsedOutfit:
+    """Validate an OutfitFeatures JSON body and build a ParsedOutfit; raises ParseError."""
+    outfit_id, garments, clusters, thirds, domain_z, body, version = _top(data, lambda: "")
+
+    ids, types, materials, ptypes = [], [], [], []
+    area, lab, strength, gloss = [], [], [], []
+    for i, g in enumerate(garments):
+        gid, gtype, a, l, mat, pt, ps, gi = _garment(g, lambda: f"garments[{i}]")
+        if ps is None:
+            if pt != "none":
+                raise ParseError(f"garments[{i}].patternStrength", "required field is missing")
+            ps = 0.0
+        ids.append(gid)
+        types.append(gtype)
+        area.append(a)
+        lab.append(l)
+        materials.append(mat)
+        ptypes.append(pt)
+        strength.append(ps)
+        gloss.append(gi)
+
+    cl_lab, cl_pct = [], []
+    for i, c in enumerate(clusters):
+        l, pct = _cluster(c, lambda: f"colorClusters[{i}]")
+        if pct < 0.0:
+            raise ParseError(f"colorClusters[{i}].pct", f"expected a non-negative number, got {pct}")
+        cl_lab.append(l)
+        cl_pct.append(pct)
+
+    top, mid, bottom = _thirds(thirds, lambda: "thirdsArea")
+    z = {}
+    for k, v in domain_z.items():
+        try:
+            z[str(k)] = _number(v)
+        except _Invalid as e:
+            raise ParseError(f"domainZ.{k}", e.message) from None
+    waist, neck = (None, None) if body is None else _body(body, lambda: "body")
+
+    p = ParsedOutfit()
+    p.outfit_id = outfit_id
+    p.extraction_version = version
+    p.garment_ids = tuple(ids)
+    p.garment_types = tuple(types)
+    p.materials = tuple(materials)
+    p.pattern_types = tuple(ptypes)
+    p.area = np.array(area, dtype=np.float64)
+    p.lab = np.array(lab, dtype=np.float64).reshape(-1, 3)
+    p.patterned = np.array([t != "none" for t in ptypes], dtype=bool)
+    p.pattern_strength = np.array(strength, dtype=np.float64)
+    p.gloss = np.array(gloss, dtype=np.float64)
+    order = sorted(range(len(cl_pct)), key=cl_pct.__getitem__, reverse=True)  # stable, like score_outfit
+    p.cluster_lab = np.array([cl_lab[i] for i in order], dtype=np.float64).reshape(-1, 3)
+    p.cluster_pct = np.array([cl_pct[i] for i in order], dtype=np.float64)
+    p.thirds = (top, mid, bottom)
+    p.domain_z = z
+    p.waist = waist
+    p.neck = neck
+    return p
@@ -0,0 +1,134 @@
+"""
+Streaming percentile ranks for style scores ("how does my 72 compare?").
+
+`styleScore` is rounded to 0.1 on [0, 100], so the whole score distribution
+fits in 1001 counters: an exact quantile sketch with fixed memory (8 KB per
+config version) and O(1) updates however many scores are added, instead of an
+approximate t-digest / KLL summary. Ranks are mid-rank percentiles: the share
+of recorded scores below yours plus half of those equal to it.
+
+`ScoreRanks` keeps one histogram per `ScoreConfig.version` (scores under
+different weights are not comparable) and persists them as a compact JSON
+snapshot (zlib-compressed counts).
+"""
+
+from __future__ import annotations
+import base64
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+__all__ = ["ScoreHistogram", "ScoreRanks"]
+
+RESOLUTION = 0.1
+N_BINS = 1001  # 0.0, 0.1, ..., 100.0
+
+
+def _bin(score: float) -> int:
+    return min(max(int(round(score / RESOLUTION)), 0), N_BINS - 1)
+
+
+class ScoreHistogram:
+    """Exact counts of 0.1-rounded scores in [0, 100]."""
+
+    def __init__(self, counts: Optional[np.ndarray] = None) -> None:
+        self.counts = np.zeros(N_BINS, dtype=np.int64) if counts is None else counts.astype(np.int64)
+        self.total = int(self.counts.sum())
+
+    def add(self, score: float, n: int = 1) -> None:
+        self.counts[_bin(score)] += n
+        self.total += n
+
+    def percentile(self, score: float) -> Optional[float]:
+        """Mid-rank percentile (0..100) of `score`; None while empty."""
+        if self.total == 0:
+            return None
+        b = _bin(score)
+        below = int(self.counts[:b].sum())
+        return 100.0 * (below + 0.5 * int(self.counts[b])) / self.total
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Smallest score with at least a `q` share of scores at or below it."""
+        if self.total == 0:
+            return None
+        b = int(np.searchsorted(np.cumsum(self.counts), max(q, 0.0) * self.total, side="left"))
+        return round(min(b, N_BINS - 1) * RESOLUTION, 1)
+
+    def merge(self, other: ScoreHistogram) -> None:
+        self.counts += other.counts
+        self.total += other.total
+
+    def to_snapshot(self) -> str:
+        return base64.b64encode(zlib.compress(self.counts.astype("<u8").tobytes(), 6)).decode()
+
+    @classmethod
+    def from_snapshot(cls, blob: str) -> ScoreHistogram:
+        counts = np.frombuffer(zlib.decompress(base64.b64decode(blob)), dtype="<u8")
+        if counts.shape != (N_BINS,):
+            raise ValueError(f"snapshot has {counts.size} bins, expected {N_BINS}")
+        return cls(counts)
+
+
+class ScoreRanks:
+    """Per-config-version score histograms; thread-safe, optionally persisted to `path`."""
+
+    def __init__(self, path: str | Path | None = None, snapshot_every: int = 1000) -> None:
+        self.path = Path(path) if path is not None else None
+        self.snapshot_every = snapshot_every
+        self._hists: Dict[str, ScoreHistogram] = {}
+        self._lock = threading.Lock()
+        self._dirty = 0
+        if self.path is not None and self.path.exists():
+            self.load(self.path)
+
+    def record(self, version: str, score: float) -> Optional[float]:
+        """Add `score` and return its percentile among all scores for `version` (itself included)."""
+        with self._lock:
+            h = self._hists.get(version)
+            if h is None:
+                h = self._hists[version] = ScoreHistogram()
+            h.add(score)
+            pct = h.percentile(score)
+            self._dirty += 1
+            due = self.path is not None and self._dirty >= self.snapshot_every
+        if due:
+            self.save()
+        return pct
+
+    def percentile(self, version: str, score: float) -> Optional[float]:
+        with self._lock:
+            h = self._hists.get(version)
+            return h.percentile(score) if h is not None else None
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {v: {"count": h.total, "p25": h.quantile(0.25), "median": h.quantile(0.5), "p75": h.quantile(0.75)}
+                    for v, h in self._hists.items()}
+
+    def save(self, path: str | Path | None = None) -> None:
+        """Write a snapshot atomically (to `path` or the configured path)."""
+        target = Path(path) if path is not None else self.path
+        if target is None:
+            return
+        with self._lock:
+            data = {"resolution": RESOLUTION, "versions": {v: h.to_snapshot() for v, h in self._hists.items()}}
+            self._dirty = 0
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, target)
+
+    def load(self, path: str | Path) -> None:
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("resolution") != RESOLUTION:
+            raise ValueError(f"snapshot resolution {data.get('resolution')} != {RESOLUTION}")
+        hists = {v: ScoreHistogram.from_snapshot(blob) for v, blob in data.get("versions", {}).items()}
+        with self._lock:
+            self._hists = hists
@@ -9,6 +9,7 @@ from typing import Any
 from .types import OutfitFeatures, StyleScore
 from .config import ScoreConfig
 from .color_distance import delta_e_00
+from .parsed import ParsedOutfit
 
 
 def clamp(value: float, min_val: float, max_val: float) -> float:
@@ -17,7 +18,7 @@ def clamp(value: float, min_val: float, max_val: float) -> float:
 
 
 def score_color_harmony(
-    color_clusters: list[dict[str, Any]],
+    color_clusters: list[dict[str, Any]] | ParsedOutfit,
     cfg: ScoreConfig
 ) -> tuple[float, dict[str, Any]]:
     """
@@ -28,8 +29,13 @@ def score_color_harmony(
     Returns:
         (score, debug_info)
     """
-    # Extract percentages (should be sorted desc)
-    p = [c["pct"] for c in color_clusters[:3]]
+    # Extract percentages and LAB of the top three clusters (should be sorted desc)
+    if isinstance(color_clusters, ParsedOutfit):
+        p = color_clusters.cluster_pct[:3].tolist()
+        labs = color_clusters.cluster_lab[:3].tolist()
+    else:
+        p = [c["pct"] for c in color_clusters[:3]]
+        labs = [c["lab"] for c in color_clusters[:3]]
     # Pad if less than 3 clusters
     while len(p) < 3:
         p.append(0.0)
@@ -50,13 +56,13 @@ def score_color_harmony(
     r = clamp(r, 0.0, 1.0)
     
     # Hue harmony: average pairwise CIEDE2000 distance
-    if len(color_clusters) >= 3:
-        d01 = delta_e_00(color_clusters[0]["lab"], color_clusters[1]["lab"])
-        d02 = delta_e_00(color_clusters[0]["lab"], color_clusters[2]["lab"])
-        d12 = delta_e_00(color_clusters[1]["lab"], color_clusters[2]["lab"])
+    if len(labs) >= 3:
+        d01 = delta_e_00(labs[0], labs[1])
+        d02 = delta_e_00(labs[0], labs[2])
+        d12 = delta_e_00(labs[1], labs[2])
         dbar = (d01 + d02 + d12) / 3.0
-    elif len(color_clusters) == 2:
-        dbar = delta_e_00(color_clusters[0]["lab"], color_clusters[1]["lab"])
+    elif len(labs) == 2:
+        dbar = delta_e_00(labs[0], labs[1])
     else:
         dbar = 0.0  # single color, no harmony to measure
     
@@ -78,8 +84,20 @@ def score_color_harmony(
     return C, debug
 
 
+def pattern_score_from_counts(strong: int, mild: int) -> float:
+    """Rule of One for patterns, from strong/mild pattern counts."""
+    if strong == 1 and mild == 0:
+        P = 1.0
+    elif strong == 0 and mild <= 2:
+        P = 0.7
+    else:
+        P = max(0.0, 1.0 - 0.25 * (strong - 1) - 0.15 * mild)
+    
+    return clamp(P, 0.0, 1.0)
+
+
 def score_pattern_balance(
-    garments: list[dict[str, Any]],
+    garments: list[dict[str, Any]] | ParsedOutfit,
     cfg: ScoreConfig
 ) -> tuple[float, dict[str, Any]]:
     """
@@ -91,31 +109,37 @@ def score_pattern_balance(
         (score, debug_info)
     """
     # Filter out "none" patterns
-    strengths = [
-        g["patternStrength"]
-        for g in garments
-        if g.get("patternType", "none") != "none"
-    ]
+    if isinstance(garments, ParsedOutfit):
+        strengths = garments.pattern_strength[garments.patterned].tolist()
+    else:
+        strengths = [
+            g["patternStrength"]
+            for g in garments
+            if g.get("patternType", "none") != "none"
+        ]
     
     strong = sum(1 for s in strengths if s >= cfg.pattern.strong)
     mild = sum(1 for s in strengths if cfg.pattern.mild <= s < cfg.pattern.strong)
     
-    if strong == 1 and mild == 0:
-        P = 1.0
-    elif strong == 0 and mild <= 2:
-        P = 0.7
-    else:
-        P = max(0.0, 1.0 - 0.25 * (strong - 1) - 0.15 * mild)
-    
-    P = clamp(P, 0.0, 1.0)
+    P = pattern_score_from_counts(strong, mild)
     
     debug = {"strong": strong, "mild": mild, "total_patterns": len(strengths)}
     
     return P, debug
 
 
+def texture_score_from_counts(m: int, glossy: int, cfg: ScoreConfig) -> float:
+    """Texture mix from unique material count and number of glossy pieces."""
+    # Base score: peaks near 2-3 materials
+    Tb = 1.0 - min(abs(m - 2.5), 2.0) / 2.0
+    Tb = clamp(Tb, 0.0, 1.0)
+    
+    # Gloss contrast bonus: exactly one glossy piece
+    return min(1.0, Tb + (cfg.texture.glossBonus if glossy == 1 else 0.0))
+
+
 def score_texture_mix(
-    garments: list[dict[str, Any]],
+    garments: list[dict[str, Any]] | ParsedOutfit,
     cfg: ScoreConfig
 ) -> tuple[float, dict[str, Any]]:
     """
@@ -126,16 +150,14 @@ def score_texture_mix(
     Returns:
         (score, debug_info)
     """
-    materials = {g["material"] for g in garments}
+    if isinstance(garments, ParsedOutfit):
+        materials = set(garments.materials)
+        glossy = int((garments.gloss >= 0.7).sum())
+    else:
+        materials = {g["material"] for g in garments}
+        glossy = sum(1 for g in garments if g.get("glossIndex", 0.0) >= 0.7)
     m = len(materials)
-    
-    # Base score: peaks near 2-3 materials
-    Tb = 1.0 - min(abs(m - 2.5), 2.0) / 2.0
-    Tb = clamp(Tb, 0.0, 1.0)
-    
-    # Gloss contrast bonus: exactly one glossy piece
-    glossy = sum(1 for g in garments if g.get("glossIndex", 0.0) >= 0.7)
-    T = min(1.0, Tb + (cfg.texture.glossBonus if glossy == 1 else 0.0))
+    T = texture_score_from_counts(m, glossy, cfg)
     
     debug = {"materials": list(materials), "m": m, "glossy": glossy}
     
@@ -143,7 +165,7 @@ def score_texture_mix(
 
 
 def score_highlight_principle(
-    domain_z: dict[str, float],
+    domain_z: dict[str, float] | ParsedOutfit,
     cfg: ScoreConfig
 ) -> tuple[float, dict[str, Any]]:
     """
@@ -154,7 +176,7 @@ def score_highlight_principle(
     Returns:
         (score, debug_info)
     """
-    zs = domain_z
+    zs = domain_z.domain_z if isinstance(domain_z, ParsedOutfit) else domain_z
     k = sum(1 for v in zs.values() if v >= cfg.highlight.zThreshold)
     
     if k == 1:
@@ -172,7 +194,7 @@ def score_highlight_principle(
 
 
 def score_proportion(
-    thirds_area: dict[str, float],
+    thirds_area: dict[str, float] | ParsedOutfit,
     body: dict[str, Any] | None,
     cfg: ScoreConfig
 ) -> tuple[float, dict[str, Any]]:
@@ -180,12 +202,17 @@ def score_proportion(
     Compute Proportion subscore (B).
     
     Implements 33/66 visual ratio and optional waist/neck echo.
+    For a ParsedOutfit, `body` is ignored and read from the outfit.
     
     Returns:
         (score, debug_info)
     """
-    top = thirds_area.get("top", 0.0)
-    bottom = thirds_area.get("bottom", 0.0)
+    if isinstance(thirds_area, ParsedOutfit):
+        body = thirds_area.body()
+        top, _, bottom = thirds_area.thirds
+    else:
+        top = thirds_area.get("top", 0.0)
+        bottom = thirds_area.get("bottom", 0.0)
     
     total = top + bottom
     if total < 1e-6:
@@ -221,44 +248,59 @@ def score_proportion(
     return B, debug
 
 
+# garment types checked for color echo with the accent
+ACCESSORY_TYPES = ("accessory", "shoes", "hat", "bag", "outer")
+
+
+def repetition_from_min_delta(min_delta: float) -> float:
+    """Echo score from the closest accessory-to-accent CIEDE2000 distance."""
+    if min_delta <= 10:
+        return 1.0
+    elif min_delta <= 18:
+        return 0.7
+    return 0.3
+
+
 def score_repetition(
-    garments: list[dict[str, Any]],
-    color_clusters: list[dict[str, Any]]
+    garments: list[dict[str, Any]] | ParsedOutfit,
+    color_clusters: list[dict[str, Any]] | None = None
 ) -> tuple[float, dict[str, Any]]:
     """
     Compute Repetition/Echo subscore (R).
     
     Rewards color echo between accent and accessories.
+    For a ParsedOutfit, clusters are read from the outfit.
     
     Returns:
         (score, debug_info)
     """
-    if len(color_clusters) < 2:
+    parsed = isinstance(garments, ParsedOutfit)
+    n_clusters = len(garments.cluster_pct) if parsed else len(color_clusters or ())
+    if n_clusters < 2:
         return 0.3, {"reason": "insufficient_clusters"}
     
     # Treat cluster 1 (second largest) as accent
-    accent_lab = color_clusters[1]["lab"]
+    accent_lab = garments.cluster_lab[1].tolist() if parsed else color_clusters[1]["lab"]
     
     # Check accessories/secondary pieces
     deltas = []
-    accessory_types = ("accessory", "shoes", "hat", "bag", "outer")
     
-    for g in garments:
-        if g.get("type") in accessory_types:
-            delta = delta_e_00(g["colorLAB"], accent_lab)
-            deltas.append(delta)
+    if parsed:
+        labs = garments.lab.tolist()
+        for i, t in enumerate(garments.garment_types):
+            if t in ACCESSORY_TYPES:
+                deltas.append(delta_e_00(labs[i], accent_lab))
+    else:
+        for g in garments:
+            if g.get("type") in ACCESSORY_TYPES:
+                delta = delta_e_00(g["colorLAB"], accent_lab)
+                deltas.append(delta)
     
     if not deltas:
         return 0.3, {"reason": "no_accessories"}
     
     min_delta = min(deltas)
-    
-    if min_delta <= 10:
-        R = 1.0
-    elif min_delta <= 18:
-        R = 0.7
-    else:
-        R = 0.3
+    R = repetition_from_min_delta(min_delta)
     
     debug = {"min_delta": round(min_delta, 2), "deltas": [round(d, 2) for d in deltas[:5]]}
     
@@ -313,12 +355,12 @@ def explain_subscores(
     return msgs
 
 
-def score_outfit(features: OutfitFeatures, cfg: ScoreConfig | None = None) -> StyleScore:
+def score_outfit(features: OutfitFeatures | ParsedOutfit, cfg: ScoreConfig | None = None) -> StyleScore:
     """
     Compute complete style score for an outfit.
     
     Args:
-        features: OutfitFeatures dictionary
+        features: OutfitFeatures dictionary, or a ParsedOutfit (see scoring.parsed)
         cfg: ScoreConfig (if None, loads default)
     
     Returns:
@@ -329,6 +371,20 @@ def score_outfit(features: OutfitFeatures, cfg: ScoreConfig | None = None) -> St
     if cfg is None:
         cfg = load_config()
     
+    if isinstance(features, ParsedOutfit):
+        # clusters are sorted at parse time
+        C, debug_c = score_color_harmony(features, cfg)
+        P, debug_p = score_pattern_balance(features, cfg)
+        T, debug_t = score_texture_mix(features, cfg)
+        H, debug_h = score_highlight_principle(features, cfg)
+        B, debug_b = score_proportion(features, None, cfg)
+        R, debug_r = score_repetition(features)
+        return compose_style_score(
+            (C, P, T, H, B, R),
+            (debug_c, debug_p, debug_t, debug_h, debug_b, debug_r),
+            cfg,
+        )
+    
     # Ensure color clusters are sorted by pct desc
     clusters = sorted(
         features["colorClusters"],
@@ -344,6 +400,25 @@ def score_outfit(features: OutfitFeatures, cfg: ScoreConfig | None = None) -> St
     B, debug_b = score_proportion(features["thirdsArea"], features.get("body"), cfg)
     R, debug_r = score_repetition(features["garments"], clusters)
     
+    return compose_style_score(
+        (C, P, T, H, B, R),
+        (debug_c, debug_p, debug_t, debug_h, debug_b, debug_r),
+        cfg,
+    )
+
+
+def compose_style_score(
+    subs: tuple[float, float, float, float, float, float],
+    debugs: tuple[dict[str, Any], ...],
+    cfg: ScoreConfig,
+) -> StyleScore:
+    """
+    Combine the six subscores (C, P, T, H, B, R) and their debug dicts
+    into the final StyleScore.
+    """
+    C, P, T, H, B, R = subs
+    debug_c, debug_p, debug_t, debug_h, debug_b, debug_r = debugs
+    
     # Final weighted score
     W = cfg.weights
     S = 100.0 * (
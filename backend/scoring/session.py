@@ -0,0 +1,347 @@
+"""
+Incremental what-if rescoring sessions.
+
+A ScoringSession keeps one outfit's inputs plus the intermediate state behind
+each subscore (pattern strength counts, material counter, per-accessory ΔE00 to
+the accent color, sorted clusters). Patches mark only the inputs they touch as
+dirty, and only subscores depending on those inputs are recomputed. The result
+is identical to calling score_outfit on the patched features.
+"""
+
+from __future__ import annotations
+import copy
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any
+
+from .types import OutfitFeatures, StyleScore
+from .config import ScoreConfig, load_config
+from .color_distance import delta_e_00
+from .scorer import (
+    ACCESSORY_TYPES,
+    compose_style_score,
+    pattern_score_from_counts,
+    repetition_from_min_delta,
+    score_color_harmony,
+    score_highlight_principle,
+    score_proportion,
+    texture_score_from_counts,
+)
+
+# Subscore → inputs it depends on. Garment inputs are split by the fields
+# each subscore reads, so e.g. recoloring a garment never touches P or T.
+SUBSCORE_DEPS: dict[str, frozenset[str]] = {
+    "C": frozenset({"colorClusters"}),
+    "P": frozenset({"garments.pattern"}),
+    "T": frozenset({"garments.texture"}),
+    "H": frozenset({"domainZ"}),
+    "B": frozenset({"thirdsArea", "body"}),
+    "R": frozenset({"garments.echo", "colorClusters"}),
+}
+
+# Garment field → input tag
+GARMENT_FIELD_INPUTS: dict[str, str] = {
+    "patternType": "garments.pattern",
+    "patternStrength": "garments.pattern",
+    "material": "garments.texture",
+    "glossIndex": "garments.texture",
+    "type": "garments.echo",
+    "colorLAB": "garments.echo",
+}
+
+SETTABLE_FIELDS = ("colorClusters", "domainZ", "thirdsArea", "body")
+
+_ORDER = ("C", "P", "T", "H", "B", "R")
+
+
+class ScoringSession:
+    """
+    Stateful scorer for one outfit.
+
+    Patch ops (see apply):
+        {"op": "upsertGarment", "garment": {...}}          add or replace by id
+        {"op": "updateGarment", "id": str, "fields": {...}}
+        {"op": "removeGarment", "id": str}
+        {"op": "set", "field": "domainZ" | "thirdsArea" | "colorClusters" | "body", "value": ...}
+    """
+
+    def __init__(self, features: OutfitFeatures, cfg: ScoreConfig | None = None) -> None:
+        self.cfg = cfg if cfg is not None else load_config()
+        self.lock = threading.Lock()
+        self.outfit_id = str(features["outfitId"])
+        self.extraction_version = str(features["extractionVersion"])
+
+        self._garments: dict[str, dict[str, Any]] = {}
+        self._clusters: list[dict[str, Any]] = []
+        self._domain_z: dict[str, float] = {}
+        self._thirds: dict[str, float] = {}
+        self._body: dict[str, Any] | None = None
+
+        # subscore intermediates
+        self._pattern_class: dict[str, str | None] = {}  # id → "strong" | "mild" | "weak" | None (no pattern)
+        self._pattern_counts: Counter[str] = Counter()
+        self._materials: Counter[str] = Counter()
+        self._glossy: dict[str, bool] = {}
+        self._accent: tuple[float, float, float] | None = None
+        self._echo: dict[str, float] = {}  # accessory id → ΔE00 to accent
+
+        self._subs: dict[str, tuple[float, dict[str, Any]]] = {}
+        self.last_recomputed: list[str] = []
+
+        self._set_clusters(features["colorClusters"])
+        self._domain_z = dict(features["domainZ"])
+        self._thirds = dict(features["thirdsArea"])
+        self._body = copy.deepcopy(features.get("body"))
+        for g in features["garments"]:
+            self._add_garment(dict(g))
+        self._recompute(set(_ORDER))
+
+    # ------------------------------------------------------------------ public
+
+    def result(self) -> StyleScore:
+        subs = tuple(self._subs[k][0] for k in _ORDER)
+        debugs = tuple(dict(self._subs[k][1]) for k in _ORDER)
+        return compose_style_score(subs, debugs, self.cfg)  # type: ignore[arg-type]
+
+    def features(self) -> OutfitFeatures:
+        """Current (patched) features, e.g. to cross-check with score_outfit."""
+        return {
+            "outfitId": self.outfit_id,
+            "garments": [dict(g) for g in self._garments.values()],  # type: ignore[misc]
+            "colorClusters": [dict(c) for c in self._clusters],  # type: ignore[misc]
+            "thirdsArea": dict(self._thirds),  # type: ignore[typeddict-item]
+            "domainZ": dict(self._domain_z),  # type: ignore[typeddict-item]
+            "body": copy.deepcopy(self._body),  # type: ignore[typeddict-item]
+            "extractionVersion": self.extraction_version,
+        }
+
+    def apply(self, ops: list[dict[str, Any]]) -> StyleScore:
+        """
+        Apply ops in order and rescore only affected subscores. Each op is
+        validated against the state left by the ops before it; the batch is
+        atomic: on any error the session is rolled back and ValueError raised.
+        """
+        saved = self._snapshot()
+        dirty: set[str] = set()
+        try:
+            for op in ops:
+                self._validate(op)
+                kind = op["op"]
+                if kind == "upsertGarment":
+                    dirty |= self._upsert_garment(dict(op["garment"]))
+                elif kind == "updateGarment":
+                    merged = {**self._garments[op["id"]], **op["fields"], "id": op["id"]}
+                    dirty |= self._upsert_garment(merged)
+                elif kind == "removeGarment":
+                    dirty |= self._remove_garment(op["id"])
+                else:
+                    dirty |= self._set_field(op["field"], op["value"])
+            self._recompute({k for k, deps in SUBSCORE_DEPS.items() if deps & dirty})
+        except (KeyError, TypeError, ValueError) as e:
+            self._restore(saved)
+            if isinstance(e, ValueError):
+                raise
+            raise ValueError(f"Invalid patch op: {e!r}") from e
+        except BaseException:
+            self._restore(saved)
+            raise
+        return self.result()
+
+    def _snapshot(self) -> dict[str, Any]:
+        # garment / cluster dicts are replaced, never mutated in place: shallow copies suffice
+        return {
+            "_garments": dict(self._garments), "_clusters": list(self._clusters),
+            "_domain_z": self._domain_z, "_thirds": self._thirds, "_body": self._body,
+            "_pattern_class": dict(self._pattern_class), "_pattern_counts": Counter(self._pattern_counts),
+            "_materials": Counter(self._materials), "_glossy": dict(self._glossy),
+            "_accent": self._accent, "_echo": dict(self._echo),
+            "_subs": dict(self._subs), "last_recomputed": list(self.last_recomputed),
+        }
+
+    def _restore(self, saved: dict[str, Any]) -> None:
+        for name, value in saved.items():
+            setattr(self, name, value)
+
+    # ------------------------------------------------------------- validation
+
+    def _validate(self, op: dict[str, Any]) -> None:
+        kind = op.get("op")
+        if kind == "upsertGarment":
+            g = op.get("garment")
+            if not isinstance(g, dict) or not isinstance(g.get("id"), str):
+                raise ValueError("upsertGarment requires garment with string id")
+            missing = [f for f in ("type", "colorLAB", "material", "patternType", "patternStrength") if f not in g]
+            if missing:
+                raise ValueError(f"upsertGarment {g['id']!r} missing fields: {missing}")
+        elif kind in ("updateGarment", "removeGarment"):
+            if op.get("id") not in self._garments:
+                raise ValueError(f"{kind}: unknown garment id {op.get('id')!r}")
+            if kind == "updateGarment" and not isinstance(op.get("fields"), dict):
+                raise ValueError("updateGarment requires a fields object")
+        elif kind == "set":
+            if op.get("field") not in SETTABLE_FIELDS:
+                raise ValueError(f"set: field must be one of {list(SETTABLE_FIELDS)}")
+            if op["field"] != "body" and not isinstance(op.get("value"), (dict, list)):
+                raise ValueError(f"set {op['field']}: value must be an object or list")
+        else:
+            raise ValueError(f"Unknown patch op: {kind!r}")
+
+    # ------------------------------------------------------------ garments
+
+    def _upsert_garment(self, g: dict[str, Any]) -> set[str]:
+        gid = g["id"]
+        old = self._garments.get(gid)
+        if old is None:
+            self._add_garment(g)
+            return {"garments.pattern", "garments.texture", "garments.echo"}
+
+        dirty = {
+            tag for field, tag in GARMENT_FIELD_INPUTS.items()
+            if old.get(field) != g.get(field)
+        }
+        if old.get("type") not in ACCESSORY_TYPES and g.get("type") not in ACCESSORY_TYPES:
+            dirty.discard("garments.echo")  # non-accessories never enter the echo check
+        self._drop_contributions(gid, old)
+        self._garments[gid] = g  # keeps position, like replacing in the list
+        self._add_contributions(gid, g)
+        return dirty
+
+    def _remove_garment(self, gid: str) -> set[str]:
+        old = self._garments.pop(gid)
+        self._drop_contributions(gid, old)
+        return {"garments.pattern", "garments.texture", "garments.echo"}
+
+    def _add_garment(self, g: dict[str, Any]) -> None:
+        self._garments[g["id"]] = g
+        self._add_contributions(g["id"], g)
+
+    def _add_contributions(self, gid: str, g: dict[str, Any]) -> None:
+        cls = self._pattern_class_of(g)
+        self._pattern_class[gid] = cls
+        if cls is not None:
+            self._pattern_counts[cls] += 1
+        self._materials[g["material"]] += 1
+        self._glossy[gid] = g.get("glossIndex", 0.0) >= 0.7
+        if self._accent is not None and g.get("type") in ACCESSORY_TYPES:
+            self._echo[gid] = delta_e_00(g["colorLAB"], self._accent)
+
+    def _drop_contributions(self, gid: str, g: dict[str, Any]) -> None:
+        cls = self._pattern_class.pop(gid, None)
+        if cls is not None:
+            self._pattern_counts[cls] -= 1
+        self._materials[g["material"]] -= 1
+        if self._materials[g["material"]] <= 0:
+            del self._materials[g["material"]]
+        self._glossy.pop(gid, None)
+        self._echo.pop(gid, None)
+
+    def _pattern_class_of(self, g: dict[str, Any]) -> str | None:
+        if g.get("patternType", "none") == "none":
+            return None
+        s = g["patternStrength"]
+        if s >= self.cfg.pattern.strong:
+            return "strong"
+        if self.cfg.pattern.mild <= s:
+            return "mild"
+        return "weak"
+
+    # -------------------------------------------------------------- fields
+
+    def _set_field(self, field: str, value: Any) -> set[str]:
+        if field == "colorClusters":
+            self._set_clusters(value)
+        elif field == "domainZ":
+            self._domain_z = dict(value)
+        elif field == "thirdsArea":
+            self._thirds = dict(value)
+        else:
+            self._body = copy.deepcopy(value)
+        return {field}
+
+    def _set_clusters(self, clusters: list[dict[str, Any]]) -> None:
+        self._clusters = sorted((dict(c) for c in clusters), key=lambda c: c["pct"], reverse=True)
+        accent = tuple(self._clusters[1]["lab"]) if len(self._clusters) >= 2 else None
+        if accent != self._accent:
+            self._accent = accent  # type: ignore[assignment]
+            self._echo = {}
+            if accent is not None:
+                for gid, g in self._garments.items():
+                    if g.get("type") in ACCESSORY_TYPES:
+                        self._echo[gid] = delta_e_00(g["colorLAB"], accent)
+
+    # ----------------------------------------------------------- subscores
+
+    def _recompute(self, keys: set[str]) -> None:
+        cfg = self.cfg
+        for k in _ORDER:
+            if k not in keys:
+                continue
+            if k == "C":
+                self._subs[k] = score_color_harmony(self._clusters, cfg)
+            elif k == "P":
+                strong = self._pattern_counts["strong"]
+                mild = self._pattern_counts["mild"]
+                total = sum(self._pattern_counts.values())
+                self._subs[k] = (
+                    pattern_score_from_counts(strong, mild),
+                    {"strong": strong, "mild": mild, "total_patterns": total},
+                )
+            elif k == "T":
+                m = len(self._materials)
+                glossy = sum(self._glossy.values())
+                self._subs[k] = (
+                    texture_score_from_counts(m, glossy, cfg),
+                    {"materials": list(self._materials), "m": m, "glossy": glossy},
+                )
+            elif k == "H":
+                self._subs[k] = score_highlight_principle(self._domain_z, cfg)
+            elif k == "B":
+                self._subs[k] = score_proportion(self._thirds, self._body, cfg)
+            else:
+                self._subs[k] = self._repetition()
+        self.last_recomputed = [k for k in _ORDER if k in keys]
+
+    def _repetition(self) -> tuple[float, dict[str, Any]]:
+        if self._accent is None:
+            return 0.3, {"reason": "insufficient_clusters"}
+        deltas = [self._echo[gid] for gid in self._garments if gid in self._echo]
+        if not deltas:
+            return 0.3, {"reason": "no_accessories"}
+        min_delta = min(deltas)
+        return repetition_from_min_delta(min_delta), {
+            "min_delta": round(min_delta, 2),
+            "deltas": [round(d, 2) for d in deltas[:5]],
+        }
+
+
+class ScoringSessionStore:
+    """Thread-safe, size-bounded (LRU) registry of scoring sessions."""
+
+    def __init__(self, max_sessions: int = 256) -> None:
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, ScoringSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, features: OutfitFeatures, cfg: ScoreConfig | None = None) -> tuple[str, ScoringSession]:
+        session = ScoringSession(features, cfg)
+        sid = uuid.uuid4().hex
+        with self._lock:
+            self._sessions[sid] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return sid, session
+
+    def get(self, sid: str) -> ScoringSession | None:
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is not None:
+                self._sessions.move_to_end(sid)
+            return session
+
+    def drop(self, sid: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(sid, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
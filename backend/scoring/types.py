@@ -4,7 +4,7 @@ Matches TypeScript interfaces from spec.
 """
 
 from __future__ import annotations
-from typing import Literal, TypedDict, Required, Any
+from typing import Literal, TypedDict, Required, NotRequired, Any
 
 Material = Literal[
     "denim", "cotton", "wool", "knit", "leather", "satin", "silk", "synthetic"
@@ -86,4 +86,5 @@ class StyleScore(TypedDict):
     subscores: StyleScoreSubscores
     explanations: list[str]
     debug: dict[str, Any] | None
+    percentile: NotRequired[float | None]  # added by the server (scoring.percentile.ScoreRanks)
 
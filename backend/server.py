@@ -1,98 +1,307 @@
 # server.py
-import io
-import base64
+import atexit
+import time
 from typing import Any, Dict, List
-from PIL import Image
 import numpy as np
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 
-from services.ai_schemas import PatternRequest
+from services.ai_schemas import PatternRequest, PatternResult
 from preprocess.bg_blur import BgBlur, BgBlurConfig
-from preprocess.utils import clamp_xywh, parse_det, xyxy_to_xywh
+from preprocess.frame_pool import FramePool, decode_data_url_rgb, process_peak_rss_bytes
+from preprocess.person_roi import PersonRoiConfig, offset_boxes, person_roi
+from preprocess.rle import garment_masks
+from preprocess.utils import boxes_to_video_xywh
 from services.ai_client import AIClient
+from services.seg_delta import SegDeltaConfig, SegDeltaEncoder
+from services.capture_hint import CaptureHintConfig
+from services.degrade import DegradeConfig, DegradeController, QualityLevel
+from services.outfit_extract import extract_outfit_features
+from services.sessions import Session, SessionStore
+from services.singleflight import SingleFlight, content_key
+from services.history import HistoryStore
+from services.profiler import StageProfiler
+from detection.cascade import CascadeConfig, CascadeState
+from detection.hot_swap import DetectorHolder, warm_and_check
 from detection.yolo_detector import YoloClothesDetector
+from detection.results import lookup_labels
 from config import defaults
-from scoring import score_outfit, OutfitFeatures, load_config
+from config.threads import (
+    apply_thread_budget, format_report, pin_stage, plan_thread_budget, thread_report,
+)
+from scoring import score_outfit, OutfitFeatures, StyleScore, load_config, ScoringSessionStore, ScoreRanks
+from scoring.parsed import ParseError, parse_outfit
+
+thread_budget = plan_thread_budget(
+    sessions=defaults.THREADS_EXPECTED_SESSIONS,
+    ai_workers=defaults.THREADS_AI_WORKERS,
+    pin=defaults.THREADS_PIN_AFFINITY,
+)
+print(format_report(apply_thread_budget(thread_budget)))
 
 bg_blur = BgBlur(BgBlurConfig(mask_thresh=0.10, ksize=31,
                  dilate=2, erode=0, model_selection=1))
 
-detector = YoloClothesDetector(weights_path=defaults.MODEL_PATH,
+roi_cfg = PersonRoiConfig(pad=defaults.ROI_PAD, imgsz=defaults.ROI_IMGSZ)
+
+cascade_cfg = CascadeConfig(
+    low_imgsz=defaults.CASCADE_LOW_IMGSZ,
+    high_imgsz=defaults.IMGSZ,
+    min_top_conf=defaults.CASCADE_MIN_TOP_CONF,
+    refresh_every=defaults.CASCADE_REFRESH_EVERY,
+) if defaults.CASCADE_ENABLED else None
+
+def load_detector(weights_path) -> YoloClothesDetector:
+    return YoloClothesDetector(weights_path=weights_path,
                                device=defaults.DEVICE, imgsz=defaults.IMGSZ, conf=defaults.CONF_THRESH)
 
-ai_client = AIClient()
+
+def prepare_detector(det: YoloClothesDetector):
+    """Warm every inference size the pipeline uses, then check a live frame (or a blank one)."""
+    canary = sessions.any_latest_frame()
+    if canary is None:
+        canary = np.full((defaults.IMGSZ, defaults.IMGSZ, 3), 114, dtype=np.uint8)
+    sizes = {defaults.IMGSZ, roi_cfg.imgsz} | ({cascade_cfg.low_imgsz} if cascade_cfg is not None else set())
+    return warm_and_check(det, canary, sorted(sizes))
+
+
+# double-buffered so weights can be hot-swapped via /api/admin/detector (see detection/hot_swap.py)
+detectors: DetectorHolder[YoloClothesDetector] = DetectorHolder(
+    load_detector(defaults.MODEL_PATH), source=str(defaults.MODEL_PATH),
+    load=load_detector, prepare=prepare_detector, on_release=YoloClothesDetector.close,
+)
+
+ai_client = AIClient(thread_initializer=lambda: pin_stage("ai"),
+                     budget_s=defaults.VLM_BUDGET_MS / 1000.0,
+                     max_workers=2 * thread_budget.ai_workers)  # room for one hedge per call
 
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": ["http://localhost:5173"]}}, supports_credentials=True)
 
 socketio = SocketIO(app, cors_allowed_origins="*")
 
+score_cfg = load_config()  # read once; restart to pick up config edits
+scoring_sessions = ScoringSessionStore(max_sessions=256)
+score_flight: SingleFlight[StyleScore] = SingleFlight("score")
+score_ranks = ScoreRanks(defaults.SCORE_RANKS_PATH, snapshot_every=defaults.SCORE_RANKS_SNAPSHOT_EVERY)
+atexit.register(score_ranks.save)
+history = HistoryStore(defaults.HISTORY_PATH)
+atexit.register(history.close)
+profiler = StageProfiler()  # armed on demand via /api/admin/profile
+
+
+def with_percentile(result: StyleScore, record: bool = True) -> StyleScore:
+    """Copy of `result` with its percentile among past scores for the same config version."""
+    if record:
+        pct = score_ranks.record(result["version"], result["styleScore"])
+    else:
+        pct = score_ranks.percentile(result["version"], result["styleScore"])
+    return {**result, "percentile": None if pct is None else round(pct, 1)}
+
+degrade = DegradeController(DegradeConfig(
+    target_ms=defaults.DEGRADE_TARGET_MS,
+    max_concurrent=defaults.DEGRADE_MAX_CONCURRENT,
+    max_wait_ms=defaults.DEGRADE_MAX_WAIT_MS,
+    idle_s=defaults.DEGRADE_IDLE_S,
+    enabled=defaults.DEGRADE_ENABLED,
+))
+
+sessions = SessionStore(capture_cfg=CaptureHintConfig(
+    target_ms=defaults.CAPTURE_TARGET_MS,
+    widths=defaults.CAPTURE_WIDTHS,
+    start_width=defaults.CAPTURE_START_WIDTH,
+    quality_min=defaults.CAPTURE_QUALITY_RANGE[0],
+    quality_max=defaults.CAPTURE_QUALITY_RANGE[1],
+    max_fps=defaults.CAPTURE_MAX_FPS,
+))
 
-def segment_frame(arr_rgb: np.ndarray, srcW: int, srcH: int) -> dict:
-    Hd, Wd = arr_rgb.shape[:2]
 
-    arr_rgb_for_det = bg_blur.apply(arr_rgb)
-    dets = detector.predict(arr_rgb_for_det)
+def segment_frame(arr_rgb: np.ndarray, srcW: int, srcH: int, pool: FramePool | None = None,
+                  cascade: CascadeState | None = None, quality: QualityLevel | None = None,
+                  masks: bool = False) -> dict:
+    """masks: add a per-item RLE "mask" over its bbox (see preprocess/rle.py)."""
+    # one detector for the whole pass; a hot swap takes effect from the next frame
+    with detectors.acquire() as detector:
+        return _segment_with(detector, arr_rgb, srcW, srcH, pool, cascade, quality, masks)
 
-    sx = srcW / Wd
-    sy = srcH / Hd
 
-    items: List[Dict] = []
-    for i, d in enumerate(dets):
-        x1, y1, x2, y2, conf, cls_idx = parse_det(d)
+def _segment_with(detector: YoloClothesDetector, arr_rgb: np.ndarray, srcW: int, srcH: int,
+                  pool: FramePool | None, cascade: CascadeState | None,
+                  quality: QualityLevel | None, want_masks: bool) -> dict:
+    Hd, Wd = arr_rgb.shape[:2]
+    blur = quality is None or quality.blur
+    imgsz = quality.imgsz if quality is not None else None
+
+    mask = roi = None
+    if defaults.DETECT_MODE == "roi" and blur:
+        with profiler.stage("blur"):
+            mask = bg_blur.person_mask(arr_rgb, pool)
+            roi = person_roi(mask, roi_cfg)  # None → no usable person, fall back to the blur path
 
-        # det space → video space
-        X1 = x1 * sx
-        Y1 = y1 * sy
-        X2 = x2 * sx
-        Y2 = y2 * sy
+    if roi is not None:
+        # detect on the padded person crop (a view, no copy); skip the full-frame blur
+        x0, y0, x1, y1 = roi
+        with profiler.stage("detect"):
+            dets = detector.predict_arrays(arr_rgb[y0:y1, x0:x1], imgsz=imgsz or roi_cfg.imgsz)
+            boxes = offset_boxes(dets.boxes, x0, y0)
+    else:
+        # the detector reads the pooled composite directly (no copy); under load it gets the raw frame
+        if blur:
+            with profiler.stage("blur"):
+                if want_masks and mask is None:
+                    mask = bg_blur.person_mask(arr_rgb, pool)  # kept for the garment masks below
+                arr_rgb_for_det = bg_blur.apply(arr_rgb, pool, mask=mask)
+        else:
+            arr_rgb_for_det = arr_rgb
+        with profiler.stage("detect"):
+            if imgsz is not None:
+                dets = detector.predict_arrays(arr_rgb_for_det, imgsz=imgsz)
+            elif cascade_cfg is not None:
+                dets = detector.predict_cascade(arr_rgb_for_det, cascade_cfg, cascade)
+            else:
+                dets = detector.predict_arrays(arr_rgb_for_det)
+            boxes = dets.boxes
 
-        x, y, w, h = xyxy_to_xywh(X1, Y1, X2, Y2)
-        x, y, w, h = clamp_xywh(x, y, w, h, srcW, srcH)
+    with profiler.stage("postprocess"):
+        # det space → video space, clamp and size-filter in one vectorized pass
+        xywh, keep = boxes_to_video_xywh(boxes, srcW / Wd, srcH / Hd, srcW, srcH, min_size=8)
+        labels = lookup_labels(detector.label_table, dets.classes)
+        scores = np.round(dets.scores.astype(np.float64), 3)
 
-        if w < 8 or h < 8:
-            continue
+    rles = None
+    if want_masks:
+        with profiler.stage("masks"):
+            if dets.masks is not None:
+                # segmentation weights: instance masks in the detector input's space (ROI crop or frame)
+                rles = garment_masks(dets.boxes, masks=dets.masks, max_side=defaults.SEG_MASK_MAX_SIDE)
+            elif mask is not None:
+                # box-only weights: the box ∩ the selfie person mask
+                rles = garment_masks(boxes, person=mask, max_side=defaults.SEG_MASK_MAX_SIDE)
 
-        label = detector.class_names[cls_idx] if 0 <= cls_idx < len(
-            detector.class_names) else "garment"
-        items.append({
+    items: List[Dict] = [
+        {
             "id": f"g{i}",
-            "bbox": [x, y, w, h],   # already in VIDEO coords
-            "label": label,
-            "score": round(float(conf), 3),
-        })
+            "bbox": xywh[i].tolist(),   # already in VIDEO coords
+            "label": labels[i],
+            "score": float(scores[i]),
+        }
+        for i in np.flatnonzero(keep).tolist()
+    ]
+    if rles is not None:
+        for it, i in zip(items, np.flatnonzero(keep).tolist()):
+            if rles[i] is not None:
+                it["mask"] = rles[i]   # COCO RLE over the item's bbox
 
     # return the **video-native** size
-    return {"width": srcW, "height": srcH, "items": items}
+    return {"width": srcW, "height": srcH, "items": items, "imgsz": dets.imgsz}
+
+
+@socketio.on("seg_protocol")
+def on_seg_protocol(opts: Dict[str, Any]):
+    """
+    opts: { mode: "full" | "delta", encoding?: "arrays" | "msgpack",
+            tolerancePx?: int, keyframeEvery?: int, masks?: bool }
+    Replies with emit("seg_protocol", { mode, encoding, masks }) describing what was enabled.
+    """
+    session = sessions.get(request.sid)  # type: ignore[attr-defined]
+    session.masks = bool(opts.get("masks"))
+    if opts.get("mode") != "delta":
+        session.seg_encoder = None
+        emit("seg_protocol", {"mode": "full", "masks": session.masks})
+        return
+
+    enc = SegDeltaEncoder(SegDeltaConfig(
+        tolerance_px=int(opts.get("tolerancePx", defaults.SEG_DELTA_TOLERANCE_PX)),
+        keyframe_every=int(opts.get("keyframeEvery", defaults.SEG_KEYFRAME_EVERY)),
+        encoding="msgpack" if opts.get("encoding") == "msgpack" else "arrays",
+    ))
+    session.seg_encoder = enc
+    emit("seg_protocol", {"mode": "delta", "encoding": enc.encoding, "masks": session.masks})
+
+
+@socketio.on("connect")
+def on_connect():
+    if not degrade.accepts_sessions():
+        raise ConnectionRefusedError("server busy, try again shortly")
+    # initial hint so the client starts from the server's preferred capture size
+    emit("capture_hint", sessions.get(request.sid).capture.current())  # type: ignore[attr-defined]
+
+
+@socketio.on("disconnect")
+def on_disconnect():
+    sessions.drop(request.sid)  # type: ignore[attr-defined]
+
+
+def emit_segmentation(session: Session, payload: Dict[str, Any], seg: Dict[str, Any]) -> None:
+    enc = session.seg_encoder
+    if enc is None:
+        emit("segmentation", seg)
+    else:
+        enc.ack(payload.get("ack"))
+        emit("segmentation_delta", enc.pack(enc.encode(seg)))
 
 
 @socketio.on("frame")
 def on_frame(payload: Dict[str, Any]):
-    # payload: { "dataUrl": "data:image/webp;base64,...", "srcW": int, "srcH": int }
+    # payload: { "dataUrl": "data:image/webp;base64,...", "srcW": int, "srcH": int, "ack"?: int }
+    session = sessions.get(request.sid)  # type: ignore[attr-defined]
+    pin_stage("pipeline")
     try:
         data_url = payload["dataUrl"]
         srcW = int(payload["srcW"])
         srcH = int(payload["srcH"])
 
-        b64 = data_url.split(",", 1)[1]
-        img = Image.open(io.BytesIO(base64.b64decode(b64))).convert("RGB")
-        arr = np.array(img)  # det-sized array
+        quality = degrade.current()
+        session.frame_index += 1
+        last = session.latest_seg
+        if last is not None and not quality.detects(session.frame_index):
+            # under load: re-send the last result instead of running the pipeline
+            degrade.skipped()
+            emit_segmentation(session, payload, {**last, "quality": quality.name})
+            return
 
-        seg = segment_frame(arr, srcW=srcW, srcH=srcH)
-        emit("segmentation", seg)
+        with degrade.admit() as wait_ms:
+            if wait_ms is None:
+                # no pipeline slot in time: drop the frame rather than queue it
+                emit_segmentation(session, payload, {**last, "quality": quality.name} if last is not None
+                                  else {"width": srcW, "height": srcH, "items": [], "quality": quality.name})
+                return
+            t0 = time.perf_counter()
+            with profiler.frame(), session.frames.frame() as pool:
+                with profiler.stage("decode"):
+                    arr = decode_data_url_rgb(data_url, pool)  # det-sized array
+                seg = segment_frame(arr, srcW=srcW, srcH=srcH, pool=pool, cascade=session.cascade,
+                                    quality=quality, masks=session.masks)
+                seg["quality"] = quality.name
+                session.remember_frame(arr, seg)  # for score_current
+
+                with profiler.stage("emit"):
+                    emit_segmentation(session, payload, seg)
+            elapsed_ms = (time.perf_counter() - t0) * 1000.0
+
+        degrade.observe(wait_ms, elapsed_ms)
+        hint = session.capture.observe(elapsed_ms)
+        if hint is not None:
+            emit("capture_hint", hint)
     except Exception as e:
         emit("segmentation", {"width": 0, "height": 0,
              "items": [], "error": str(e)})
 
 
 @socketio.on("analyze_patterns")
-def on_analyze(items: list[PatternRequest]):
+def on_analyze(items: list[PatternRequest], opts: Dict[str, Any] | None = None):
     """
-    items: [{ id, label, cropDataUrl }]
+    items: [{ id, label, cropDataUrl }], opts?: { stream?: bool, budgetMs?: int }
     Returns: emit("patterns", [{ id, label, pattern, confidence, notes? }])
+    With stream: emit("pattern_result", result) per garment as each call finishes,
+    then emit("patterns_done", [results in input order]).
     """
+    stream = bool((opts or {}).get("stream"))
+    budget_ms = (opts or {}).get("budgetMs")
+    budget_s = float(budget_ms) / 1000.0 if isinstance(budget_ms, (int, float)) and budget_ms > 0 else None
+    session = sessions.get(request.sid)  # type: ignore[attr-defined]
+    done: Dict[str, PatternResult] = {}
     try:
         # basic sanity filter: ignore missing/empty data URLs
         clean: list[PatternRequest] = [
@@ -102,8 +311,16 @@ def on_analyze(items: list[PatternRequest]):
             and isinstance(it.get("cropDataUrl"), str)
             and it["cropDataUrl"].startswith("data:image/")
         ]
-        results = ai_client.analyze_batch(clean, max_concurrency=3)
+        if stream:
+            for res in ai_client.iter_batch(clean, max_concurrency=thread_budget.ai_workers, budget_s=budget_s):
+                done[res["id"]] = res
+                session.remember_patterns([res])
+                emit("pattern_result", res)
+            emit("patterns_done", [done[it["id"]] for it in clean if it["id"] in done])
+            return
+        results = ai_client.analyze_batch(clean, max_concurrency=thread_budget.ai_workers, budget_s=budget_s)
         print(results)
+        session.remember_patterns(results)
         emit("patterns", results)
     except Exception as e:
         # Fall back with per-item errors so the modal can show failures
@@ -114,7 +331,160 @@ def on_analyze(items: list[PatternRequest]):
             "confidence": 0.0,
             "error": f"ServerError: {e}",
         } for i, it in enumerate(items)]
-        emit("patterns", fallback)
+        if not stream:
+            emit("patterns", fallback)
+            return
+        for res in fallback:
+            if res["id"] not in done:
+                emit("pattern_result", res)
+        emit("patterns_done", [done.get(res["id"], res) for res in fallback])
+
+
+@socketio.on("score_current")
+def on_score_current(opts: Dict[str, Any] | None = None):
+    """
+    opts: { outfitId?: str }
+    Scores the session's latest segmented frame in one step: features are extracted
+    server-side (services/outfit_extract.py), reusing cached analyze_patterns results.
+    Replies through the event's acknowledgement with StyleScore & { features } or
+    { error }, so each request gets its own answer.
+    """
+    session = sessions.get(request.sid)  # type: ignore[attr-defined]
+    try:
+        latest = session.latest()
+        if latest is None:
+            return {"error": "no segmented frame yet"}
+        frame, seg, patterns = latest
+        outfit_id = str((opts or {}).get("outfitId") or f"{request.sid}-{int(time.time() * 1000)}")  # type: ignore[attr-defined]
+        features = extract_outfit_features(frame, seg, patterns, outfit_id=outfit_id)
+        if not features["garments"]:
+            return {"error": "no garments detected"}
+        result = with_percentile(score_outfit(features, score_cfg))
+        history.add(parse_outfit(features).to_features(), result)
+        return {**result, "features": features}
+    except Exception as e:
+        return {"error": f"ServerError: {e}"}
+
+
+@app.route("/api/admin/threads", methods=["GET"])
+def api_admin_threads():
+    """Current thread allocation per library (see config/threads.py)."""
+    return jsonify(thread_report()), 200
+
+
+@app.route("/api/admin/buffers", methods=["GET"])
+def api_admin_buffers():
+    """Frame buffer pool metrics per session (see preprocess/frame_pool.py)."""
+    per_session = sessions.frame_metrics()
+    return jsonify({
+        "sessions": per_session,
+        "bytes_held": sum(m["bytes_held"] for m in per_session.values()),
+        "allocations_last_frame": sum(m["allocations_last_frame"] for m in per_session.values()),
+        "process_peak_rss_bytes": process_peak_rss_bytes(),
+    }), 200
+
+
+@app.route("/api/admin/cascade", methods=["GET"])
+def api_admin_cascade():
+    """Detection cascade pass counts per session (see detection/cascade.py)."""
+    return jsonify({"enabled": cascade_cfg is not None, "sessions": sessions.cascade_metrics()}), 200
+
+
+@app.route("/api/admin/singleflight", methods=["GET"])
+def api_admin_singleflight():
+    """Coalesced request counters (see services/singleflight.py)."""
+    return jsonify({"vlm": ai_client.flight.metrics(), "score": score_flight.metrics()}), 200
+
+
+@app.route("/api/admin/score_ranks", methods=["GET"])
+def api_admin_score_ranks():
+    """Recorded score counts and quartiles per config version (see scoring/percentile.py)."""
+    return jsonify(score_ranks.stats()), 200
+
+
+@app.route("/api/admin/history", methods=["GET"])
+def api_admin_history():
+    """Score history writer counters, plus ?version=&top=N best stored scores (see services/history.py)."""
+    out: Dict[str, Any] = {"writer": history.metrics()}
+    version = request.args.get("version", score_cfg.version)
+    n = request.args.get("top", type=int)
+    if n:
+        out["top"] = history.top(version, min(n, 1000))
+    return jsonify(out), 200
+
+
+@app.route("/api/admin/profile", methods=["GET", "POST", "DELETE"])
+def api_admin_profile():
+    """
+    Sampling profiler for on_frame (see services/profiler.py).
+    POST { frames?: int, seconds?: float, intervalMs?: float } arms it (202);
+    GET returns status and per-stage sample counts; DELETE stops a running profile.
+    """
+    if request.method == "POST":
+        body = request.get_json(silent=True) or {}
+        frames, seconds = body.get("frames"), body.get("seconds")
+        interval = body.get("intervalMs")
+        try:
+            status = profiler.start(
+                frames=int(frames) if frames is not None else None,
+                seconds=float(seconds) if seconds is not None else None,
+                interval_s=float(interval) / 1000.0 if interval is not None else None,
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except RuntimeError as e:
+            return jsonify({"error": str(e)}), 409
+        return jsonify(status), 202
+    if request.method == "DELETE":
+        profiler.stop()
+    return jsonify(profiler.status()), 200
+
+
+@app.route("/api/admin/profile/collapsed", methods=["GET"])
+def api_admin_profile_collapsed():
+    """Collapsed stacks of the last profile, for flamegraph.pl / speedscope / inferno."""
+    return Response(profiler.collapsed(), mimetype="text/plain"), 200
+
+
+@app.route("/api/admin/detector", methods=["GET", "POST"])
+def api_admin_detector():
+    """
+    YOLO weight hot swap (see detection/hot_swap.py).
+    POST { weights?: str } loads a file from the models directory (default: MODEL_PATH again),
+    warms and canary-checks it in the background, then swaps it in between frames (202).
+    GET reports the swap state, live generation and weights.
+    """
+    if request.method == "POST":
+        body = request.get_json(silent=True) or {}
+        models_dir = defaults.MODEL_PATH.parent.resolve()
+        weights = (models_dir / str(body.get("weights") or defaults.MODEL_PATH.name)).resolve()
+        if weights.parent != models_dir or not weights.is_file():
+            return jsonify({"error": f"weights must be a file in {defaults.MODEL_PATH.parent}"}), 400
+        try:
+            return jsonify(detectors.swap(str(weights))), 202
+        except RuntimeError as e:
+            return jsonify({"error": str(e)}), 409
+    return jsonify(detectors.report()), 200
+
+
+@app.route("/api/admin/load", methods=["GET"])
+def api_admin_load():
+    """Current degradation level and load counters (see services/degrade.py)."""
+    return jsonify(degrade.metrics()), 200
+
+
+@app.route("/api/admin/vlm", methods=["GET"])
+def api_admin_vlm():
+    """Hedge / retry / budget-fallback counters and current p90 VLM latency (see services/hedge.py)."""
+    return jsonify(ai_client.hedger.metrics()), 200
+
+
+def _features_from_json(data: Dict[str, Any]) -> tuple[OutfitFeatures, str | None]:
+    """Validate the body (see scoring.parsed) and build OutfitFeatures for dict consumers."""
+    try:
+        return parse_outfit(data).to_features(), None
+    except ParseError as e:
+        return None, str(e)  # type: ignore[return-value]
 
 
 @app.route("/api/style/score", methods=["POST"])
@@ -132,31 +502,81 @@ def api_style_score():
         if not data:
             return jsonify({"error": "Missing request body"}), 400
         
-        # Validate required fields
-        required_fields = ["outfitId", "garments", "colorClusters", "thirdsArea", "domainZ", "extractionVersion"]
-        missing = [f for f in required_fields if f not in data]
-        if missing:
-            return jsonify({"error": f"Missing required fields: {missing}"}), 400
+        try:
+            parsed = parse_outfit(data)
+        except ParseError as e:
+            return jsonify({"error": str(e), "path": e.path}), 400
         
-        # Convert to OutfitFeatures (type checking is lenient for API)
-        features: OutfitFeatures = {
-            "outfitId": str(data["outfitId"]),
-            "garments": data["garments"],
-            "colorClusters": data["colorClusters"],
-            "thirdsArea": data["thirdsArea"],
-            "domainZ": data["domainZ"],
-            "body": data.get("body"),
-            "extractionVersion": str(data["extractionVersion"]),
-        }
-        
-        # Score the outfit
-        result = score_outfit(features)
-        
-        return jsonify(result), 200
+        # Score the outfit; identical concurrent bodies (outfitId aside) share one call
+        key = content_key({k: v for k, v in data.items() if k != "outfitId"})
+        result, _ = score_flight.do(key, lambda: score_outfit(parsed, score_cfg))
+        history.add(parsed.to_features(), result)  # canonical form: same features_hash on every path
+
+        return jsonify(with_percentile(result)), 200
         
     except Exception as e:
         return jsonify({"error": f"Scoring failed: {str(e)}"}), 500
 
 
+@app.route("/api/style/session", methods=["POST"])
+def api_style_session_create():
+    """
+    POST /api/style/session
+
+    Body: OutfitFeatures (JSON)
+    Returns: { sessionId, score: StyleScore }
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "Missing request body"}), 400
+        features, err = _features_from_json(data)
+        if err:
+            return jsonify({"error": err}), 400
+
+        sid, session = scoring_sessions.create(features, score_cfg)
+        result = session.result()
+        history.add(features, result)
+        return jsonify({"sessionId": sid, "score": with_percentile(result)}), 201
+
+    except Exception as e:
+        return jsonify({"error": f"Scoring failed: {str(e)}"}), 500
+
+
+@app.route("/api/style/session/<sid>", methods=["PATCH"])
+def api_style_session_patch(sid: str):
+    """
+    PATCH /api/style/session/<sid>
+
+    Body: { ops: [...] } (see scoring.session.ScoringSession)
+    Returns: { sessionId, score: StyleScore, recomputed: ["C", "R", ...] }
+    """
+    session = scoring_sessions.get(sid)
+    if session is None:
+        return jsonify({"error": f"Unknown session: {sid}"}), 404
+    data = request.get_json() or {}
+    ops = data.get("ops")
+    if not isinstance(ops, list):
+        return jsonify({"error": "Body must contain an ops list"}), 400
+    try:
+        with session.lock:
+            score = session.apply(ops)
+            recomputed = session.last_recomputed
+        # edits re-score the same outfit: rank them without recording each step
+        return jsonify({"sessionId": sid, "score": with_percentile(score, record=False),
+                        "recomputed": recomputed}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Scoring failed: {str(e)}"}), 500
+
+
+@app.route("/api/style/session/<sid>", methods=["DELETE"])
+def api_style_session_delete(sid: str):
+    if not scoring_sessions.drop(sid):
+        return jsonify({"error": f"Unknown session: {sid}"}), 404
+    return "", 204
+
+
 if __name__ == "__main__":
     socketio.run(app, host="0.0.0.0", port=5000)
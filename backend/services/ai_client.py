@@ -1,15 +1,19 @@
 from __future__ import annotations
 import os
 import json
-from typing import List
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Callable, Iterator, List, Optional
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from openai import OpenAI, APIConnectionError, RateLimitError, APIStatusError
 
 from .ai_schemas import (
     PatternRequest, PatternResult, GARMENT_SCHEMA, SYSTEM_MSG, USER_INSTRUCTIONS
 )
+from .hedge import Deadline, HedgedCaller
+from .singleflight import SingleFlight, content_key
 
 load_dotenv()
 
@@ -17,25 +21,44 @@ load_dotenv()
 class AIClient:
     """
     Thin wrapper around OpenAI Responses API with Structured Outputs.
+
+    Each batch runs under one latency budget (`budget_s`): calls are hedged and
+    retried within it (see hedge.py), and garments still unanswered when it runs
+    out get the last result for the same crop, or an error result.
     """
 
-    def __init__(self, model: str | None = None, api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        model: str | None = None,
+        api_key: str | None = None,
+        thread_initializer: Callable[[], None] | None = None,
+        budget_s: float = 8.0,
+        max_workers: int = 6,
+    ) -> None:
         self.model = model or os.getenv("WEARWISE_VLM", "gpt-4.1-mini")
         self.client = OpenAI(api_key=api_key)  # reads OPENAI_API_KEY if None
+        self.thread_initializer = thread_initializer  # run once in each worker thread
+        self.budget_s = budget_s
+        # identical (model, label, crop) requests in flight at once share one VLM call
+        self.flight: SingleFlight[PatternResult] = SingleFlight("vlm")
+        self.hedger = HedgedCaller(
+            max_workers=max_workers,
+            retry_on=(APIConnectionError, RateLimitError, APIStatusError),  # includes timeouts
+            thread_initializer=thread_initializer,
+        )
+        # last good result per crop, served when the budget runs out
+        self._recent: OrderedDict[str, PatternResult] = OrderedDict()
+        self._recent_lock = threading.Lock()
+        self._recent_max = 256
 
-    @retry(
-        reraise=True,
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=0.8, min=1, max=8),
-        retry=retry_if_exception_type(
-            (APIConnectionError, RateLimitError, APIStatusError))
-    )
-    def _describe_one(self, req: PatternRequest) -> PatternResult:
+    def _describe_one(self, req: PatternRequest, timeout: Optional[float] = None) -> PatternResult:
         """
         Calls the model for a single garment crop using Structured Outputs
         with json_schema via text.format. Assumes OpenAI SDK >= 1.40.0.
+        One attempt, no SDK retries: `timeout` comes from the batch budget.
         """
-        resp = self.client.responses.create(
+        client = self.client.with_options(timeout=timeout, max_retries=0) if timeout is not None else self.client
+        resp = client.responses.create(
             model=self.model,
             input=[
                 {
@@ -84,32 +107,79 @@ class AIClient:
                 "error": f"ParseError: {type(e).__name__}: {e}",
             }
 
-    def analyze_batch(self, items: List[PatternRequest], max_concurrency: int = 3) -> List[PatternResult]:
+    def iter_batch(self, items: List[PatternRequest], max_concurrency: int = 3,
+                   budget_s: Optional[float] = None) -> Iterator[PatternResult]:
         """
-        Simple bounded concurrency without asyncio—good enough for Socket.IO handler.
+        Yield each item's result as soon as its call finishes (completion order), so
+        callers can stream results; time to first result is the fastest call's.
+        All items share one deadline of `budget_s` (default: the client's budget),
+        and at most `max_concurrency` of them have a VLM call out at once (plus its
+        hedge, if any). The attempts run on the hedger's shared pool, driven from
+        the iterating thread.
         """
-        results: List[PatternResult] = []
         if not items:
-            return results
+            return
+        deadline = Deadline(self.budget_s if budget_s is None else budget_s)
+        keys = [content_key(self.model, req["label"], req["cropDataUrl"]) for req in items]
+        calls, leading = [], set()
+        for i, (req, key) in enumerate(zip(items, keys)):
+            # identical crops already in flight (here or in another batch) share that call
+            future, leader = self.flight.join(key)
+            if leader:
+                leading.add(i)
+            calls.append((partial(self._describe_one, req) if leader else future,
+                          self._fallback(req, key, deadline)))
+        try:
+            for i, res, err in self.hedger.call_many(calls, deadline, max_in_flight=max_concurrency):
+                req = items[i]
+                if i in leading:
+                    leading.discard(i)
+                    if err is None and "error" not in res and "fallback" not in res:
+                        self._remember(keys[i], res)
+                    self.flight.settle(keys[i], res, err)
+                if err is not None:
+                    res = _error_result(req, err)
+                # a shared result carries the leader's id
+                yield {**res, "id": req["id"], "label": req["label"]}
+        finally:
+            # abandoned mid-batch: release anyone waiting on calls this batch was running
+            for i in leading:
+                self.flight.settle(keys[i], error=RuntimeError("VLM batch abandoned"))
 
-        # small worker pool using threads
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        with ThreadPoolExecutor(max_workers=max_concurrency) as ex:
-            futs = [ex.submit(self._safe_call, req) for req in items]
-            for f in as_completed(futs):
-                results.append(f.result())
-        # preserve input order (optional)
-        by_id = {r["id"]: r for r in results}
+    def analyze_batch(self, items: List[PatternRequest], max_concurrency: int = 3,
+                      budget_s: Optional[float] = None) -> List[PatternResult]:
+        """
+        Simple bounded concurrency without asyncio—good enough for Socket.IO handler.
+        """
+        by_id = {r["id"]: r for r in self.iter_batch(items, max_concurrency, budget_s)}
+        # preserve input order
         return [by_id[i["id"]] for i in items if i["id"] in by_id]
 
-    def _safe_call(self, req: PatternRequest) -> PatternResult:
-        try:
-            return self._describe_one(req)
-        except Exception as e:
-            return {
-                "id": req["id"],
-                "label": req["label"],
-                "pattern": "other",
-                "confidence": 0.0,
-                "error": f"{type(e).__name__}: {e}",
-            }
+    def _fallback(self, req: PatternRequest, key: str,
+                  deadline: Deadline) -> Callable[[Optional[BaseException]], PatternResult]:
+        def fallback(err: Optional[BaseException]) -> PatternResult:
+            with self._recent_lock:
+                cached = self._recent.get(key)
+            if cached is not None:
+                return {**cached, "id": req["id"], "label": req["label"], "fallback": "cache"}
+            reason = f"{type(err).__name__}: {err}" if err is not None else \
+                f"DeadlineExceeded: no answer within {deadline.budget_s:.1f}s"
+            return {"id": req["id"], "label": req["label"], "pattern": "other", "confidence": 0.0, "error": reason}
+        return fallback
+
+    def _remember(self, key: str, res: PatternResult) -> None:
+        with self._recent_lock:
+            self._recent[key] = res
+            self._recent.move_to_end(key)
+            while len(self._recent) > self._recent_max:
+                self._recent.popitem(last=False)
+
+
+def _error_result(req: PatternRequest, e: BaseException) -> PatternResult:
+    return {
+        "id": req["id"],
+        "label": req["label"],
+        "pattern": "other",
+        "confidence": 0.0,
+        "error": f"{type(e).__name__}: {e}",
+    }
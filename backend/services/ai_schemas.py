@@ -18,6 +18,7 @@ class PatternResult(TypedDict, total=False):
     confidence: float
     notes: str | None
     error: str
+    fallback: str  # "cache": latency budget ran out, last result for the same crop
 
 GARMENT_SCHEMA = {
     "type": "object",
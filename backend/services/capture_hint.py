@@ -0,0 +1,79 @@
+"""
+Server-driven capture hints (backpressure for the client frame loop).
+
+Each session measures its own per-frame processing latency. When it drifts
+away from the target budget, the controller steps the recommended capture
+width along a fixed ladder and scales WebP quality / max fps, and the server
+emits a `capture_hint` {width, quality, maxFps} the client follows.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional, Tuple, TypedDict
+
+
+class CaptureHint(TypedDict):
+    width: int
+    quality: float
+    maxFps: int
+
+
+@dataclass
+class CaptureHintConfig:
+    target_ms: float = 90.0                              # per-frame processing budget
+    widths: Tuple[int, ...] = (320, 480, 640, 800, 960)  # capture width ladder
+    start_width: int = 640
+    quality_min: float = 0.6
+    quality_max: float = 0.85
+    max_fps: int = 30
+    min_fps: int = 5
+    alpha: float = 0.2         # EWMA smoothing of measured latency
+    step_down: float = 1.2     # ewma > target*step_down → smaller frames
+    step_up: float = 0.6       # ewma < target*step_up → sharper frames
+    settle_frames: int = 10    # frames to observe after a width change
+
+
+class CaptureController:
+    """Per-session latency tracker that turns measurements into hints."""
+
+    def __init__(self, cfg: CaptureHintConfig = CaptureHintConfig()) -> None:
+        self.cfg = cfg
+        self.level = min(range(len(cfg.widths)), key=lambda i: abs(cfg.widths[i] - cfg.start_width))
+        self.ewma_ms: Optional[float] = None
+        self._since_change = 0
+        self._last: Optional[CaptureHint] = None
+
+    def observe(self, elapsed_ms: float) -> Optional[CaptureHint]:
+        """Record one frame's processing time; returns a hint only when it changed."""
+        c = self.cfg
+        if self.ewma_ms is None:
+            self.ewma_ms = elapsed_ms
+        else:
+            self.ewma_ms = c.alpha * elapsed_ms + (1.0 - c.alpha) * self.ewma_ms
+        self._since_change += 1
+
+        if self._since_change >= c.settle_frames:
+            if self.ewma_ms > c.target_ms * c.step_down and self.level > 0:
+                self.level -= 1
+                self._since_change = 0
+            elif self.ewma_ms < c.target_ms * c.step_up and self.level < len(c.widths) - 1:
+                self.level += 1
+                self._since_change = 0
+
+        hint = self.current()
+        if hint == self._last:
+            return None
+        self._last = hint
+        return hint
+
+    def current(self) -> CaptureHint:
+        c = self.cfg
+        ewma = self.ewma_ms if self.ewma_ms is not None else c.target_ms
+        headroom = min(max((c.target_ms - ewma) / c.target_ms, 0.0), 1.0)
+        quality = c.quality_min + (c.quality_max - c.quality_min) * headroom
+        fps = int(min(max(1000.0 / max(ewma, 1e-3), c.min_fps), c.max_fps))
+        return {
+            "width": c.widths[self.level],
+            "quality": round(quality * 20) / 20,   # 0.05 steps, avoids hint churn
+            "maxFps": fps - fps % 5 if fps >= 10 else fps,
+        }
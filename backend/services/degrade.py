@@ -0,0 +1,181 @@
+"""
+Server-wide graceful degradation under load.
+
+Capture hints (capture_hint.py) shrink each client's frames to fit the
+per-session budget; when the server as a whole is overloaded that is not
+enough. `DegradeController` admits at most `max_concurrent` frames into the
+pipeline at once, measures how long frames wait for a slot plus how long they
+take, and steps a server-wide quality level along a ladder:
+
+    full → no blur → smaller detector input → detect every Nth frame → refuse new sessions
+
+It steps down quickly (`settle_down` frames) when the smoothed wait + latency
+exceeds the target, and back up slowly (`settle_up` frames, below
+`target * step_up`), so it does not flap at the boundary. Frames that would
+wait longer than `max_wait_ms` for a slot are dropped instead of queueing.
+
+Levels only move on observed frames, so a server that has shed every session
+would never see the frame that lets it recover. When no frame has been
+observed for `idle_s`, the level steps back up one rung per `idle_s` of
+silence; `current()` and `accepts_sessions()` check this.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    name: str
+    blur: bool = True                # run BgBlur (and the person mask for ROI mode)
+    imgsz: Optional[int] = None      # fixed detector input size; None = normal (cascade / IMGSZ)
+    detect_every: int = 1            # run the pipeline on every Nth frame, re-send the last result otherwise
+    accept_sessions: bool = True
+
+    def detects(self, frame_index: int) -> bool:
+        return self.detect_every <= 1 or frame_index % self.detect_every == 0
+
+
+DEFAULT_LEVELS: Tuple[QualityLevel, ...] = (
+    QualityLevel("full"),
+    QualityLevel("no_blur", blur=False),
+    QualityLevel("low_res", blur=False, imgsz=416),
+    QualityLevel("skip_frames", blur=False, imgsz=416, detect_every=3),
+    QualityLevel("shed", blur=False, imgsz=320, detect_every=3, accept_sessions=False),
+)
+
+
+@dataclass
+class DegradeConfig:
+    levels: Tuple[QualityLevel, ...] = DEFAULT_LEVELS
+    target_ms: float = 150.0      # smoothed queue wait + processing per frame
+    max_concurrent: int = 2       # frames in the pipeline at once; the rest wait for a slot
+    max_wait_ms: float = 500.0    # drop a frame rather than wait longer than this
+    alpha: float = 0.2            # EWMA smoothing
+    step_up: float = 0.5          # recover only below target * step_up
+    settle_down: int = 10         # frames observed before stepping down again
+    settle_up: int = 60           # frames observed before stepping back up
+    idle_s: float = 5.0           # no frames for this long: step up one level (repeats while idle)
+    enabled: bool = True
+
+
+@dataclass
+class _Stats:
+    frames: int = 0
+    skipped: int = 0
+    dropped: int = 0
+    rejected_sessions: int = 0
+    step_downs: int = 0
+    step_ups: int = 0
+    wait_ms_max: float = 0.0
+
+
+class DegradeController:
+    """Shared by all sessions; thread-safe."""
+
+    def __init__(self, cfg: DegradeConfig = DegradeConfig(),
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if not cfg.levels:
+            raise ValueError("at least one quality level is required")
+        self.cfg = cfg
+        self.level = 0
+        self.ewma_ms: Optional[float] = None
+        self._since_change = 0
+        self._clock = clock
+        self._last_frame = clock()
+        self._lock = threading.Lock()
+        self._gate = threading.BoundedSemaphore(max(1, cfg.max_concurrent))
+        self.stats = _Stats()
+
+    def current(self) -> QualityLevel:
+        if self.level > 0:
+            with self._lock:
+                self._relax()
+        return self.cfg.levels[self.level]
+
+    def accepts_sessions(self) -> bool:
+        ok = self.current().accept_sessions
+        if not ok:
+            with self._lock:
+                self.stats.rejected_sessions += 1
+        return ok
+
+    def _relax(self) -> None:
+        """Step up one level per `idle_s` without frames: an idle server is not overloaded (lock held)."""
+        c = self.cfg
+        now = self._clock()
+        idle = now - self._last_frame
+        if not c.enabled or self.level == 0 or c.idle_s <= 0 or idle < c.idle_s:
+            return
+        steps = min(self.level, int(idle // c.idle_s))
+        self.level -= steps
+        self.stats.step_ups += steps
+        self.ewma_ms = None  # the load that set it is gone; start fresh on the next frame
+        self._since_change = 0
+        self._last_frame = now - (idle - steps * c.idle_s)  # keep the remainder toward the next step
+
+    def skipped(self) -> None:
+        with self._lock:
+            self.stats.skipped += 1
+
+    @contextmanager
+    def admit(self) -> Iterator[Optional[float]]:
+        """Wait for a pipeline slot; yields the wait in ms, or None when the frame should be dropped."""
+        t0 = time.perf_counter()
+        ok = self._gate.acquire(timeout=self.cfg.max_wait_ms / 1000.0)
+        wait_ms = (time.perf_counter() - t0) * 1000.0
+        if not ok:
+            with self._lock:
+                self.stats.dropped += 1
+            # a dropped frame waited the whole max_wait_ms: count it toward the load signal
+            self.observe(wait_ms, 0.0)
+            yield None
+            return
+        try:
+            yield wait_ms
+        finally:
+            self._gate.release()
+
+    def observe(self, wait_ms: float, proc_ms: float) -> Optional[QualityLevel]:
+        """Record one frame's slot wait and processing time; returns the new level when it changed."""
+        c = self.cfg
+        total = wait_ms + proc_ms
+        with self._lock:
+            self._relax()
+            self._last_frame = self._clock()
+            self.stats.frames += 1
+            self.stats.wait_ms_max = max(self.stats.wait_ms_max, wait_ms)
+            self.ewma_ms = total if self.ewma_ms is None else c.alpha * total + (1.0 - c.alpha) * self.ewma_ms
+            self._since_change += 1
+            if not c.enabled:
+                return None
+            if (self.ewma_ms > c.target_ms and self.level < len(c.levels) - 1
+                    and self._since_change >= c.settle_down):
+                self.level += 1
+                self.stats.step_downs += 1
+            elif (self.ewma_ms < c.target_ms * c.step_up and self.level > 0
+                    and self._since_change >= c.settle_up):
+                self.level -= 1
+                self.stats.step_ups += 1
+            else:
+                return None
+            self._since_change = 0
+            return c.levels[self.level]
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            s = self.stats
+            return {
+                "level": self.level,
+                "name": self.cfg.levels[self.level].name,
+                "ewmaMs": round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+                "targetMs": self.cfg.target_ms,
+                "frames": s.frames, "skipped": s.skipped, "dropped": s.dropped,
+                "rejectedSessions": s.rejected_sessions,
+                "stepDowns": s.step_downs, "stepUps": s.step_ups,
+                "waitMsMax": round(s.wait_ms_max, 1),
+            }
@@ -0,0 +1,275 @@
+"""
+Deadline-aware hedged calls for slow remote services (the pattern VLM).
+
+A per-analysis latency budget becomes a `Deadline` shared by every garment's
+call. `HedgedCaller.call` then:
+
+  * gives each attempt the time left in the budget as its timeout;
+  * launches one duplicate (hedge) attempt once the first has run longer than
+    the recent p90 latency, and takes whichever answers first;
+  * retries failed attempts with a short backoff while the budget allows;
+  * returns `fallback(error)` when the budget runs out (error is None on
+    timeout), instead of holding the caller.
+
+`HedgedCaller.call_many` does the same for a whole batch from the calling
+thread, yielding results as they finish; only the attempts themselves take
+executor workers, and at most `max_in_flight` of the batch's calls have
+attempts out at once.
+
+Attempts run on the caller's own executor, which every session shares. An
+attempt takes its timeout from the deadline when a worker starts it, not
+when it is queued, and one that starts with less than `min_attempt_s` left
+returns without calling out at all. So an attempt never runs past the
+deadline, even after waiting behind a saturated pool; an abandoned attempt
+keeps its worker at most until then.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Callable, Deque, Dict, Generic, Iterator, List, Optional, Sequence, Set, Tuple, Type, TypeVar, Union,
+)
+
+T = TypeVar("T")
+
+
+class _Expired(Exception):
+    """An attempt dequeued with too little of the deadline left; `fn` was not called."""
+
+
+class _Call(Generic[T]):
+    """One call's attempts and schedule inside `HedgedCaller.call_many`."""
+
+    def __init__(self, index: int, fn: Union[Callable[[float], T], Future],
+                 fallback: Callable[[Optional[BaseException]], T]) -> None:
+        self.index = index
+        self.fn = fn
+        self.fallback = fallback
+        self.joined = isinstance(fn, Future)  # someone else's call: only waited on
+        self.pending: Set[Future] = {fn} if isinstance(fn, Future) else set()
+        self.started: Dict[Future, float] = {}
+        self.first: Optional[Future] = None
+        self.hedge: Optional[Future] = None
+        self.attempts = 0
+        self.hedge_at: Optional[float] = None  # when to launch the hedge, if still due
+        self.retry_at: Optional[float] = None
+        self.last_error: Optional[BaseException] = None
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+
+
+class Deadline:
+    """Absolute deadline from a budget in seconds (monotonic clock)."""
+
+    def __init__(self, budget_s: float) -> None:
+        self.budget_s = budget_s
+        self.at = time.monotonic() + budget_s
+
+    def remaining(self) -> float:
+        return max(self.at - time.monotonic(), 0.0)
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies (seconds)."""
+
+    def __init__(self, window: int = 200, min_samples: int = 5, default_s: float = 4.0) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.min_samples = min_samples
+        self.default_s = default_s
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        """Nearest-rank quantile; `default_s` until `min_samples` calls have been seen."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.default_s
+            s = sorted(self._samples)
+        return s[min(int(q * len(s)), len(s) - 1)]
+
+
+class HedgedCaller:
+    def __init__(
+        self,
+        max_workers: int = 6,
+        tracker: Optional[LatencyTracker] = None,
+        hedge_quantile: float = 0.9,
+        min_attempt_s: float = 0.25,     # don't start an attempt with less time than this
+        max_attempts: int = 4,           # first try + hedge + retries
+        backoff_s: float = 0.2,          # first retry delay, doubled per retry
+        retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+        thread_initializer: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.tracker = tracker or LatencyTracker()
+        self.hedge_quantile = hedge_quantile
+        self.min_attempt_s = min_attempt_s
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        self.retry_on = retry_on
+        self._ex = ThreadPoolExecutor(max_workers=max_workers, initializer=thread_initializer)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"calls": 0, "hedges": 0, "hedgeWins": 0, "retries": 0, "fallbacks": 0,
+                                      "expired": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _attempt(self, fn: Callable[[float], T], deadline: Deadline) -> T:
+        # read the budget when a worker picks the attempt up, not when it was queued
+        timeout = deadline.remaining()
+        if timeout <= 0 or timeout < self.min_attempt_s:
+            self._count("expired")
+            raise _Expired()
+        return fn(timeout)
+
+    def _launch(self, c: _Call[T], deadline: Deadline, owner: Dict[Future, _Call[T]]) -> Future:
+        c.attempts += 1
+        fut = self._ex.submit(self._attempt, c.fn, deadline)
+        c.started[fut] = time.monotonic()
+        c.pending.add(fut)
+        owner[fut] = c
+        return fut
+
+    def _launch_first(self, c: _Call[T], deadline: Deadline, owner: Dict[Future, _Call[T]]) -> None:
+        c.first = self._launch(c, deadline, owner)
+        if c.hedge is None and c.attempts < self.max_attempts:
+            c.hedge_at = c.started[c.first] + self.tracker.quantile(self.hedge_quantile)
+
+    def _finished(self, c: _Call[T], fut: Future) -> bool:
+        """Account for one of `c`'s attempts finishing; True once `c` has its outcome."""
+        err = fut.exception()
+        if c.joined:
+            c.result, c.error = (None, err) if err is not None else (fut.result(), None)
+            return True
+        if fut is c.first:
+            c.hedge_at = None  # nothing left to hedge
+        if isinstance(err, _Expired):
+            return False  # never ran: neither a result nor an error to report
+        if err is None:
+            self.tracker.observe(time.monotonic() - c.started[fut])
+            if fut is c.hedge:
+                self._count("hedgeWins")
+            c.result = fut.result()
+            return True
+        if not isinstance(err, self.retry_on):
+            c.error = err
+            return True
+        c.last_error = err
+        return False
+
+    def call(
+        self,
+        fn: Callable[[float], T],
+        deadline: Deadline,
+        fallback: Callable[[Optional[BaseException]], T],
+    ) -> T:
+        """`fn(timeout_s)` under `deadline`, hedged and retried; `fallback(last_error)` when out of time."""
+        for _, result, error in self.call_many([(fn, fallback)], deadline):
+            if error is not None:
+                raise error
+            return result  # type: ignore[return-value]
+        raise AssertionError("call_many yields once per call")
+
+    def call_many(
+        self,
+        calls: Sequence[Tuple[Union[Callable[[float], T], Future], Callable[[Optional[BaseException]], T]]],
+        deadline: Deadline,
+        max_in_flight: Optional[int] = None,
+    ) -> Iterator[Tuple[int, Optional[T], Optional[BaseException]]]:
+        """
+        Run several `(fn, fallback)` calls under one deadline, each as `call` would,
+        yielding `(index, result, error)` as each finishes (completion order).
+        `error` is a non-retryable exception raised by `fn`, with `result` None.
+
+        Only attempts occupy the shared executor: the calling thread drives every
+        call's hedge, retries and fallback, and at most `max_in_flight` calls have
+        attempts out at once (the rest start as those finish), each with at most
+        one hedge beside its current attempt. Instead of `fn`, a
+        call may pass a Future already running elsewhere (e.g. a coalesced
+        request); it is only waited on, up to the deadline.
+        """
+        todo = [_Call(i, fn, fallback) for i, (fn, fallback) in enumerate(calls)]
+        owner: Dict[Future, _Call[T]] = {}
+        active = [c for c in todo if c.joined]
+        for c in active:
+            owner[c.fn] = c  # type: ignore[index]
+        queued: Deque[_Call[T]] = deque(c for c in todo if not c.joined)
+        cap = max_in_flight if max_in_flight and max_in_flight > 0 else len(queued)
+
+        def start_queued() -> None:
+            running = sum(not c.joined for c in active)
+            while queued and running < cap:
+                c = queued.popleft()
+                self._count("calls")
+                self._launch_first(c, deadline, owner)
+                active.append(c)
+                running += 1
+
+        start_queued()
+        while active and deadline.remaining() > 0:
+            wake = min([deadline.at] + [t for c in active for t in (c.retry_at, c.hedge_at) if t is not None])
+            wait_s = max(wake - time.monotonic(), 0.0)
+            pending = [f for c in active for f in c.pending]
+            if pending:
+                done, _ = wait(pending, timeout=wait_s, return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(wait_s)  # every active call is backing off
+                done = set()
+
+            finished: List[_Call[T]] = []
+            for fut in done:
+                c = owner.pop(fut)
+                c.pending.discard(fut)
+                if c not in finished and self._finished(c, fut):
+                    finished.append(c)
+
+            now = time.monotonic()
+            for c in active:
+                if c in finished or c.joined:
+                    continue
+                if c.retry_at is not None and now >= c.retry_at:
+                    c.retry_at = None
+                    self._launch_first(c, deadline, owner)
+                    self._count("retries")
+                elif c.hedge_at is not None and now >= c.hedge_at:
+                    # first attempt passed the hedge point
+                    c.hedge_at = None
+                    if deadline.remaining() >= self.min_attempt_s:
+                        c.hedge = self._launch(c, deadline, owner)
+                        self._count("hedges")
+                elif not c.pending and c.retry_at is None:
+                    # every attempt so far failed: back off and retry while the budget allows
+                    delay = self.backoff_s * (2 ** max(c.attempts - 1, 0))
+                    if c.attempts >= self.max_attempts or deadline.remaining() < delay + self.min_attempt_s:
+                        self._count("fallbacks")
+                        c.result = c.fallback(c.last_error)
+                        finished.append(c)
+                    else:
+                        c.retry_at = now + delay
+
+            for c in finished:
+                active.remove(c)
+                for fut in c.pending:
+                    owner.pop(fut, None)  # abandoned: it still ends by the deadline
+            start_queued()
+            for c in finished:
+                yield c.index, c.result, c.error
+
+        # out of time: whatever has not answered (or never started) falls back
+        for c in active + list(queued):
+            if not c.joined:
+                self._count("fallbacks")
+            yield c.index, c.fallback(c.last_error if not c.pending else None), None
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            out: Dict[str, float] = dict(self.stats)
+        out["p90Ms"] = round(self.tracker.quantile(0.9) * 1000.0, 1)
+        return out
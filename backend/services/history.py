@@ -0,0 +1,281 @@
+"""
+Local history of scored outfits in an embedded SQLite database.
+
+Every StyleScore the server returns is appended as one row (features hash,
+config version, timestamp, score, subscores, dominant LAB). `HistoryStore.add`
+only enqueues: a writer thread drains the queue and inserts in batched
+transactions, so request latency does not depend on disk. When the queue is
+full rows are dropped and counted rather than blocking the request.
+
+Indexes on (version, score), (version, ts), (ts) and (score) turn top-N and
+range queries into index range scans that stay in the milliseconds at tens of
+millions of rows (`python -m benchmarks.history`); `bulk_insert` loads large
+backfills in big transactions from the calling thread.
+"""
+
+from __future__ import annotations
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from scoring.types import OutfitFeatures, StyleScore
+
+from .singleflight import content_key
+
+# StyleScore.subscores key → column
+SUBSCORE_COLUMNS: Dict[str, str] = {
+    "colorHarmony": "color_harmony",
+    "patternBalance": "pattern_balance",
+    "textureMix": "texture_mix",
+    "highlightPrinciple": "highlight",
+    "proportion": "proportion",
+    "repetition": "repetition",
+}
+
+COLUMNS: Tuple[str, ...] = (
+    "ts", "version", "features_hash", "outfit_id", "score",
+    *SUBSCORE_COLUMNS.values(), "dom_l", "dom_a", "dom_b",
+)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    version TEXT NOT NULL,
+    features_hash TEXT NOT NULL,
+    outfit_id TEXT,
+    score REAL NOT NULL,
+    {", ".join(f"{c} REAL" for c in SUBSCORE_COLUMNS.values())},
+    dom_l REAL, dom_a REAL, dom_b REAL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_version_score ON scores (version, score);
+CREATE INDEX IF NOT EXISTS idx_scores_version_ts ON scores (version, ts);
+CREATE INDEX IF NOT EXISTS idx_scores_ts ON scores (ts);
+CREATE INDEX IF NOT EXISTS idx_scores_score ON scores (score);
+"""
+
+_INSERT = f"INSERT INTO scores ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+_STOP = object()
+
+
+def features_hash(features: Mapping[str, Any]) -> str:
+    """
+    Content hash of OutfitFeatures, ignoring the client-chosen outfitId. Hashes
+    the mapping as given: pass the canonical `parse_outfit(...).to_features()`
+    form so one outfit hashes the same whichever endpoint scored it.
+    """
+    return content_key({k: v for k, v in features.items() if k != "outfitId"})
+
+
+def dominant_lab(features: Mapping[str, Any]) -> Optional[Sequence[float]]:
+    """Largest color cluster, else the largest garment's colorLAB; None when there is neither."""
+    clusters = features.get("colorClusters") or []
+    if clusters:
+        return max(clusters, key=lambda c: c["pct"])["lab"]
+    garments = features.get("garments") or []
+    if garments:
+        return max(garments, key=lambda g: g["areaPct"])["colorLAB"]
+    return None
+
+
+def history_row(features: OutfitFeatures | Mapping[str, Any], result: StyleScore,
+                ts: Optional[float] = None) -> Tuple[Any, ...]:
+    """One `scores` row (in COLUMNS order) for a scored outfit."""
+    lab = dominant_lab(features)
+    l, a, b = (float(v) for v in lab) if lab is not None else (None, None, None)
+    subs = result["subscores"]
+    return (
+        time.time() if ts is None else ts, result["version"], features_hash(features),
+        features.get("outfitId"), float(result["styleScore"]),
+        *(float(subs[k]) for k in SUBSCORE_COLUMNS), l, a, b,
+    )
+
+
+def _connect(path: str | Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")      # readers never wait for the writer
+    conn.execute("PRAGMA synchronous=NORMAL")    # fsync at checkpoints, not every commit
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA busy_timeout=5000")    # bulk_insert and the writer thread take turns
+    conn.execute("PRAGMA cache_size=-65536")     # 64 MB page cache keeps index inserts off disk
+    return conn
+
+
+class HistoryStore:
+    """Append-only score history; `add` is non-blocking, queries are safe from any thread."""
+
+    def __init__(self, path: str | Path, batch_size: int = 512, flush_interval_s: float = 0.5,
+                 max_queue: int = 100_000) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._writer = _connect(path)
+        self._writer.executescript(_SCHEMA)
+        # one shared read connection; a sqlite connection is not safe for concurrent use
+        self._reader = _connect(path)
+        self._read_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {"queued": 0, "written": 0, "dropped": 0, "batches": 0}
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    # --- writes ---
+
+    def add(self, features: OutfitFeatures | Mapping[str, Any], result: StyleScore) -> bool:
+        """Queue a scored outfit; False (and counted as dropped) when the queue is full."""
+        try:
+            # rows (hashing included) are built on the writer thread
+            self._queue.put_nowait((features, result, time.time()))
+        except queue.Full:
+            with self._stats_lock:
+                self.stats["dropped"] += 1
+            return False
+        with self._stats_lock:
+            self.stats["queued"] += 1
+        return True
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: List[Tuple[Any, StyleScore, float]] = []
+            taken = 1
+            stop = item is _STOP
+            if not stop:
+                batch.append(item)
+            # gather more rows until the batch is full or the flush interval passes
+            until = time.monotonic() + self.flush_interval_s
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(until - time.monotonic(), 0.0))
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._write(batch)
+            for _ in range(taken):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, items: Sequence[Tuple[Any, StyleScore, float]]) -> None:
+        rows = []
+        for features, result, ts in items:
+            try:
+                rows.append(history_row(features, result, ts))
+            except (KeyError, TypeError, ValueError):
+                with self._stats_lock:
+                    self.stats["dropped"] += 1
+        try:
+            self._writer.execute("BEGIN")
+            self._writer.executemany(_INSERT, rows)
+            self._writer.execute("COMMIT")
+        except sqlite3.Error:
+            # history is best-effort: lose the batch, keep the writer alive
+            if self._writer.in_transaction:
+                self._writer.execute("ROLLBACK")
+            with self._stats_lock:
+                self.stats["dropped"] += len(rows)
+            return
+        with self._stats_lock:
+            self.stats["written"] += len(rows)
+            self.stats["batches"] += 1
+
+    def flush(self) -> None:
+        """Block until every queued row is committed."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write what is queued, stop the writer thread and close the database."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._reader.close()
+        self._writer.close()
+
+    def bulk_insert(self, rows: Iterable[Tuple[Any, ...]], chunk: int = 50_000) -> int:
+        """Insert `history_row` tuples synchronously, `chunk` rows per transaction (backfills)."""
+        conn = _connect(self.path)
+        n = 0
+        try:
+            it = iter(rows)
+            while True:
+                block = [r for _, r in zip(range(chunk), it)]
+                if not block:
+                    break
+                conn.execute("BEGIN")
+                conn.executemany(_INSERT, block)
+                conn.execute("COMMIT")
+                n += len(block)
+        finally:
+            conn.close()
+        with self._stats_lock:
+            self.stats["written"] += n
+        return n
+
+    # --- queries ---
+
+    def _query(self, sql: str, args: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        with self._read_lock:
+            cur = self._reader.execute(sql, args)
+            names = [d[0] for d in cur.description]
+            return [dict(zip(names, row)) for row in cur.fetchall()]
+
+    def top(self, version: str, n: int = 10, lowest: bool = False) -> List[Dict[str, Any]]:
+        """Best (or worst) `n` scores for a config version."""
+        order = "ASC" if lowest else "DESC"
+        return self._query(
+            f"SELECT * FROM scores WHERE version = ? ORDER BY score {order} LIMIT ?", (version, n))
+
+    def score_range(self, lo: float, hi: float, version: Optional[str] = None,
+                    limit: int = 1000) -> List[Dict[str, Any]]:
+        """Rows with lo <= score <= hi (optionally for one version), highest first."""
+        if version is None:
+            return self._query(
+                "SELECT * FROM scores WHERE score BETWEEN ? AND ? ORDER BY score DESC LIMIT ?", (lo, hi, limit))
+        return self._query(
+            "SELECT * FROM scores WHERE version = ? AND score BETWEEN ? AND ? ORDER BY score DESC LIMIT ?",
+            (version, lo, hi, limit))
+
+    def time_range(self, since: float, until: Optional[float] = None,
+                   limit: int = 1000) -> List[Dict[str, Any]]:
+        """Rows scored in [since, until] (unix seconds), newest first."""
+        return self._query(
+            "SELECT * FROM scores WHERE ts BETWEEN ? AND ? ORDER BY ts DESC LIMIT ?",
+            (since, time.time() if until is None else until, limit))
+
+    def recent(self, version: str, limit: int = 1000, scan: int = 10_000) -> List[Dict[str, Any]]:
+        """
+        Latest score per features hash for `version`, newest first, from at most
+        `scan` recent rows (for warming a result cache).
+        """
+        rows = self._query(
+            "SELECT features_hash, ts, score FROM scores WHERE version = ? ORDER BY ts DESC LIMIT ?",
+            (version, max(scan, limit)))
+        seen: Dict[str, Dict[str, Any]] = {}
+        for r in rows:
+            seen.setdefault(r["features_hash"], r)
+            if len(seen) >= limit:
+                break
+        return list(seen.values())
+
+    def count(self, version: Optional[str] = None) -> int:
+        if version is None:
+            return int(self._query("SELECT COUNT(*) AS n FROM scores")[0]["n"])
+        return int(self._query("SELECT COUNT(*) AS n FROM scores WHERE version = ?", (version,))[0]["n"])
+
+    def metrics(self) -> Dict[str, int]:
+        with self._stats_lock:
+            out = dict(self.stats)
+        out["pending"] = self._queue.qsize()
+        return out
+
@@ -0,0 +1,345 @@
+"""
+Server-side OutfitFeatures extraction from a session's latest frame.
+
+The browser used to build OutfitFeatures itself (frontend `createOutfitFeatures`)
+from the segmentation payload and pattern results, then POST them to
+/api/style/score. `extract_outfit_features` does the same on the server from
+the decoded frame the segmentation came from, so `score_current` needs no
+crops or feature upload:
+
+  * one LAB conversion per frame: the union of the garment boxes is sampled
+    at a single stride (about `LAB_SAMPLES` pixels) and converted once; every
+    garment reads its pixels out of that shared grid;
+  * garment pixels: the item's RLE `mask` when the segmentation carries one,
+    otherwise the central part of the box (the edges are mostly background /
+    neighbouring garments);
+  * garment `colorLAB`: the mode of a coarse LAB histogram (one `bincount`
+    over all garments), refined to the median of the pixels in and around the
+    mode bin, so shadows, prints and stray background do not drag the color;
+  * garment `glossIndex`: share of specular-highlight pixels (much lighter
+    than the garment's own color and desaturated), scaled to 0..1; crops too
+    small to measure fall back to the material prior;
+  * `colorClusters`: k-means (k ≤ 3) on LAB pixels from all garment boxes of
+    the same grid, so each garment contributes in proportion to its area;
+  * type / material / pattern, `thirdsArea` and `domainZ`: the same label and
+    garment heuristics as the frontend, so scores stay comparable.
+"""
+
+from __future__ import annotations
+import math
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from preprocess.color_lab import srgb_to_lab
+from preprocess.rle import rle_decode
+from scoring.types import ColorCluster, DomainZ, GarmentFeatures, OutfitFeatures, ThirdsArea
+
+EXTRACTION_VERSION = "server-0.2.0"
+
+CENTER_FRAC = 0.6          # central fraction of each box sampled for color (no mask)
+LAB_SAMPLES = 16384        # LAB pixels converted per frame across all garment boxes
+CLUSTER_SAMPLES = 4096     # LAB pixels fed to k-means across all garments
+MAX_CLUSTERS = 3
+MERGE_DIST = 2.0           # LAB distance below which k-means centers are one color
+MIN_PIXELS = 64            # fewer garment pixels than this: mask ignored / gloss from the prior
+
+# dominant-color histogram: L in 0..100, a / b in -128..127
+BIN_L, BIN_AB = 5.0, 8.0
+_NL, _NAB = 21, 32
+
+# specular highlight: this much lighter than the garment color, and desaturated
+HIGHLIGHT_DL = 20.0
+HIGHLIGHT_MIN_L = 70.0
+HIGHLIGHT_MAX_CHROMA = 20.0
+GLOSS_FULL = 0.08          # highlight share that reads as fully glossy (glossIndex 1.0)
+
+
+def garment_type(label: str) -> str:
+    s = label.lower()
+    if "dress" in s:
+        return "dress"
+    if "outwear" in s or "jacket" in s or "coat" in s:
+        return "outer"
+    if "top" in s or "shirt" in s or "vest" in s or "sling" in s:
+        return "top"
+    if any(k in s for k in ("trouser", "pant", "jean", "short", "skirt", "bottom")):
+        return "bottom"
+    return "accessory"
+
+
+def garment_material(label: str) -> str:
+    s = label.lower()
+    for key, material in (("denim", "denim"), ("jean", "denim"), ("leather", "leather"), ("wool", "wool"),
+                          ("silk", "silk"), ("satin", "satin"), ("knit", "knit")):
+        if key in s:
+            return material
+    return "cotton"
+
+
+def pattern_type(pattern: Optional[str]) -> str:
+    """Pattern classifier label (services/ai_schemas.PatternEnum) → scoring PatternType."""
+    s = (pattern or "none").lower()
+    if s in ("none", "solid") or "solid" in s:
+        return "none"
+    if "stripe" in s:
+        return "stripe"
+    if "plaid" in s or "check" in s:
+        return "plaid"
+    if "floral" in s:
+        return "floral"
+    if "dot" in s or "polka" in s:
+        return "dots"
+    if "graphic" in s:
+        return "graphic"
+    return "other"
+
+
+def _frame_box(bbox: Sequence[float], sx: float, sy: float, W: int, H: int, frac: float = 1.0):
+    """Video-space xywh → clamped frame-space (x0, y0, x1, y1), shrunk to its central `frac`."""
+    x, y, w, h = bbox
+    cx, cy = (x + w / 2.0) * sx, (y + h / 2.0) * sy
+    hw, hh = w * sx * frac / 2.0, h * sy * frac / 2.0
+    x0, y0 = max(int(cx - hw), 0), max(int(cy - hh), 0)
+    x1, y1 = min(int(math.ceil(cx + hw)), W), min(int(math.ceil(cy + hh)), H)
+    return x0, y0, max(x1, x0), max(y1, y0)
+
+
+def material_gloss(label: str) -> float:
+    """Gloss prior from the label, used when a crop is too small to measure."""
+    return 0.8 if "leather" in label.lower() else 0.1
+
+
+def _histogram_bins(lab: np.ndarray) -> np.ndarray:
+    """(N, 3) LAB → (N, 3) integer bin coordinates."""
+    q = np.empty(lab.shape, dtype=np.int32)
+    q[:, 0] = np.clip(lab[:, 0] / BIN_L, 0, _NL - 1)
+    q[:, 1:] = np.clip((lab[:, 1:] + 128.0) / BIN_AB, 0, _NAB - 1)
+    return q
+
+
+def dominant_colors(lab: np.ndarray, ids: np.ndarray, n: int) -> np.ndarray:
+    """
+    (N, 3) LAB pixels labelled with garment ids 0..n-1 (grouped: `ids` is
+    non-decreasing) → (n, 3) dominant LAB.
+
+    One bincount over (garment, bin) finds every garment's histogram mode;
+    the result is the median of that garment's pixels within one bin of it.
+    Rows for garments without pixels are NaN.
+    """
+    out = np.full((n, 3), np.nan, dtype=np.float64)
+    if lab.shape[0] == 0:
+        return out
+    q = _histogram_bins(lab)
+    nbins = _NL * _NAB * _NAB
+    flat = (q[:, 0] * _NAB + q[:, 1]) * _NAB + q[:, 2]
+    hist = np.bincount(ids * nbins + flat, minlength=n * nbins).reshape(n, nbins)
+    mode = hist.argmax(axis=1)
+    mode_q = np.stack((mode // (_NAB * _NAB), (mode // _NAB) % _NAB, mode % _NAB), axis=1)
+    near = (np.abs(q - mode_q[ids]) <= 1).all(axis=1)
+    sel, sel_ids = lab[near], ids[near]
+    bounds = np.searchsorted(sel_ids, np.arange(n + 1))
+    for g in range(n):
+        if bounds[g + 1] > bounds[g]:
+            out[g] = np.median(sel[bounds[g]:bounds[g + 1]], axis=0)
+    return out
+
+
+def gloss_indices(lab: np.ndarray, ids: np.ndarray, dominant: np.ndarray) -> np.ndarray:
+    """
+    Specular-highlight share per garment, scaled so `GLOSS_FULL` reads as 1.0.
+
+    A highlight pixel is at least `HIGHLIGHT_DL` lighter than its garment's
+    dominant color (and above `HIGHLIGHT_MIN_L`) with chroma under
+    `HIGHLIGHT_MAX_CHROMA`: a light source's reflection washes the fabric
+    color out. Garments without pixels get NaN.
+    """
+    n = dominant.shape[0]
+    counts = np.bincount(ids, minlength=n).astype(np.float64)
+    if lab.shape[0] == 0:
+        return np.full(n, np.nan)
+    L = lab[:, 0]
+    chroma = np.hypot(lab[:, 1], lab[:, 2])
+    hot = (L >= np.maximum(dominant[ids, 0] + HIGHLIGHT_DL, HIGHLIGHT_MIN_L)) & (chroma <= HIGHLIGHT_MAX_CHROMA)
+    share = np.bincount(ids[hot], minlength=n) / np.maximum(counts, 1.0)
+    return np.where(counts > 0, np.minimum(share / GLOSS_FULL, 1.0), np.nan)
+
+
+def color_clusters(lab_pixels: np.ndarray, k: int = MAX_CLUSTERS) -> List[ColorCluster]:
+    """k-means on (N, 3) float32 LAB → clusters sorted by pct, descending (deterministic)."""
+    n = lab_pixels.shape[0]
+    if n == 0:
+        return []
+    k = min(k, n)
+    cv2.setRNGSeed(0)
+    _, labels, centers = cv2.kmeans(
+        np.ascontiguousarray(lab_pixels, dtype=np.float32), k, None,
+        (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 0.5), 2, cv2.KMEANS_PP_CENTERS,
+    )
+    counts = np.bincount(labels.ravel(), minlength=k).astype(np.float64)
+    # fewer distinct colors than k splits one color across centers; fold those back together
+    for i in range(k):
+        for j in range(i):
+            if counts[j] > 0 and np.linalg.norm(centers[i] - centers[j]) < MERGE_DIST:
+                centers[j] = (centers[j] * counts[j] + centers[i] * counts[i]) / (counts[j] + counts[i])
+                counts[j] += counts[i]
+                counts[i] = 0
+                break
+    order = np.argsort(-counts, kind="stable")
+    return [
+        {"lab": tuple(round(float(v), 2) for v in centers[i]), "pct": round(float(counts[i]) / n, 3)}  # type: ignore[typeddict-item]
+        for i in order if counts[i] > 0
+    ]
+
+
+def _masked_pixels(region: np.ndarray, mask: Optional[Mapping[str, Any]], box: Sequence[int],
+                   origin: Sequence[int], stride: int) -> Optional[np.ndarray]:
+    """
+    LAB pixels of `region` (the grid cells of frame box `box`, first cell at
+    frame `origin`) inside the item's RLE mask, which covers the whole box.
+    None without a usable mask (missing, malformed or under MIN_PIXELS).
+    """
+    if not mask or region.size == 0:
+        return None
+    try:
+        m = rle_decode(mask)  # type: ignore[arg-type]
+    except (KeyError, TypeError, ValueError):
+        return None
+    mh, mw = m.shape
+    x0, y0, x1, y1 = box
+    gh, gw = region.shape[:2]
+    # grid cell → mask cell (nearest)
+    rows = ((origin[1] + np.arange(gh) * stride - y0 + 0.5) * mh / max(y1 - y0, 1)).astype(np.intp)
+    cols = ((origin[0] + np.arange(gw) * stride - x0 + 0.5) * mw / max(x1 - x0, 1)).astype(np.intp)
+    inside = m[np.ix_(np.clip(rows, 0, mh - 1), np.clip(cols, 0, mw - 1))]
+    if int(inside.sum()) < MIN_PIXELS:
+        return None
+    return region[inside]
+
+
+def thirds_area(garments: Sequence[GarmentFeatures]) -> ThirdsArea:
+    top = mid = bottom = 0.0
+    for g in garments:
+        if g["type"] in ("top", "outer"):
+            top += g["areaPct"]
+        elif g["type"] == "bottom":
+            bottom += g["areaPct"]
+        else:
+            mid += g["areaPct"]
+    total = top + mid + bottom
+    if total <= 0:
+        return {"top": 0.33, "mid": 0.34, "bottom": 0.33}
+    return {"top": top / total, "mid": mid / total, "bottom": bottom / total}
+
+
+def domain_z(garments: Sequence[GarmentFeatures]) -> DomainZ:
+    strengths = [g["patternStrength"] for g in garments if g["patternType"] != "none"]
+    materials = {g["material"] for g in garments}
+    Ls = np.array([g["colorLAB"][0] for g in garments], dtype=np.float64)
+    variance = float(Ls.var()) if Ls.size else 0.0
+    return {
+        "skin": 0.2,  # no skin-exposure estimate yet
+        "hue": min(variance / 10.0, 2.0),
+        "texture": min(len(materials) / 2.0, 2.0),
+        "pattern": (max(strengths) if strengths else 0.0) * 2.0,
+    }
+
+
+def extract_outfit_features(
+    rgb: np.ndarray,
+    seg: Mapping[str, Any],
+    patterns: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    outfit_id: str = "current",
+) -> OutfitFeatures:
+    """
+    rgb: the det-sized HxWx3 uint8 frame `seg` was computed on; seg: the
+    segmentation payload (video-space boxes, optional per-item RLE `mask`);
+    patterns: pattern results by garment id (used when their label still matches).
+    """
+    H, W = rgb.shape[:2]
+    srcW, srcH = int(seg["width"]), int(seg["height"])
+    if srcW <= 0 or srcH <= 0:
+        raise ValueError("segmentation has no frame size")
+    sx, sy = W / srcW, H / srcH
+    items = list(seg["items"])
+    patterns = patterns or {}
+
+    # one LAB conversion for the union of all boxes, at one stride, shared by every garment
+    boxes = [_frame_box(it["bbox"], sx, sy, W, H) for it in items]
+    total = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in boxes)
+    stride = max(1, int(math.sqrt(total / LAB_SAMPLES))) if total else 1
+    if boxes:
+        ux0, uy0 = min(b[0] for b in boxes), min(b[1] for b in boxes)
+        ux1, uy1 = max(b[2] for b in boxes), max(b[3] for b in boxes)
+        grid = srgb_to_lab(np.ascontiguousarray(rgb[uy0:uy1:stride, ux0:ux1:stride]))
+    else:
+        ux0 = uy0 = 0
+        grid = np.zeros((0, 0, 3), dtype=np.float32)
+
+    def cells(x0: int, y0: int, x1: int, y1: int):
+        """Frame-space box → slice bounds into `grid` (first grid row / column at or after the edge)."""
+        return (-(-(x0 - ux0) // stride), -(-(y0 - uy0) // stride),
+                -(-(x1 - ux0) // stride), -(-(y1 - uy0) // stride))
+
+    kept: List[Dict[str, Any]] = []
+    pixels: List[np.ndarray] = []
+    samples: List[np.ndarray] = []
+    for it, box in zip(items, boxes):
+        gx0, gy0, gx1, gy1 = cells(*box)
+        region = grid[gy0:gy1, gx0:gx1]
+        samples.append(region.reshape(-1, 3))
+        px = _masked_pixels(region, it.get("mask"), box, (ux0 + gx0 * stride, uy0 + gy0 * stride), stride)
+        if px is None:
+            cx0, cy0, cx1, cy1 = _frame_box(it["bbox"], sx, sy, W, H, CENTER_FRAC)
+            gx0, gy0, gx1, gy1 = cells(cx0, cy0, cx1, cy1)
+            px = grid[gy0:gy1, gx0:gx1].reshape(-1, 3)
+            if px.shape[0] == 0 and cx1 > cx0 and cy1 > cy0:
+                # box narrower than the stride: convert its few pixels directly
+                px = srgb_to_lab(np.ascontiguousarray(rgb[cy0:cy1, cx0:cx1])).reshape(-1, 3)
+        if px.shape[0] == 0:
+            continue
+        kept.append(it)
+        pixels.append(px)
+
+    lab = np.concatenate(pixels) if pixels else np.zeros((0, 3), dtype=np.float32)
+    ids = np.repeat(np.arange(len(pixels)), [p.shape[0] for p in pixels])
+    dominant = dominant_colors(lab, ids, len(kept))
+    gloss = gloss_indices(lab, ids, dominant)
+
+    garments: List[GarmentFeatures] = []
+    for i, it in enumerate(kept):
+        label = str(it.get("label", "garment"))
+        p = patterns.get(str(it["id"]))
+        if p is not None and p.get("label", label) != label:
+            p = None
+        ptype = pattern_type(p.get("pattern") if p else None)
+        prior = material_gloss(label)
+        g = float(gloss[i]) if pixels[i].shape[0] >= MIN_PIXELS else prior
+        if ptype != "none":
+            g = min(g, prior)  # light print elements read as highlights
+        x, y, w, h = it["bbox"]
+        c = dominant[i]
+        garments.append({
+            "id": str(it["id"]),
+            "type": garment_type(label),  # type: ignore[typeddict-item]
+            "areaPct": round(min(w * h / float(srcW * srcH), 0.5), 4),
+            "colorLAB": (round(float(c[0]), 2), round(float(c[1]), 2), round(float(c[2]), 2)),
+            "material": garment_material(label),  # type: ignore[typeddict-item]
+            "patternType": ptype,  # type: ignore[typeddict-item]
+            "patternStrength": float(p.get("confidence") or 0.0) if p else 0.0,
+            "glossIndex": round(g, 3),
+        })
+
+    # same stride for every box, so a uniform subsample keeps cluster shares proportional to area
+    boxed = np.concatenate(samples) if samples else np.zeros((0, 3), dtype=np.float32)
+    clusters = color_clusters(boxed[::max(1, -(-boxed.shape[0] // CLUSTER_SAMPLES))])
+    return {
+        "outfitId": outfit_id,
+        "garments": garments,
+        "colorClusters": clusters,
+        "thirdsArea": thirds_area(garments),
+        "domainZ": domain_z(garments),
+        "body": None,
+        "extractionVersion": EXTRACTION_VERSION,
+    }
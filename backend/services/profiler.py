@@ -0,0 +1,203 @@
+"""
+On-demand sampling profiler for the live frame pipeline.
+
+`StageProfiler.start(frames=N)` / `start(seconds=T)` arms a background thread
+that samples the stacks of threads currently inside a pipeline stage every
+`interval_s` and aggregates them as collapsed stacks:
+
+    detect;yolo_detector.py:predict_cascade;cascade.py:run_cascade;... 17
+
+one line per distinct stack with its sample count, which flamegraph.pl,
+speedscope and inferno read directly. Each stack starts at the innermost
+stage (`with profiler.stage("decode"): ...`) and only contains frames below
+the point the stage was entered, so request plumbing is left out.
+
+While not armed, `stage()` and `frame()` return a shared no-op context
+manager after one attribute check, and no sampler thread runs.
+"""
+
+from __future__ import annotations
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from types import FrameType
+from typing import Any, Dict, List, Optional, Tuple
+
+_OFF = nullcontext()
+
+
+def _frame_label(f: FrameType) -> str:
+    return f"{os.path.basename(f.f_code.co_filename)}:{f.f_code.co_name}"
+
+
+class _Stage:
+    __slots__ = ("prof", "name", "tid", "entry")
+
+    def __init__(self, prof: StageProfiler, name: str) -> None:
+        self.prof = prof
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.tid = threading.get_ident()
+        self.entry = sys._getframe(1)  # the frame that entered the stage: stacks are cut above it
+        with self.prof._lock:
+            self.prof._stages.setdefault(self.tid, []).append((self.name, self.entry))
+
+    def __exit__(self, *exc: Any) -> None:
+        with self.prof._lock:
+            stack = self.prof._stages.get(self.tid)
+            if stack:
+                stack.pop()
+                if not stack:
+                    del self.prof._stages[self.tid]
+
+
+class _Frame:
+    __slots__ = ("prof",)
+
+    def __init__(self, prof: StageProfiler) -> None:
+        self.prof = prof
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        self.prof._frame_done()
+
+
+class StageProfiler:
+    """Samples per-stage stacks of pipeline threads while armed; idle cost is one attribute check."""
+
+    def __init__(self, interval_s: float = 0.005, max_depth: int = 64) -> None:
+        self.interval_s = interval_s
+        self.max_depth = max_depth
+        self.active = False
+        self._lock = threading.Lock()
+        self._stages: Dict[int, List[Tuple[str, FrameType]]] = {}
+        self._counts: Counter[str] = Counter()
+        self._frames_left: Optional[int] = None
+        self._until: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last: Dict[str, Any] = {}
+
+    # --- instrumentation (called from the pipeline) ---
+
+    def stage(self, name: str):
+        """Context manager attributing samples taken inside it to `name`."""
+        if not self.active:
+            return _OFF
+        return _Stage(self, name)
+
+    def frame(self):
+        """Context manager around one pipeline frame; counts frames toward `start(frames=N)`."""
+        if not self.active:
+            return _OFF
+        return _Frame(self)
+
+    def _frame_done(self) -> None:
+        with self._lock:
+            if self._frames_left is None:
+                return
+            self._frames_left -= 1
+            done = self._frames_left <= 0
+        if done:
+            self._stop.set()
+
+    # --- control ---
+
+    def start(self, frames: Optional[int] = None, seconds: Optional[float] = None,
+              interval_s: Optional[float] = None) -> Dict[str, Any]:
+        """Arm for the next `frames` pipeline frames and/or `seconds` (whichever ends first)."""
+        if frames is None and seconds is None:
+            raise ValueError("give frames and/or seconds")
+        with self._lock:
+            if self.active:
+                raise RuntimeError("profiler already running")
+            self._counts = Counter()
+            self._frames_left = frames
+            self._until = time.monotonic() + seconds if seconds is not None else None
+            if interval_s is not None:
+                self.interval_s = interval_s
+            self._stop.clear()
+            self.active = True
+            self.last = {"state": "running", "frames": frames, "seconds": seconds,
+                         "intervalMs": round(self.interval_s * 1000.0, 3), "startedAt": time.time()}
+        self._thread = threading.Thread(target=self._run, name="stage-profiler", daemon=True)
+        self._thread.start()
+        return dict(self.last)
+
+    def stop(self) -> None:
+        """End a running profile early (samples so far are kept)."""
+        self._stop.set()
+        t = self._thread
+        if t is not None and t is not threading.current_thread():
+            t.join()
+
+    def _run(self) -> None:
+        started = time.monotonic()
+        samples = 0
+        self_s = 0.0
+        while not self._stop.wait(self.interval_s):
+            if self._until is not None and time.monotonic() >= self._until:
+                break
+            t0 = time.perf_counter()
+            self._sample()
+            self_s += time.perf_counter() - t0
+            samples += 1
+        with self._lock:
+            self.active = False
+            self._stages.clear()
+            self.last.update({
+                "state": "done",
+                "samples": samples,
+                "elapsedS": round(time.monotonic() - started, 3),
+                "samplerCpuS": round(self_s, 4),
+                "framesProfiled": None if self._frames_left is None
+                else max(self.last["frames"] - self._frames_left, 0),
+            })
+
+    def _sample(self) -> None:
+        frames = sys._current_frames()
+        with self._lock:
+            current = [(tid, stack[-1]) for tid, stack in self._stages.items() if stack]
+        stacks: List[str] = []
+        for tid, (name, entry) in current:
+            f: Optional[FrameType] = frames.get(tid)
+            labels: List[str] = []
+            while f is not None and f is not entry and len(labels) < self.max_depth:
+                labels.append(_frame_label(f))
+                f = f.f_back
+            if f is not entry:
+                continue  # the stage ended between snapshot and lookup (or the stack is too deep)
+            labels.append(name)
+            stacks.append(";".join(reversed(labels)))
+        if stacks:
+            with self._lock:
+                self._counts.update(stacks)
+
+    # --- results ---
+
+    def collapsed(self) -> str:
+        """Collapsed-stack text ("stage;frame;...;leaf count" per line) of the last run."""
+        with self._lock:
+            items = sorted(self._counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        return "".join(f"{stack} {n}\n" for stack, n in items)
+
+    def by_stage(self) -> Dict[str, int]:
+        out: Counter[str] = Counter()
+        with self._lock:
+            for stack, n in self._counts.items():
+                out[stack.split(";", 1)[0]] += n
+        return dict(out)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self.last) if self.last else {"state": "idle"}
+            if self.active and self._frames_left is not None:
+                out["framesLeft"] = self._frames_left
+        out["byStage"] = self.by_stage()
+        return out
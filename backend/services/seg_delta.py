@@ -0,0 +1,147 @@
+"""
+Compact, delta-encoded segmentation emits.
+
+Opt-in alternative to the full JSON `segmentation` event. Items are sent as
+compact rows `[id, x, y, w, h, label, score]` (plus the item's RLE mask as an
+eighth element when masks are on) and, between keyframes, only the
+rows that were added, removed or moved beyond a pixel tolerance relative to the
+last frame the client acknowledged.
+
+Wire format (dict, optionally MessagePack-packed):
+    keyframe: {"seq", "key": True,  "width", "height", "items": [row, ...]}
+    delta:    {"seq", "key": False, "base", "width", "height",
+               "add": [row, ...], "upd": [row, ...], "del": [id, ...]}
+    both carry the server "quality" level and the detector input size "imgsz"
+    when the segmentation payload has them.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Literal, Optional
+
+try:
+    import msgpack  # optional: only needed for encoding="msgpack"
+except ImportError:  # pragma: no cover - depends on environment
+    msgpack = None
+
+Encoding = Literal["arrays", "msgpack"]
+
+# id, x, y, w, h, label, score[, mask]
+Row = List[Any]
+
+# frame-level payload fields copied onto every keyframe / delta
+_PASSTHROUGH = ("quality", "imgsz")
+
+
+@dataclass
+class SegDeltaConfig:
+    tolerance_px: int = 4       # bbox edge movement (video px) below which an item is "unchanged"
+    keyframe_every: int = 30    # force a keyframe after this many deltas
+    history: int = 8            # client views kept while waiting for acks
+    encoding: Encoding = "arrays"
+
+
+def _to_row(item: Dict[str, Any]) -> Row:
+    x, y, w, h = item["bbox"]
+    row = [item["id"], int(x), int(y), int(w), int(h), item.get("label", "garment"), item.get("score", 0.0)]
+    if "mask" in item:
+        row.append(item["mask"])
+    return row
+
+
+def _moved(a: Row, b: Row, tol: int) -> bool:
+    # a mask appearing or disappearing (masks toggled) also needs the row re-sent
+    return a[5] != b[5] or len(a) != len(b) or any(abs(a[k] - b[k]) > tol for k in range(1, 5))
+
+
+class SegDeltaEncoder:
+    """
+    Per-session encoder. Tracks the item set the client holds for each emitted
+    seq, so deltas are always computed against what the client actually has
+    (rows that moved less than the tolerance keep their previously sent bbox).
+    """
+
+    def __init__(self, cfg: SegDeltaConfig = SegDeltaConfig()) -> None:
+        if cfg.encoding == "msgpack" and msgpack is None:
+            cfg = SegDeltaConfig(cfg.tolerance_px, cfg.keyframe_every, cfg.history, "arrays")
+        self.cfg = cfg
+        self._seq = 0
+        self._acked: Optional[int] = None
+        self._since_key = 0
+        # seq -> (width, height, {id: row}) as held by the client after applying that seq
+        self._views: Dict[int, tuple[int, int, Dict[str, Row]]] = {}
+
+    @property
+    def encoding(self) -> Encoding:
+        return self.cfg.encoding
+
+    def ack(self, seq: Optional[int]) -> None:
+        """Record the last seq the client applied; None/unknown forces a keyframe."""
+        if seq is None or seq not in self._views:
+            self._acked = None
+            return
+        self._acked = seq
+        for s in [s for s in self._views if s < seq]:
+            del self._views[s]
+
+    def encode(self, seg: Dict[str, Any]) -> Dict[str, Any]:
+        self._seq += 1
+        seq = self._seq
+        W, H = int(seg["width"]), int(seg["height"])
+        rows = {it["id"]: _to_row(it) for it in seg["items"]}
+
+        base = self._views.get(self._acked) if self._acked is not None else None
+        if (
+            base is None
+            or base[0] != W
+            or base[1] != H
+            or self._since_key >= self.cfg.keyframe_every
+        ):
+            msg = self._keyframe(seq, W, H, rows)
+        else:
+            msg = self._delta(seq, base, W, H, rows)
+        for key in _PASSTHROUGH:
+            if key in seg:
+                msg[key] = seg[key]
+
+        while len(self._views) > self.cfg.history:
+            del self._views[min(self._views)]
+        return msg
+
+    def pack(self, msg: Dict[str, Any]) -> Any:
+        """Serialize for emit: bytes for msgpack, the dict itself otherwise."""
+        if self.cfg.encoding == "msgpack":
+            return msgpack.packb(msg, use_bin_type=True)
+        return msg
+
+    def _keyframe(self, seq: int, W: int, H: int, rows: Dict[str, Row]) -> Dict[str, Any]:
+        self._since_key = 0
+        self._views[seq] = (W, H, rows)
+        return {"seq": seq, "key": True, "width": W, "height": H, "items": list(rows.values())}
+
+    def _delta(
+        self, seq: int, base: tuple[int, int, Dict[str, Row]], W: int, H: int, rows: Dict[str, Row]
+    ) -> Dict[str, Any]:
+        tol = self.cfg.tolerance_px
+        prev = base[2]
+        view: Dict[str, Row] = {}
+        add: List[Row] = []
+        upd: List[Row] = []
+        for gid, row in rows.items():
+            old = prev.get(gid)
+            if old is None:
+                add.append(row)
+                view[gid] = row
+            elif _moved(old, row, tol):
+                upd.append(row)
+                view[gid] = row
+            else:
+                view[gid] = old
+        dels = [gid for gid in prev if gid not in rows]
+
+        self._since_key += 1
+        self._views[seq] = (W, H, view)
+        return {
+            "seq": seq, "key": False, "base": self._acked, "width": W, "height": H,
+            "add": add, "upd": upd, "del": dels,
+        }
@@ -0,0 +1,89 @@
+"""
+Per-socket session state for the live mirror pipeline.
+"""
+
+from __future__ import annotations
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from detection.cascade import CascadeState
+from preprocess.frame_pool import FramePool
+
+from .capture_hint import CaptureController, CaptureHintConfig
+from .seg_delta import SegDeltaEncoder
+
+
+@dataclass
+class Session:
+    sid: str
+    capture: CaptureController
+    seg_encoder: Optional[SegDeltaEncoder] = None  # set when the client opts into delta emits
+    masks: bool = False                            # client asked for per-item RLE masks
+    frames: FramePool = field(default_factory=FramePool)
+    cascade: CascadeState = field(default_factory=CascadeState)
+    # latest segmented frame (pooled "latest" buffer) + payload, and pattern results by garment id,
+    # for score_current; guarded by `lock` since socket handlers may run concurrently
+    latest_seg: Optional[Dict[str, Any]] = None
+    patterns: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    frame_index: int = 0  # frames received, for "detect every Nth frame" under load (degrade.py)
+
+    def remember_frame(self, rgb: np.ndarray, seg: Dict[str, Any]) -> None:
+        """Keep the frame `seg` was computed on (copied into the pool, no per-frame allocation)."""
+        with self.lock:
+            np.copyto(self.frames.get("latest", rgb.shape, rgb.dtype), rgb)
+            self.latest_seg = seg
+
+    def remember_patterns(self, results: Any) -> None:
+        with self.lock:
+            for r in results:
+                if isinstance(r, dict) and "id" in r and "error" not in r:
+                    self.patterns[str(r["id"])] = r
+
+    def latest(self) -> Optional[Tuple[np.ndarray, Dict[str, Any], Dict[str, Dict[str, Any]]]]:
+        """(frame copy, segmentation, patterns) for the latest frame, or None before the first one."""
+        with self.lock:
+            frame = self.frames.peek("latest")
+            if self.latest_seg is None or frame is None:
+                return None
+            # copied so the next frame can overwrite the buffer while features are extracted
+            return frame.copy(), self.latest_seg, dict(self.patterns)
+
+
+@dataclass
+class SessionStore:
+    capture_cfg: CaptureHintConfig = field(default_factory=CaptureHintConfig)
+    _sessions: Dict[str, Session] = field(default_factory=dict)
+
+    def get(self, sid: str) -> Session:
+        """Return the session for `sid`, creating it on first use."""
+        s = self._sessions.get(sid)
+        if s is None:
+            s = Session(sid=sid, capture=CaptureController(self.capture_cfg))
+            self._sessions[sid] = s
+        return s
+
+    def drop(self, sid: str) -> None:
+        s = self._sessions.pop(sid, None)
+        if s is not None:
+            s.frames.release()
+
+    def any_latest_frame(self) -> Optional[np.ndarray]:
+        """A copy of some session's latest segmented frame (e.g. as a detector canary), or None."""
+        for s in list(self._sessions.values()):
+            latest = s.latest()
+            if latest is not None:
+                return latest[0]
+        return None
+
+    def frame_metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {sid: s.frames.metrics() for sid, s in list(self._sessions.items())}
+
+    def cascade_metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {sid: s.cascade.metrics() for sid, s in list(self._sessions.items())}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,98 @@
+"""
+Single-flight request coalescing.
+
+When several clients (or tabs of one kiosk) submit the same crop or the same
+OutfitFeatures at once, only the first caller for a content key runs the
+computation; concurrent callers with the same key wait for it and share its
+result (or its exception). Nothing is cached: once the call finishes the key
+is forgotten, so a later identical request computes again.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Generic, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def content_key(*parts: Any) -> str:
+    """Stable hash of str / bytes / JSON-serializable parts (dict key order does not matter)."""
+    h = hashlib.blake2b(digest_size=16)
+    for p in parts:
+        if isinstance(p, bytes):
+            b = p
+        elif isinstance(p, str):
+            b = p.encode()
+        else:
+            b = json.dumps(p, sort_keys=True, separators=(",", ":"), default=str).encode()
+        h.update(len(b).to_bytes(8, "little"))
+        h.update(b)
+    return h.hexdigest()
+
+
+class _Call(Generic[T]):
+    __slots__ = ("future", "waiters")
+
+    def __init__(self) -> None:
+        self.future: Future[T] = Future()
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """Per-key in-flight deduplication for blocking calls made from threads."""
+
+    def __init__(self, name: str = "") -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call[T]] = {}
+        self.calls = 0        # do() / join() invocations
+        self.executions = 0   # fn actually run
+        self.coalesced = 0    # callers that shared another caller's run
+
+    def join(self, key: str) -> Tuple[Future[T], bool]:
+        """
+        Non-blocking `do`: returns (future, leader). The leader runs the work and
+        must `settle` the key; everyone else just waits on the future.
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                return call.future, False
+            call = _Call()
+            self._calls[key] = call
+            self.executions += 1
+            return call.future, True
+
+    def settle(self, key: str, result: T | None = None, error: BaseException | None = None) -> None:
+        """Finish the leader's call for `key`: waiters get `result` (or `error`) and the key is forgotten."""
+        with self._lock:
+            call = self._calls.pop(key)
+        if error is not None:
+            call.future.set_exception(error)
+        else:
+            call.future.set_result(result)  # type: ignore[arg-type]
+
+    def do(self, key: str, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """Run `fn` once per concurrent `key`; returns (result, shared)."""
+        future, leader = self.join(key)
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self.settle(key, error=e)
+            raise
+        self.settle(key, result)
+        return result, False
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._calls)
+        return {"calls": self.calls, "executions": self.executions,
+                "coalesced": self.coalesced, "inFlight": in_flight}
@@ -0,0 +1,119 @@
+"""
+Unit tests for AIClient's latency budget, with a stubbed VLM call (`_describe_one`).
+"""
+
+import threading
+import time
+import unittest
+
+from services.hedge import LatencyTracker
+
+try:
+    from services.ai_client import AIClient
+except ImportError:  # openai / python-dotenv not installed
+    AIClient = None
+
+
+def _req(i="g0", crop="data:image/jpeg;base64,AAAA"):
+    return {"id": i, "label": "shirt", "cropDataUrl": crop}
+
+
+class StubDescribe:
+    """Sleeps `delay` per call, capped by the SDK timeout, which then raises TimeoutError."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.timeouts = []
+        self.running = self.peak = 0
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, req, timeout=None):
+        with self._lock:
+            self.timeouts.append(timeout)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.threads.add(threading.current_thread().name)
+        wait = self.delay if timeout is None else min(self.delay, timeout)
+        time.sleep(wait)
+        with self._lock:
+            self.running -= 1
+        if wait < self.delay:
+            raise TimeoutError("request timed out")
+        return {"id": req["id"], "label": req["label"], "pattern": "plaid", "confidence": 0.9, "notes": None}
+
+
+@unittest.skipIf(AIClient is None, "openai not installed")
+class TestAIClientBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.client = AIClient(api_key="test", budget_s=5.0)
+        self.client.hedger.min_attempt_s = 0.01
+        self.client.hedger.backoff_s = 0.01
+        self.client.hedger.retry_on += (TimeoutError,)  # the stub's stand-in for APITimeoutError
+
+    def test_budget_exhausted_serves_cached_result(self):
+        self.client._describe_one = StubDescribe(0.0)
+        first = self.client.analyze_batch([_req("g0")])
+        self.assertEqual(first[0]["pattern"], "plaid")
+        self.assertNotIn("fallback", first[0])
+
+        self.client._describe_one = StubDescribe(5.0)
+        t0 = time.monotonic()
+        res = self.client.analyze_batch([_req("g7")], budget_s=0.2)[0]
+        self.assertLess(time.monotonic() - t0, 0.5)
+        self.assertEqual((res["id"], res["pattern"], res["fallback"]), ("g7", "plaid", "cache"))
+        self.assertNotIn("error", res)
+
+    def test_budget_exhausted_without_cache_is_an_error(self):
+        self.client._describe_one = StubDescribe(5.0)
+        res = self.client.analyze_batch([_req("g0", crop="data:image/jpeg;base64,BBBB")], budget_s=0.2)[0]
+        self.assertEqual((res["id"], res["pattern"], res["confidence"]), ("g0", "other", 0.0))
+        self.assertNotIn("fallback", res)
+        self.assertIn("error", res)
+
+    def test_iter_batch_honours_per_call_budget(self):
+        stub = StubDescribe(5.0)
+        self.client._describe_one = stub
+        items = [_req(f"g{i}", crop=f"data:image/jpeg;base64,C{i}") for i in range(3)]
+        t0 = time.monotonic()
+        results = list(self.client.iter_batch(items, max_concurrency=3, budget_s=0.3))
+        self.assertLess(time.monotonic() - t0, 0.6)  # not the client's 5 s budget
+        self.assertEqual(sorted(r["id"] for r in results), ["g0", "g1", "g2"])
+        self.assertTrue(all("error" in r for r in results))
+        self.assertTrue(stub.timeouts and all(t <= 0.3 for t in stub.timeouts))
+
+
+    def test_max_concurrency_bounds_vlm_calls(self):
+        stub = StubDescribe(0.05)
+        self.client._describe_one = stub
+        self.client.hedger.tracker = LatencyTracker(min_samples=100, default_s=5.0)  # no hedges
+        items = [_req(f"g{i}", crop=f"data:image/jpeg;base64,D{i}") for i in range(6)]
+        threads_before = threading.active_count()
+        results = list(self.client.iter_batch(items, max_concurrency=2))
+        self.assertEqual(sorted(r["id"] for r in results), [f"g{i}" for i in range(6)])
+        self.assertEqual(stub.peak, 2)
+        # attempts ran on the hedger's pool; the batch started no pool of its own
+        self.assertLessEqual(threading.active_count() - threads_before, 2)
+        self.assertLessEqual(len(stub.threads), 2)
+
+    def test_identical_crops_share_one_call(self):
+        stub = StubDescribe(0.05)
+        self.client._describe_one = stub
+        items = [_req("g0", crop="data:image/jpeg;base64,EEEE"), _req("g1", crop="data:image/jpeg;base64,EEEE")]
+        results = self.client.analyze_batch(items)
+        self.assertEqual(len(stub.timeouts), 1)
+        self.assertEqual([(r["id"], r["pattern"]) for r in results], [("g0", "plaid"), ("g1", "plaid")])
+        self.assertEqual(self.client.flight.metrics()["inFlight"], 0)
+
+    def test_abandoned_batch_releases_waiters(self):
+        self.client._describe_one = StubDescribe(0.05)
+        batch = self.client.iter_batch([_req("g0"), _req("g1", crop="data:image/jpeg;base64,FFFF")],
+                                       max_concurrency=1)
+        next(batch)
+        batch.close()
+        self.assertEqual(self.client.flight.metrics()["inFlight"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
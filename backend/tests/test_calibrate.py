@@ -0,0 +1,83 @@
+"""
+Unit tests for the ScoreConfig calibration sweep.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from scoring import score_outfit, load_config
+from scoring.calibrate import (
+    SEARCH_SPACE, OutfitTable, grid_configs, load_labelled, random_configs, random_outfits, rank_average,
+    sweep,
+)
+
+
+class TestCalibrationSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.base = load_config()
+        self.features = random_outfits(150)
+        self.table = OutfitTable(self.features)
+
+    def test_columns_match_score_outfit(self):
+        for cfg in random_configs(self.base, SEARCH_SPACE, 8, seed=3) + [self.base]:
+            cols = {s: self.table.column(s, cfg) for s in ("C", "P", "T", "H", "B", "R")}
+            for i, f in enumerate(self.features):
+                res = score_outfit(f, cfg)
+                subs = res["subscores"]
+                for s, key in (("C", "colorHarmony"), ("P", "patternBalance"), ("T", "textureMix"),
+                               ("H", "highlightPrinciple"), ("B", "proportion"), ("R", "repetition")):
+                    self.assertAlmostEqual(cols[s][i], subs[key], delta=5e-4)
+                total = 100.0 * sum(cfg.weights[s] * cols[s][i] for s in cols)
+                self.assertAlmostEqual(total, res["styleScore"], delta=0.051)
+
+    def test_sweep_ranks_by_spearman(self):
+        target = random_configs(self.base, SEARCH_SPACE, 1, seed=7)[0]
+        labels = np.array([score_outfit(f, target)["styleScore"] for f in self.features])
+        configs = random_configs(self.base, SEARCH_SPACE, 40, seed=1) + [target]
+        results = sweep(self.table, labels, configs)
+        self.assertEqual(len(results), 41)
+        self.assertIs(results[0].config, target)
+        self.assertGreater(results[0].spearman, 0.999)
+        self.assertEqual([r.spearman for r in results], sorted((r.spearman for r in results), reverse=True))
+
+    def test_sweep_chunked(self):
+        # weight-only grid: one threshold group, scored a few configs at a time
+        configs = grid_configs(self.base, {"weights.C": [0.1, 0.2, 0.3], "weights.R": [0.05, 0.1, 0.2]})
+        labels = np.array([score_outfit(f, configs[4])["styleScore"] for f in self.features])
+        whole = sweep(self.table, labels, configs)
+        chunked = sweep(self.table, labels, configs, chunk=2)
+        self.assertEqual([(id(r.config), r.spearman, r.pearson) for r in chunked],
+                         [(id(r.config), r.spearman, r.pearson) for r in whole])
+
+    def test_grid_configs(self):
+        configs = grid_configs(self.base, {"weights.C": [0.1, 0.3], "color.dMin": [4, 8, 12]})
+        self.assertEqual(len(configs), 6)
+        for cfg in configs:
+            self.assertAlmostEqual(sum(cfg.weights.values()), 1.0)
+        self.assertEqual(self.base.color.dMin, 8.0)
+        with self.assertRaises(KeyError):
+            grid_configs(self.base, {"color.dMid": [1]})
+
+    def test_rank_average_ties(self):
+        np.testing.assert_array_equal(rank_average(np.array([3.0, 1.0, 3.0, 2.0])), [3.5, 1.0, 3.5, 2.0])
+
+    def test_load_labelled(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            for feat in self.features[:3]:
+                f.write(json.dumps({"features": feat, "label": 4}) + "\n")
+            path = f.name
+        try:
+            features, labels = load_labelled(path)
+        finally:
+            os.unlink(path)
+        self.assertEqual(len(features), 3)
+        np.testing.assert_array_equal(labels, [4.0, 4.0, 4.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Unit tests for server-driven capture hints.
+"""
+
+import unittest
+
+from services.capture_hint import CaptureController, CaptureHintConfig
+from services.sessions import SessionStore
+
+
+class TestCaptureController(unittest.TestCase):
+    """Test latency-driven width/quality/fps recommendations."""
+
+    def setUp(self):
+        self.cfg = CaptureHintConfig(target_ms=90.0, settle_frames=5)
+
+    def _run(self, ctl, ms, n):
+        hints = [ctl.observe(ms) for _ in range(n)]
+        return [h for h in hints if h is not None]
+
+    def test_busy_backend_shrinks_frames(self):
+        ctl = CaptureController(self.cfg)
+        self._run(ctl, 250.0, 40)
+        hint = ctl.current()
+        self.assertEqual(hint["width"], min(self.cfg.widths))
+        self.assertEqual(hint["quality"], self.cfg.quality_min)
+        self.assertLessEqual(hint["maxFps"], 5)
+
+    def test_idle_backend_sharpens_frames(self):
+        ctl = CaptureController(self.cfg)
+        self._run(ctl, 10.0, 40)
+        hint = ctl.current()
+        self.assertEqual(hint["width"], max(self.cfg.widths))
+        self.assertGreater(hint["quality"], 0.75)
+        self.assertEqual(hint["maxFps"], self.cfg.max_fps)
+
+    def test_steady_latency_does_not_churn(self):
+        ctl = CaptureController(self.cfg)
+        hints = self._run(ctl, 70.0, 50)
+        self.assertLessEqual(len(hints), 2)
+        self.assertEqual(ctl.current()["width"], self.cfg.start_width)
+
+
+class TestSessionStore(unittest.TestCase):
+    """Test per-socket session bookkeeping."""
+
+    def test_get_creates_and_drop_removes(self):
+        store = SessionStore()
+        s = store.get("a")
+        self.assertIs(store.get("a"), s)
+        self.assertEqual(len(store), 1)
+        store.drop("a")
+        store.drop("missing")
+        self.assertEqual(len(store), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Unit tests for the multi-resolution detection cascade decisions.
+"""
+
+import unittest
+import numpy as np
+
+from detection.cascade import CascadeConfig, CascadeState, escalation_reason, run_cascade
+from detection.results import Detections
+
+
+def _dets(scores, imgsz=416):
+    n = len(scores)
+    return Detections(
+        boxes=np.zeros((n, 4), dtype=np.float32),
+        classes=np.zeros((n,), dtype=np.int64),
+        scores=np.array(scores, dtype=np.float32),
+        imgsz=imgsz,
+    )
+
+
+class FakeDetector:
+    """Canned detections per inference size; records the sizes it was run at."""
+
+    def __init__(self, by_size):
+        self.by_size = by_size
+        self.calls = []
+
+    def __call__(self, image, imgsz):
+        self.calls.append(imgsz)
+        return _dets(self.by_size[imgsz], imgsz)
+
+
+class TestCascade(unittest.TestCase):
+
+    def setUp(self):
+        self.cfg = CascadeConfig(low_imgsz=416, high_imgsz=960, min_top_conf=0.5, refresh_every=10)
+
+    def test_escalation_reason(self):
+        self.assertEqual(escalation_reason(_dets([]), self.cfg), "empty")
+        self.assertEqual(escalation_reason(_dets([0.3, 0.49]), self.cfg), "low_conf")
+        self.assertIsNone(escalation_reason(_dets([0.3, 0.8]), self.cfg))
+
+    def test_refresh_schedule(self):
+        state = CascadeState()
+        due = [state.next_frame(self.cfg) for _ in range(25)]
+        self.assertEqual([i for i, d in enumerate(due) if d], [0, 10, 20])
+        off = CascadeState()
+        self.assertFalse(any(off.next_frame(CascadeConfig(refresh_every=0)) for _ in range(5)))
+
+    def test_passes_and_recorded_resolution(self):
+        state = CascadeState()
+        easy = FakeDetector({416: [0.9], 960: [0.95]})
+        dets = [run_cascade(easy, None, self.cfg, state) for _ in range(10)]
+        self.assertEqual(dets[0].imgsz, 960)
+        self.assertEqual(dets[0].escalated, "refresh")
+        self.assertTrue(all(d.imgsz == 416 and d.escalated is None for d in dets[1:]))
+        self.assertEqual(easy.calls, [960] + [416] * 9)
+
+        hard = FakeDetector({416: [], 960: [0.7]})
+        d = run_cascade(hard, None, self.cfg, state)
+        self.assertEqual((d.imgsz, d.escalated, len(d)), (960, "refresh", 1))
+        d = run_cascade(hard, None, self.cfg, state)
+        self.assertEqual((d.imgsz, d.escalated), (960, "empty"))
+        self.assertEqual(hard.calls, [960, 416, 960])
+        self.assertEqual(state.metrics(), {
+            "frames": 12, "lowOnly": 9, "escalations": {"empty": 1, "low_conf": 0, "refresh": 2},
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit tests for the LAB nearest-color index.
+"""
+
+import unittest
+
+import numpy as np
+
+from scoring import LabColorIndex
+from scoring.color_distance import delta_e_00_matrix
+
+
+def _catalog(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.c_[rng.uniform(0, 100, n), rng.normal(0, 35, n), rng.normal(5, 35, n)]
+
+
+class TestLabColorIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.labs = _catalog(4000)
+        self.index = LabColorIndex()
+        self.index.bulk_load([f"g{i}" for i in range(len(self.labs))], self.labs)
+        self.queries = _catalog(25, seed=1)
+
+    def _brute(self, q, labs=None, ids=None):
+        labs = self.labs if labs is None else labs
+        ids = [f"g{i}" for i in range(len(labs))] if ids is None else ids
+        d = delta_e_00_matrix(q, labs)[0]
+        return d, ids
+
+    def test_radius_matches_brute_force(self):
+        for r in (3.0, 10.0, 18.0):
+            for q in self.queries:
+                d, ids = self._brute(q)
+                expected = {ids[i] for i in np.flatnonzero(d <= r)}
+                got = self.index.radius(q, r)
+                self.assertEqual({i for i, _ in got}, expected)
+                dists = [x for _, x in got]
+                self.assertEqual(dists, sorted(dists))
+
+    def test_knn_matches_brute_force(self):
+        for q in self.queries:
+            d, ids = self._brute(q)
+            expected = [ids[i] for i in np.argsort(d, kind="stable")[:7]]
+            got = self.index.knn(q, 7)
+            self.assertEqual([i for i, _ in got], expected)
+            self.assertAlmostEqual(got[0][1], float(d.min()), places=9)
+
+    def test_updates_in_place(self):
+        rng = np.random.default_rng(2)
+        labs = self.labs.copy()
+        ids = [f"g{i}" for i in range(len(labs))]
+        alive = set(ids)
+        for _ in range(3000):
+            i = int(rng.integers(len(labs)))
+            if rng.random() < 0.2:
+                self.index.remove(ids[i])
+                alive.discard(ids[i])
+            else:
+                # small nudges stay in their grid cell, large moves go to the tail
+                step = rng.normal(0, 1.0 if rng.random() < 0.5 else 20.0, 3)
+                labs[i] = labs[i] + step
+                self.index.upsert(ids[i], labs[i])
+                alive.add(ids[i])
+        self.assertEqual(len(self.index), len(alive))
+        self.assertGreater(self.index.stats()["rebuilds"], 1)
+
+        live = np.array([i for i, g in enumerate(ids) if g in alive])
+        for q in self.queries:
+            d = delta_e_00_matrix(q, labs[live])[0]
+            expected = {ids[live[j]] for j in np.flatnonzero(d <= 10.0)}
+            self.assertEqual({i for i, _ in self.index.radius(q, 10.0)}, expected)
+
+    def test_remove_and_get(self):
+        self.assertIn("g5", self.index)
+        self.assertEqual(self.index.get("g5"), tuple(float(x) for x in self.labs[5]))
+        self.assertTrue(self.index.remove("g5"))
+        self.assertFalse(self.index.remove("g5"))
+        self.assertIsNone(self.index.get("g5"))
+        self.assertNotIn("g5", [i for i, _ in self.index.knn(self.labs[5], 3)])
+
+    def test_out_of_range_colors(self):
+        index = LabColorIndex()
+        index.bulk_load(["hot", "neutral"], [(50, 140, -150), (50, 0, 0)])
+        self.assertEqual(index.knn((52, 135, -140), 1)[0][0], "hot")
+        index.upsert("new", (110, 0, 0))
+        self.assertEqual(index.radius((108, 0, 0), 5.0)[0][0], "new")
+
+    def test_bulk_load_validation(self):
+        with self.assertRaises(ValueError):
+            LabColorIndex().bulk_load(["a", "a"], [(50, 0, 0), (60, 0, 0)])
+        with self.assertRaises(ValueError):
+            LabColorIndex().bulk_load(["a"], [(50, 0, 0), (60, 0, 0)])
+        self.assertEqual(LabColorIndex().knn((50, 0, 0), 3), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Unit tests for the fast sRGB → LAB conversion.
+"""
+
+import unittest
+
+import numpy as np
+
+from preprocess.color_lab import lab_lut, srgb_to_lab, srgb_to_lab_reference
+
+
+def _rgb_grid():
+    v = np.r_[np.arange(0, 256, 3), 255].astype(np.uint8)
+    return np.stack(np.meshgrid(v, v, v, indexing="ij"), axis=-1).reshape(-1, 3)
+
+
+class TestSrgbToLab(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.rgb = _rgb_grid()
+        cls.ref = srgb_to_lab_reference(cls.rgb)
+
+    def test_reference_known_values(self):
+        lab = srgb_to_lab_reference(np.array([[255, 255, 255], [0, 0, 0], [255, 0, 0]], dtype=np.uint8))
+        np.testing.assert_allclose(lab[0], (100.0, 0.0, 0.0), atol=1e-2)
+        np.testing.assert_allclose(lab[1], (0.0, 0.0, 0.0), atol=1e-9)
+        np.testing.assert_allclose(lab[2], (53.24, 80.09, 67.20), atol=1e-2)
+
+    def test_exact_matches_reference(self):
+        lab = srgb_to_lab(self.rgb)
+        self.assertEqual(lab.dtype, np.float32)
+        self.assertLess(np.linalg.norm(lab - self.ref, axis=1).max(), 1e-3)
+
+    def test_lut_error_bounds(self):
+        for bits, max_err, mean_err in ((6, 3.0, 1.0), (7, 1.0, 0.45)):
+            err = np.linalg.norm(srgb_to_lab(self.rgb, lut_bits=bits) - self.ref, axis=1)
+            self.assertLess(err.max(), max_err)
+            self.assertLess(err.mean(), mean_err)
+        self.assertEqual(lab_lut(6).shape, (3, 1 << 18))
+
+    def test_frame_into_out_buffer(self):
+        frame = np.random.default_rng(0).integers(0, 256, (48, 64, 3), dtype=np.uint8)
+        out = np.empty(frame.shape, dtype=np.float32)
+        res = srgb_to_lab(frame, out)
+        self.assertIs(res, out)
+        np.testing.assert_allclose(out, srgb_to_lab_reference(frame), atol=1e-3)
+
+        # non-contiguous input (BGR view) and output
+        bgr = np.ascontiguousarray(frame[..., ::-1])
+        wide = np.zeros((48, 64, 4), dtype=np.float32)
+        with self.assertRaises(ValueError):
+            srgb_to_lab(bgr[..., ::-1], wide)
+        res = srgb_to_lab(bgr[..., ::-1], wide[..., :3])
+        np.testing.assert_allclose(wide[..., :3], out, atol=1e-4)
+
+    def test_rejects_non_uint8(self):
+        with self.assertRaises(ValueError):
+            srgb_to_lab(np.zeros((4, 4, 3), dtype=np.float32))
+        with self.assertRaises(ValueError):
+            srgb_to_lab(np.zeros((4, 4, 3), dtype=np.uint8), out=np.zeros((4, 4, 3), dtype=np.float64))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit tests for the server-wide degradation ladder.
+"""
+
+import threading
+import unittest
+
+from services.degrade import DegradeConfig, DegradeController, QualityLevel
+
+
+def _feed(ctrl, ms, n):
+    changes = []
+    for _ in range(n):
+        level = ctrl.observe(0.0, ms)
+        if level is not None:
+            changes.append(level.name)
+    return changes
+
+
+class TestDegradeController(unittest.TestCase):
+
+    def setUp(self):
+        self.cfg = DegradeConfig(target_ms=100.0, alpha=1.0, settle_down=5, settle_up=20)
+
+    def test_steps_down_under_load_and_up_with_hysteresis(self):
+        ctrl = DegradeController(self.cfg)
+        self.assertEqual(_feed(ctrl, 50.0, 50), [])  # within budget, nothing changes
+        self.assertEqual(_feed(ctrl, 300.0, 10), ["no_blur", "low_res"])
+        self.assertEqual(ctrl.current().name, "low_res")
+        # between step_up * target and target: hold the level
+        self.assertEqual(_feed(ctrl, 80.0, 100), [])
+        # light load: recover one level per settle_up frames
+        self.assertEqual(_feed(ctrl, 20.0, 40), ["no_blur", "full"])
+        m = ctrl.metrics()
+        self.assertEqual((m["stepDowns"], m["stepUps"], m["name"]), (2, 2, "full"))
+
+    def test_bottom_level_refuses_sessions_and_skips_frames(self):
+        ctrl = DegradeController(self.cfg)
+        self.assertTrue(ctrl.accepts_sessions())
+        _feed(ctrl, 1000.0, 100)
+        level = ctrl.current()
+        self.assertEqual(level, self.cfg.levels[-1])
+        self.assertFalse(ctrl.accepts_sessions())
+        self.assertEqual(ctrl.metrics()["rejectedSessions"], 1)
+        self.assertEqual([level.detects(i) for i in range(1, 7)], [False, False, True, False, False, True])
+        self.assertTrue(QualityLevel("full").detects(7))
+
+    def test_recovers_when_idle(self):
+        now = [0.0]
+        ctrl = DegradeController(DegradeConfig(target_ms=100.0, alpha=1.0, settle_down=5, idle_s=5.0),
+                                 clock=lambda: now[0])
+        _feed(ctrl, 1000.0, 100)
+        self.assertEqual(ctrl.current().name, "shed")
+        self.assertFalse(ctrl.accepts_sessions())
+        # every session left: no frames arrive, yet the ladder climbs back up
+        now[0] += 4.0
+        self.assertFalse(ctrl.accepts_sessions())
+        now[0] += 1.0
+        self.assertEqual(ctrl.current().name, "skip_frames")
+        self.assertTrue(ctrl.accepts_sessions())
+        now[0] += 60.0
+        self.assertEqual(ctrl.current().name, "full")
+        self.assertIsNone(ctrl.ewma_ms)
+        self.assertEqual(ctrl.metrics()["stepUps"], 4)
+        # still steps down again under renewed load
+        self.assertEqual(_feed(ctrl, 1000.0, 5), ["no_blur"])
+
+    def test_disabled_never_changes_level(self):
+        ctrl = DegradeController(DegradeConfig(enabled=False, alpha=1.0, settle_down=1))
+        self.assertEqual(_feed(ctrl, 10_000.0, 50), [])
+        self.assertEqual(ctrl.current().name, "full")
+
+    def test_admission_gate_measures_wait_and_drops(self):
+        ctrl = DegradeController(DegradeConfig(max_concurrent=1, max_wait_ms=50.0))
+        inside = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with ctrl.admit() as wait_ms:
+                self.assertIsNotNone(wait_ms)
+                inside.set()
+                release.wait(5)
+
+        t = threading.Thread(target=hold)
+        t.start()
+        inside.wait(5)
+        with ctrl.admit() as wait_ms:
+            self.assertIsNone(wait_ms)  # slot busy past max_wait_ms
+        release.set()
+        t.join()
+        with ctrl.admit() as wait_ms:
+            self.assertLess(wait_ms, 50.0)
+        m = ctrl.metrics()
+        self.assertEqual(m["dropped"], 1)
+        self.assertGreaterEqual(m["waitMsMax"], 45.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
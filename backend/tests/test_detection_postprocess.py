@@ -0,0 +1,82 @@
+"""
+Unit tests for array-native detection results and vectorized box post-processing.
+"""
+
+import unittest
+import numpy as np
+
+from detection.results import Detections, build_label_table, lookup_labels
+from preprocess.utils import boxes_to_video_xywh, clamp_xywh, parse_det, xyxy_to_xywh
+
+
+def _scalar_reference(dets, sx, sy, W, H):
+    """The original per-detection loop from segment_frame."""
+    out = []
+    for i, d in enumerate(dets):
+        x1, y1, x2, y2, conf, cls_idx = parse_det(d)
+        x, y, w, h = xyxy_to_xywh(x1 * sx, y1 * sy, x2 * sx, y2 * sy)
+        x, y, w, h = clamp_xywh(x, y, w, h, W, H)
+        if w < 8 or h < 8:
+            continue
+        out.append((i, [x, y, w, h]))
+    return out
+
+
+class TestDetections(unittest.TestCase):
+    """Test the Detections container."""
+
+    def test_empty(self):
+        d = Detections.empty()
+        self.assertEqual(len(d), 0)
+        self.assertEqual(d.to_tuples(), [])
+
+    def test_tuple_view(self):
+        d = Detections(
+            boxes=np.array([[1.7, 2.2, 30.9, 40.0]], dtype=np.float32),
+            classes=np.array([3]),
+            scores=np.array([0.5], dtype=np.float32),
+        )
+        self.assertEqual(d.to_tuples(), [(1, 2, 30, 40, 3, 0.5)])
+
+
+class TestBoxPostprocess(unittest.TestCase):
+    """Vectorized pass must match the scalar helpers."""
+
+    def test_matches_scalar_path(self):
+        rng = np.random.default_rng(0)
+        W, H = 1280, 720
+        sx, sy = W / 640, H / 360
+        x1 = rng.uniform(-50, 660, 200)
+        y1 = rng.uniform(-50, 380, 200)
+        boxes = np.stack([x1, y1, x1 + rng.uniform(0, 200, 200), y1 + rng.uniform(0, 200, 200)], axis=1)
+        boxes = boxes.astype(np.float32)
+        dets = Detections(boxes, np.zeros(200, dtype=np.int64), np.ones(200, dtype=np.float32))
+
+        xywh, keep = boxes_to_video_xywh(dets.boxes, sx, sy, W, H)
+        got = [(i, xywh[i].tolist()) for i in np.flatnonzero(keep).tolist()]
+        expected = _scalar_reference(
+            [tuple(b) + (0, 1.0) for b in boxes.astype(np.float64).tolist()], sx, sy, W, H
+        )
+        self.assertEqual(got, expected)
+
+    def test_empty_input(self):
+        xywh, keep = boxes_to_video_xywh(np.zeros((0, 4), dtype=np.float32), 1.0, 1.0, 10, 10)
+        self.assertEqual(xywh.shape, (0, 4))
+        self.assertEqual(keep.shape, (0,))
+
+
+class TestLabelLookup(unittest.TestCase):
+    """Test vectorized class id → label mapping."""
+
+    def test_dict_names_with_fallback(self):
+        table = build_label_table({0: "shirt", 2: "skirt"})
+        labels = lookup_labels(table, np.array([0, 1, 2, 3, -1]))
+        self.assertEqual(labels.tolist(), ["shirt", "garment", "skirt", "garment", "garment"])
+
+    def test_list_names(self):
+        table = build_label_table(["a", "b"])
+        self.assertEqual(lookup_labels(table, np.array([1, 5])).tolist(), ["b", "garment"])
+
+
+if __name__ == "__main__":
+    unittest.main()
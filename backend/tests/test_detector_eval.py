@@ -0,0 +1,139 @@
+"""
+Unit tests for the detector accuracy-vs-latency evaluation harness.
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from detection.evaluate import (
+    DF2_CATEGORIES, EvalResult, EvalSetting, MatchAccumulator, average_precision, box_iou,
+    cached_export, class_mapping, evaluate_run, iter_deepfashion2, map_classes, match_detections, pareto_front,
+    write_report,
+)
+from detection.results import Detections
+
+
+def _box(x1, y1, x2, y2):
+    return [float(x1), float(y1), float(x2), float(y2)]
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_box_iou(self):
+        a = np.array([_box(0, 0, 10, 10)])
+        b = np.array([_box(0, 0, 10, 10), _box(5, 0, 15, 10), _box(20, 20, 30, 30)])
+        np.testing.assert_allclose(box_iou(a, b), [[1.0, 1 / 3, 0.0]])
+
+    def test_greedy_matching(self):
+        gt = np.array([_box(0, 0, 10, 10), _box(50, 50, 60, 60)])
+        gtc = np.array([0, 1])
+        boxes = np.array([_box(0, 0, 10, 10), _box(1, 0, 10, 10), _box(50, 50, 60, 60), _box(50, 50, 60, 60)])
+        classes = np.array([0, 0, 0, 1])
+        scores = np.array([0.6, 0.9, 0.8, 0.7])
+        # highest-scoring duplicate takes the GT; a wrong-class box never matches
+        np.testing.assert_array_equal(match_detections(boxes, classes, scores, gt, gtc), [False, True, False, True])
+
+    def test_average_precision(self):
+        self.assertAlmostEqual(average_precision(np.array([0.9, 0.8]), np.array([True, True]), 2), 1.0)
+        self.assertEqual(average_precision(np.array([0.9]), np.array([False]), 1), 0.0)
+        # TP, FP, TP over 2 GT: precision 1 up to recall .5, 2/3 up to 1
+        ap = average_precision(np.array([0.9, 0.8, 0.7]), np.array([True, False, True]), 2)
+        self.assertAlmostEqual(ap, (51 * 1.0 + 50 * 2 / 3) / 101)
+        self.assertTrue(np.isnan(average_precision(np.zeros(0), np.zeros(0, bool), 0)))
+
+    def test_conf_threshold_reuses_matches(self):
+        acc = MatchAccumulator(2)
+        gt = np.array([_box(0, 0, 10, 10), _box(20, 0, 30, 10)])
+        acc.add(np.array([_box(0, 0, 10, 10), _box(20, 0, 30, 10)]), np.array([0, 1]),
+                np.array([0.9, 0.3]), gt, np.array([0, 1]))
+        names = ("a", "b")
+        self.assertEqual(acc.summary(0.25, names), (1.0, {"a": 1.0, "b": 1.0}))
+        self.assertEqual(acc.summary(0.5, names), (0.5, {"a": 1.0, "b": 0.0}))
+
+    def test_pareto_front(self):
+        def r(imgsz, m, p50):
+            return EvalResult(EvalSetting(imgsz, 0.25), 10, m, {}, {"mean": p50, "p50": p50, "p90": p50, "p99": p50})
+        rs = [r(416, 0.40, 10), r(640, 0.50, 20), r(768, 0.45, 25), r(960, 0.55, 40), r(1280, 0.55, 60)]
+        front = pareto_front(rs)
+        self.assertEqual([x.setting.imgsz for x in front], [416, 640, 960])
+        self.assertEqual([x.pareto for x in rs], [True, True, False, True, False])
+
+    def test_class_mapping(self):
+        table = class_mapping({0: "trousers", 1: "person", 2: "Short Sleeve Top"})
+        np.testing.assert_array_equal(table, [7, -1, 0])
+        np.testing.assert_array_equal(map_classes(table, np.array([2, 0, 1, 5])), [0, 7, -1, -1])
+        # no names match: ids are taken as category indices
+        np.testing.assert_array_equal(class_mapping(["c0", "c1"]), [0, 1])
+
+
+class TestHarness(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name) / "validation"
+        (root / "image").mkdir(parents=True)
+        (root / "annos").mkdir()
+        for i in range(6):
+            img = np.zeros((64, 64, 3), dtype=np.uint8)
+            cv2.imwrite(str(root / "image" / f"{i:06d}.jpg"), img)
+            anno = {"source": "user", "pair_id": i,
+                    "item1": {"category_id": 8, "bounding_box": [4, 4, 40, 60]}}
+            (root / "annos" / f"{i:06d}.json").write_text(json.dumps(anno))
+        self.root = root
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stream_and_report(self):
+        samples = list(iter_deepfashion2(self.root, limit=4, seed=1))
+        self.assertEqual(len(samples), 4)
+        self.assertEqual(samples[0][2].tolist(), [7])
+
+        def predict(rgb):
+            self.assertEqual(rgb.shape, (64, 64, 3))
+            return Detections(np.array([_box(4, 4, 40, 60)], np.float32), np.array([0]), np.array([0.8], np.float32))
+
+        acc, lat = evaluate_run(predict, iter_deepfashion2(self.root), class_mapping({0: "trousers"}), warmup=2)
+        self.assertEqual((acc.images, len(lat)), (6, 4))
+        map50, recall = acc.summary(0.25, DF2_CATEGORIES)
+        self.assertEqual((map50, recall), (1.0, {"trousers": 1.0}))
+
+        out = Path(self.tmp.name) / "report"
+        write_report([EvalResult(EvalSetting(640, 0.25), 6, map50, recall,
+                                 {"mean": 1.0, "p50": 1.0, "p90": 2.0, "p99": 3.0})], out)
+        report = json.loads((out / "report.json").read_text())
+        self.assertTrue(report["results"][0]["pareto"])
+        self.assertIn("| trousers | 1.000 |", (out / "report.md").read_text())
+
+    def test_cached_export(self):
+        cache = Path(self.tmp.name) / "exports"
+        target = cache / "best-onnx-fp32-640"
+        calls = []
+
+        def export(fail=False):
+            calls.append(fail)
+            out = Path(self.tmp.name) / "best.onnx"  # exporters write next to the weights
+            out.write_bytes(b"model")
+            if fail:
+                raise RuntimeError("export crashed")
+            return out
+
+        with self.assertRaises(RuntimeError):
+            cached_export(target, lambda: export(fail=True))
+        self.assertFalse(target.exists())
+        self.assertEqual(list(cache.iterdir()), [])  # temporary directory cleaned up
+
+        target.mkdir()  # empty entry left by an older, interrupted export: a miss
+        path = cached_export(target, export)
+        self.assertEqual((path, path.read_bytes()), (target / "best.onnx", b"model"))
+        self.assertEqual(cached_export(target, export), path)
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Unit tests for the per-session frame buffer pool.
+"""
+
+import base64
+import tracemalloc
+import unittest
+
+import cv2
+import numpy as np
+
+from preprocess.frame_pool import FramePool, decode_data_url_rgb
+from services.sessions import SessionStore
+
+
+def _data_url(rgb, ext=".png"):
+    ok, enc = cv2.imencode(ext, cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR))
+    assert ok
+    return f"data:image/{ext[1:]};base64," + base64.b64encode(enc.tobytes()).decode()
+
+
+class TestFramePool(unittest.TestCase):
+
+    def test_reuse_and_reshape(self):
+        pool = FramePool()
+        a = pool.get("x", (4, 5, 3))
+        self.assertIs(pool.get("x", (4, 5, 3)), a)
+        self.assertEqual(pool.metrics()["bytes_held"], 60)
+        b = pool.get("x", (8, 5, 3))        # capture size changed: replaced, not added
+        self.assertIsNot(b, a)
+        self.assertEqual(pool.metrics()["bytes_held"], 120)
+        pool.get("y", (8, 5), np.float32)
+        m = pool.metrics()
+        self.assertEqual((m["buffers"], m["allocations"], m["reuses"]), (2, 3, 1))
+        self.assertEqual(m["peak_bytes"], 280)
+        pool.release()
+        self.assertEqual(pool.metrics()["bytes_held"], 0)
+
+    def test_decode_into_pool(self):
+        rgb = np.random.default_rng(0).integers(0, 256, (48, 64, 3), dtype=np.uint8)
+        pool = FramePool()
+        out = decode_data_url_rgb(_data_url(rgb), pool)
+        np.testing.assert_array_equal(out, rgb)
+        self.assertIs(decode_data_url_rgb(_data_url(rgb[::-1].copy()), pool), out)
+        np.testing.assert_array_equal(out, rgb[::-1])
+        with self.assertRaises(ValueError):
+            decode_data_url_rgb("data:image/webp;base64,AAAA", pool)
+
+    def test_steady_state_allocations(self):
+        rng = np.random.default_rng(1)
+        urls = [_data_url(rng.integers(0, 256, (120, 160, 3), dtype=np.uint8), ".webp") for _ in range(4)]
+        pool = FramePool()
+
+        def step(url):
+            with pool.frame():
+                rgb = decode_data_url_rgb(url, pool)
+                mask = pool.get("mask", rgb.shape[:2])
+                cv2.compare(rgb[..., 0], 128, cv2.CMP_GT, dst=mask)
+                out = cv2.GaussianBlur(rgb, (15, 15), 0, dst=pool.get("out", rgb.shape))
+                cv2.copyTo(rgb, mask, out)
+
+        step(urls[0])
+        self.assertEqual(pool.allocations_last_frame, 3)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for url in urls * 5:
+                step(url)
+                self.assertEqual(pool.allocations_last_frame, 0)
+            retained = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        self.assertLess(retained, 4096)
+        self.assertEqual(pool.metrics()["frames"], 21)
+
+    def test_session_store_metrics(self):
+        store = SessionStore()
+        store.get("a").frames.get("rgb", (2, 2, 3))
+        self.assertEqual(store.frame_metrics()["a"]["bytes_held"], 12)
+        frames = store.get("a").frames
+        store.drop("a")
+        self.assertEqual(frames.metrics()["bytes_held"], 0)
+        self.assertEqual(store.frame_metrics(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+"""
+Unit tests for deadline-aware hedged calls, against a stub VLM with injected latencies.
+"""
+
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+
+from services.hedge import Deadline, HedgedCaller, LatencyTracker
+
+
+class StubVLM:
+    """Attempt i sleeps delays[i] (capped by its timeout, like an HTTP client) then answers or raises."""
+
+    def __init__(self, delays, errors=()):
+        self.delays = list(delays)
+        self.errors = dict(errors)   # attempt index → exception
+        self.timeouts = []
+        self.ends = []               # when each attempt's own timeout would fire
+        self._lock = threading.Lock()
+
+    def __call__(self, timeout):
+        with self._lock:
+            i = len(self.timeouts)
+            self.timeouts.append(timeout)
+            self.ends.append(time.monotonic() + timeout)
+        delay = self.delays[min(i, len(self.delays) - 1)]
+        time.sleep(min(delay, timeout))
+        if delay > timeout:
+            raise TimeoutError(f"attempt {i} timed out")
+        if i in self.errors:
+            raise self.errors[i]
+        return {"attempt": i}
+
+
+def _fallback(err):
+    return {"fallback": True, "error": err}
+
+
+class TestHedgedCaller(unittest.TestCase):
+
+    def setUp(self):
+        self.caller = HedgedCaller(
+            max_workers=4, tracker=LatencyTracker(min_samples=1, default_s=0.05),
+            min_attempt_s=0.01, backoff_s=0.01,
+        )
+
+    def test_fast_call_is_not_hedged(self):
+        vlm = StubVLM([0.0])
+        self.assertEqual(self.caller.call(vlm, Deadline(1.0), _fallback), {"attempt": 0})
+        self.assertEqual(len(vlm.timeouts), 1)
+        self.assertLessEqual(vlm.timeouts[0], 1.0)
+        self.assertEqual(self.caller.stats["hedges"], 0)
+
+    def test_slow_call_is_hedged_past_p90(self):
+        for _ in range(5):
+            self.caller.tracker.observe(0.03)
+        vlm = StubVLM([5.0, 0.0])   # first attempt stuck, the hedge answers at once
+        t0 = time.monotonic()
+        self.assertEqual(self.caller.call(vlm, Deadline(2.0), _fallback), {"attempt": 1})
+        self.assertLess(time.monotonic() - t0, 0.5)
+        self.assertEqual((self.caller.stats["hedges"], self.caller.stats["hedgeWins"]), (1, 1))
+
+    def test_budget_exhausted_returns_fallback(self):
+        vlm = StubVLM([5.0])
+        t0 = time.monotonic()
+        res = self.caller.call(vlm, Deadline(0.2), _fallback)
+        elapsed = time.monotonic() - t0
+        # either the deadline passes first (no error) or an attempt's own timeout fires just before it
+        self.assertTrue(res["fallback"])
+        self.assertTrue(res["error"] is None or isinstance(res["error"], TimeoutError))
+        self.assertLess(elapsed, 0.4)
+        self.assertEqual(len(vlm.timeouts), 2)  # first try + hedge
+        self.assertTrue(all(t <= 0.2 for t in vlm.timeouts))
+        self.assertEqual(self.caller.stats["fallbacks"], 1)
+
+    def test_queued_attempts_never_outlive_the_deadline(self):
+        # one worker shared by two calls: the second call's attempts wait in the queue
+        caller = HedgedCaller(max_workers=1, tracker=LatencyTracker(min_samples=1, default_s=5.0),
+                              min_attempt_s=0.05, backoff_s=0.01)
+        vlm = StubVLM([0.3, 5.0])   # first call answers at 0.3 s, the second's attempt hangs
+        deadline = Deadline(0.5)
+        results = [None, None]
+
+        def run(i):
+            results[i] = caller.call(vlm, deadline, _fallback)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+        for t in threads:
+            t.start()
+            time.sleep(0.01)
+        for t in threads:
+            t.join()
+        self.assertEqual(results[0], {"attempt": 0})
+        self.assertTrue(results[1]["fallback"])  # its attempt times out at (or just before) the deadline
+        self.assertEqual(len(vlm.timeouts), 2)
+        # the queued attempt started at ~0.3 s with the ~0.2 s left, not the full budget
+        self.assertLess(vlm.timeouts[1], 0.25)
+        for end in vlm.ends:
+            self.assertLessEqual(end, deadline.at + 1e-3)
+
+    def test_attempt_dequeued_too_late_is_skipped(self):
+        caller = HedgedCaller(max_workers=1, tracker=LatencyTracker(min_samples=1, default_s=5.0),
+                              min_attempt_s=0.2)
+        blocker = threading.Event()
+        caller._ex.submit(blocker.wait)   # saturate the pool
+        vlm = StubVLM([0.0])
+        deadline = Deadline(0.3)
+        threading.Timer(0.15, blocker.set).start()  # frees the worker with < min_attempt_s left
+        self.assertEqual(caller.call(vlm, deadline, _fallback), {"fallback": True, "error": None})
+        caller._ex.shutdown(wait=True)
+        self.assertEqual(vlm.timeouts, [])  # the VLM was never called
+        self.assertEqual(caller.stats["expired"], 1)
+
+    def test_call_many_caps_calls_in_flight(self):
+        # no hedges (p90 stays at the 5 s default), so in-flight calls = running attempts
+        caller = HedgedCaller(max_workers=6, tracker=LatencyTracker(min_samples=100, default_s=5.0),
+                              min_attempt_s=0.01)
+        lock, running, peak = threading.Lock(), [0], [0]
+
+        def work(i):
+            def fn(timeout):
+                with lock:
+                    running[0] += 1
+                    peak[0] = max(peak[0], running[0])
+                time.sleep(0.05)
+                with lock:
+                    running[0] -= 1
+                return i
+            return fn
+
+        out = list(caller.call_many([(work(i), _fallback) for i in range(6)], Deadline(2.0), max_in_flight=2))
+        self.assertEqual(sorted(i for i, _, _ in out), list(range(6)))
+        self.assertTrue(all(res == i and err is None for i, res, err in out))
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(caller.stats["calls"], 6)
+
+    def test_call_many_waits_on_joined_futures(self):
+        answered, stuck = Future(), Future()
+        threading.Timer(0.05, answered.set_result, ({"shared": True},)).start()
+        calls = [(StubVLM([0.0]), _fallback), (answered, _fallback), (stuck, _fallback)]
+        out = {i: (res, err) for i, res, err in self.caller.call_many(calls, Deadline(0.3))}
+        self.assertEqual(out[0], ({"attempt": 0}, None))
+        self.assertEqual(out[1], ({"shared": True}, None))
+        self.assertEqual(out[2], ({"fallback": True, "error": None}, None))
+        self.assertEqual((self.caller.stats["calls"], self.caller.stats["fallbacks"]), (1, 0))
+
+    def test_failures_are_retried_within_budget(self):
+        vlm = StubVLM([0.0], errors={0: ConnectionError("reset"), 1: ConnectionError("reset")})
+        self.assertEqual(self.caller.call(vlm, Deadline(1.0), _fallback), {"attempt": 2})
+        self.assertEqual(self.caller.stats["retries"], 2)
+
+    def test_last_error_reported_when_attempts_run_out(self):
+        err = ConnectionError("down")
+        vlm = StubVLM([0.0], errors={i: err for i in range(4)})
+        self.assertEqual(self.caller.call(vlm, Deadline(1.0), _fallback), {"fallback": True, "error": err})
+
+    def test_non_retryable_error_raises(self):
+        caller = HedgedCaller(retry_on=(ConnectionError,), tracker=LatencyTracker(min_samples=1))
+        with self.assertRaises(ValueError):
+            caller.call(StubVLM([0.0], errors={0: ValueError("bad schema")}), Deadline(1.0), _fallback)
+
+    def test_latency_tracker(self):
+        t = LatencyTracker(min_samples=3, default_s=4.0)
+        self.assertEqual(t.quantile(0.9), 4.0)
+        for s in (0.1, 0.2, 0.3, 0.4, 1.0):
+            t.observe(s)
+        self.assertEqual(t.quantile(0.9), 1.0)
+        self.assertEqual(t.quantile(0.5), 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Unit tests for the SQLite score history store.
+"""
+
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from scoring import load_config, score_outfit
+from scoring.calibrate import random_outfits
+from scoring.parsed import parse_outfit
+from services.history import HistoryStore, dominant_lab, features_hash, history_row
+
+
+class TestHistoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = HistoryStore(Path(self._tmp.name) / "h.sqlite3", batch_size=64, flush_interval_s=0.01)
+        cfg = load_config()
+        self.scored = [(f, score_outfit(f, cfg)) for f in random_outfits(300)]
+
+    def tearDown(self):
+        self.store.close()
+        self._tmp.cleanup()
+
+    def test_row_fields(self):
+        f, r = self.scored[0]
+        row = dict(zip(("ts", "version", "features_hash", "outfit_id", "score"), history_row(f, r, ts=5.0)))
+        self.assertEqual(row["ts"], 5.0)
+        self.assertEqual(row["version"], r["version"])
+        self.assertEqual(row["score"], r["styleScore"])
+        self.assertEqual(row["features_hash"], features_hash({**f, "outfitId": "other"}))
+        self.assertEqual(dominant_lab({"colorClusters": [], "garments": []}), None)
+        self.assertEqual(dominant_lab({"colorClusters": [{"lab": (1, 2, 3), "pct": 0.2},
+                                                         {"lab": (4, 5, 6), "pct": 0.7}]}), (4, 5, 6))
+
+    def test_canonical_features_hash(self):
+        # one outfit sent sparsely (defaults omitted, ints) and in full: same hash once parsed
+        sparse = {"outfitId": "a", "garments": [{"id": "g0", "type": "top", "areaPct": 0.3,
+                                                 "colorLAB": [50, 10, -5], "material": "cotton"}],
+                  "colorClusters": [{"lab": [50, 10, -5], "pct": 1}], "thirdsArea": {"top": 1},
+                  "domainZ": {"hue": 1}, "extractionVersion": "v"}
+        full = {"outfitId": "b", "garments": [{"id": "g0", "type": "top", "areaPct": 0.3,
+                                               "colorLAB": (50.0, 10.0, -5.0), "material": "cotton",
+                                               "patternType": "none", "glossIndex": 0.0}],
+                "colorClusters": [{"lab": (50.0, 10.0, -5.0), "pct": 1.0}],
+                "thirdsArea": {"top": 1.0, "mid": 0.0, "bottom": 0.0},
+                "domainZ": {"hue": 1.0}, "body": None, "extractionVersion": "v"}
+        self.assertNotEqual(features_hash(sparse), features_hash(full))
+        self.assertEqual(features_hash(parse_outfit(sparse).to_features()),
+                         features_hash(parse_outfit(full).to_features()))
+
+    def test_writer_thread_batches_and_queries(self):
+        for f, r in self.scored:
+            self.assertTrue(self.store.add(f, r))
+        self.store.flush()
+        m = self.store.metrics()
+        self.assertEqual((m["written"], m["dropped"], m["pending"]), (300, 0, 0))
+        self.assertLess(m["batches"], 300)
+
+        version = self.scored[0][1]["version"]
+        scores = sorted((r["styleScore"] for _, r in self.scored), reverse=True)
+        self.assertEqual([row["score"] for row in self.store.top(version, 5)], scores[:5])
+        self.assertEqual([row["score"] for row in self.store.top(version, 3, lowest=True)], scores[::-1][:3])
+        lo, hi = scores[-50], scores[50]
+        in_range = self.store.score_range(lo, hi, version, limit=1000)
+        self.assertEqual(len(in_range), sum(lo <= s <= hi for s in scores))
+        self.assertEqual(self.store.count(version), 300)
+        self.assertEqual(len(self.store.time_range(time.time() - 60)), 300)
+        self.assertEqual(self.store.time_range(0.0, 1.0), [])
+
+    def test_recent_is_distinct_per_features(self):
+        f, r = self.scored[0]
+        for i in range(3):
+            self.store.add({**f, "outfitId": f"o{i}"}, r)
+        g, s = self.scored[1]
+        self.store.add(g, s)
+        self.store.flush()
+        recent = self.store.recent(r["version"])
+        self.assertEqual([row["features_hash"] for row in recent], [features_hash(g), features_hash(f)])
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        store = HistoryStore(Path(self._tmp.name) / "small.sqlite3", max_queue=1, flush_interval_s=0.01)
+        try:
+            f, r = self.scored[0]
+            added = sum(store.add(f, r) for _ in range(200))
+            store.flush()
+            m = store.metrics()
+            self.assertEqual(m["queued"], added)
+            self.assertEqual(m["dropped"], 200 - added)
+            self.assertEqual(store.count(), m["written"])
+        finally:
+            store.close()
+
+    def test_bulk_insert(self):
+        rows = [history_row(f, r, ts=float(i)) for i, (f, r) in enumerate(self.scored)]
+        self.assertEqual(self.store.bulk_insert(rows, chunk=100), 300)
+        self.assertEqual(self.store.count(), 300)
+        self.assertEqual(len(self.store.time_range(10.0, 19.0)), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Unit tests for the double-buffered detector holder (YOLO weight hot swap).
+"""
+
+import threading
+import unittest
+import numpy as np
+
+from detection.hot_swap import DetectorHolder, check_detections, warm_and_check
+from detection.results import Detections, build_label_table
+
+
+class FakeDetector:
+    """Returns one fixed box; records the inference sizes it was run at."""
+
+    def __init__(self, name, box=(10, 10, 50, 80), cls=0, score=0.9):
+        self.name = name
+        self.box, self.cls, self.score = box, cls, score
+        self.label_table = build_label_table({0: "top", 1: "skirt"})
+        self.sizes = []
+        self.closed = False
+
+    def predict_arrays(self, image, imgsz=None):
+        self.sizes.append(imgsz)
+        return Detections(boxes=np.array([self.box], dtype=np.float32),
+                          classes=np.array([self.cls], dtype=np.int64),
+                          scores=np.array([self.score], dtype=np.float32), imgsz=imgsz)
+
+
+def _holder(**detectors):
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    return DetectorHolder(
+        detectors.pop("live"), source="a.pt",
+        load=lambda src: detectors[src],
+        prepare=lambda det: warm_and_check(det, frame, (416, 960)),
+        on_release=lambda det: setattr(det, "closed", True),
+    )
+
+
+class TestCheckDetections(unittest.TestCase):
+
+    def test_plausible_and_implausible(self):
+        frame_shape = (100, 100, 3)
+        self.assertIsNone(check_detections(Detections.empty(), 2, frame_shape))
+        self.assertIsNone(check_detections(FakeDetector("x").predict_arrays(None), 2, frame_shape))
+        self.assertIn("class ids", check_detections(FakeDetector("x", cls=5).predict_arrays(None), 2, frame_shape))
+        self.assertIn("scores", check_detections(FakeDetector("x", score=3.0).predict_arrays(None), 2, frame_shape))
+        self.assertIn("outside", check_detections(
+            FakeDetector("x", box=(0, 0, 900, 50)).predict_arrays(None), 2, frame_shape))
+        self.assertIn("non-finite", check_detections(
+            FakeDetector("x", box=(0, 0, np.nan, 50)).predict_arrays(None), 2, frame_shape))
+
+
+class TestDetectorHolder(unittest.TestCase):
+
+    def test_swap_warms_checks_and_releases_idle_old(self):
+        old, new = FakeDetector("old"), FakeDetector("new")
+        holder = _holder(live=old, **{"b.pt": new})
+        report = holder.swap("b.pt", wait=True)
+        self.assertEqual(report["state"], "swapped")
+        self.assertEqual((report["generation"], report["source"]), (1, "b.pt"))
+        self.assertEqual(report["canary"]["warmedSizes"], [416, 960])
+        self.assertEqual(new.sizes, [416, 960, None])
+        self.assertIs(holder.current, new)
+        self.assertTrue(old.closed)
+
+    def test_old_detector_released_after_in_flight_frame(self):
+        old, new = FakeDetector("old"), FakeDetector("new")
+        holder = _holder(live=old, **{"b.pt": new})
+        with holder.acquire() as det:
+            holder.swap("b.pt", wait=True)
+            self.assertIs(det, old)          # the running frame keeps its model
+            self.assertFalse(old.closed)
+            with holder.acquire() as nxt:
+                self.assertIs(nxt, new)      # the next frame gets the new one
+        self.assertTrue(old.closed)
+        self.assertFalse(new.closed)
+        self.assertEqual(holder.report()["released"], 0)
+
+    def test_failed_canary_keeps_live_detector(self):
+        old, bad = FakeDetector("old"), FakeDetector("bad", cls=7)
+        holder = _holder(live=old, **{"bad.pt": bad})
+        report = holder.swap("bad.pt", wait=True)
+        self.assertEqual(report["state"], "failed")
+        self.assertIn("canary check failed", report["error"])
+        self.assertIs(holder.current, old)
+        self.assertTrue(bad.closed)
+        self.assertFalse(old.closed)
+
+    def test_load_error_and_concurrent_swap(self):
+        old = FakeDetector("old")
+        gate = threading.Event()
+
+        def slow_load(src):
+            gate.wait(5)
+            raise FileNotFoundError(src)
+
+        holder = DetectorHolder(old, source="a.pt", load=slow_load)
+        holder.swap("missing.pt")
+        with self.assertRaises(RuntimeError):
+            holder.swap("other.pt")
+        gate.set()
+        holder._thread.join(5)
+        report = holder.report()
+        self.assertEqual(report["state"], "failed")
+        self.assertIn("FileNotFoundError", report["error"])
+        self.assertIs(holder.current, old)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Unit tests for the wardrobe top-K outfit optimizer.
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+from scoring import score_outfit, load_config
+from scoring.color_distance import delta_e_00, delta_e_00_matrix
+from scoring.optimizer import top_k_outfits, outfit_features_from_garments
+
+
+def _wardrobe(counts, seed=0):
+    rng = random.Random(seed)
+    mats = ["denim", "cotton", "wool", "knit", "leather", "satin", "silk", "synthetic"]
+    out = []
+    for t, n in counts.items():
+        for i in range(n):
+            out.append({
+                "id": f"{t}{i}", "type": t, "areaPct": rng.uniform(0.02, 0.45),
+                "colorLAB": (rng.uniform(20, 80), rng.uniform(-30, 30), rng.uniform(-30, 30)),
+                "material": rng.choice(mats), "patternType": rng.choice(["none", "plaid", "stripe"]),
+                "patternStrength": rng.random(), "glossIndex": rng.random(),
+            })
+    return out
+
+
+def _brute_force(wardrobe, domain_z, cfg):
+    by = lambda t: [g for g in wardrobe if g["type"] == t]
+    bases = [[t, b] for t in by("top") for b in by("bottom")] + [[d] for d in by("dress")]
+    scores = []
+    for base in bases:
+        for o in [None] + by("outer"):
+            for a in [None] + by("accessory"):
+                gs = base + [x for x in (o, a) if x is not None]
+                scores.append(score_outfit(outfit_features_from_garments(gs, domain_z), cfg)["styleScore"])
+    return sorted(scores, reverse=True)
+
+
+class TestDeltaEMatrix(unittest.TestCase):
+    """Vectorized CIEDE2000 must match the scalar implementation."""
+
+    def test_matches_scalar(self):
+        rng = np.random.default_rng(1)
+        labs = np.c_[rng.uniform(0, 100, 40), rng.uniform(-80, 80, 40), rng.uniform(-80, 80, 40)]
+        labs[:3, 1:] = 0.0  # achromatic edge cases
+        M = delta_e_00_matrix(labs, labs)
+        ref = np.array([[delta_e_00(tuple(a), tuple(b)) for b in labs] for a in labs])
+        np.testing.assert_allclose(M, ref, atol=1e-9)
+
+
+class TestTopKOutfits(unittest.TestCase):
+    """Optimizer top-K must equal exhaustive score_outfit ranking."""
+
+    def setUp(self):
+        self.cfg = load_config()
+        self.dz = {"skin": 0.2, "hue": 1.4, "texture": 0.5, "pattern": 0.1}
+
+    def test_matches_brute_force(self):
+        for seed in range(3):
+            w = _wardrobe({"top": 4, "bottom": 3, "dress": 2, "outer": 2, "accessory": 3}, seed)
+            results, stats = top_k_outfits(w, k=8, domain_z=self.dz, cfg=self.cfg)
+            self.assertEqual([r["styleScore"] for r in results], _brute_force(w, self.dz, self.cfg)[:8])
+            self.assertEqual(stats.combinations, (4 * 3 + 2) * 3 * 4)
+
+    def test_pruning_on_larger_wardrobe(self):
+        w = _wardrobe({"top": 20, "bottom": 15, "dress": 5, "outer": 8, "accessory": 10}, 7)
+        results, stats = top_k_outfits(w, k=5, domain_z=self.dz, cfg=self.cfg)
+        self.assertEqual(len(results), 5)
+        self.assertLess(stats.leaves_scored, stats.combinations)
+        best = results[0]
+        garments = [g for gid in best["garmentIds"] for g in w if g["id"] == gid]
+        rescored = score_outfit(outfit_features_from_garments(garments, self.dz), self.cfg)
+        self.assertEqual(rescored["styleScore"], best["styleScore"])
+
+    def test_empty_wardrobe(self):
+        results, stats = top_k_outfits([], k=3, cfg=self.cfg)
+        self.assertEqual(results, [])
+        self.assertEqual(stats.combinations, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
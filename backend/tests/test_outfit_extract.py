@@ -0,0 +1,145 @@
+"""
+Unit tests for server-side OutfitFeatures extraction (score_current).
+"""
+
+import time
+import unittest
+import numpy as np
+
+from preprocess.color_lab import srgb_to_lab_reference
+from scoring import load_config, score_outfit
+from scoring.parsed import parse_outfit
+from preprocess.rle import rle_encode
+from services.outfit_extract import extract_outfit_features, garment_type, pattern_type
+from services.sessions import SessionStore
+
+RED = (200, 30, 40)
+NAVY = (20, 30, 110)
+
+
+def _frame():
+    """320x240 det-sized frame: red top over navy trousers on grey."""
+    rgb = np.full((240, 320, 3), 128, dtype=np.uint8)
+    rgb[20:120, 100:220] = RED
+    rgb[120:230, 110:210] = NAVY
+    return rgb
+
+
+# same garments in 640x480 video coordinates
+SEG = {"width": 640, "height": 480, "items": [
+    {"id": "g0", "bbox": [200, 40, 240, 200], "label": "short_sleeve_top", "score": 0.9},
+    {"id": "g1", "bbox": [220, 240, 200, 220], "label": "trousers", "score": 0.8},
+]}
+
+
+class TestOutfitExtract(unittest.TestCase):
+
+    def test_features(self):
+        f = extract_outfit_features(_frame(), SEG, outfit_id="o1")
+        parse_outfit(f)  # valid OutfitFeatures
+        top, bottom = f["garments"]
+        self.assertEqual((top["type"], bottom["type"]), ("top", "bottom"))
+        for g, rgb in ((top, RED), (bottom, NAVY)):
+            ref = srgb_to_lab_reference(np.array([[rgb]], dtype=np.uint8))[0, 0]
+            np.testing.assert_allclose(g["colorLAB"], ref, atol=0.05)
+        self.assertAlmostEqual(top["areaPct"], 240 * 200 / (640 * 480), places=4)
+
+        # clusters follow area: red 12000 px, navy 11000 px in frame space
+        clusters = f["colorClusters"]
+        self.assertEqual(len(clusters), 2)
+        self.assertAlmostEqual(clusters[0]["pct"], 12000 / 23000, delta=0.03)
+        self.assertLess(np.abs(np.subtract(clusters[0]["lab"], top["colorLAB"])).max(), 1.0)
+        self.assertAlmostEqual(sum(f["thirdsArea"].values()), 1.0)
+
+        res = score_outfit(f, load_config())
+        self.assertTrue(0.0 <= res["styleScore"] <= 100.0)
+
+    def test_gloss_from_highlights(self):
+        rgb = _frame()
+        rng = np.random.default_rng(0)
+        # scattered near-white specular spots on ~10% of the navy garment
+        ys, xs = rng.integers(120, 230, 1100), rng.integers(110, 210, 1100)
+        rgb[ys, xs] = (235, 235, 240)
+        top, bottom = extract_outfit_features(rgb, SEG)["garments"]
+        self.assertLess(top["glossIndex"], 0.1)      # flat red: matte
+        self.assertGreaterEqual(bottom["glossIndex"], 0.7)
+        ref = srgb_to_lab_reference(np.array([[NAVY]], dtype=np.uint8))[0, 0]
+        np.testing.assert_allclose(bottom["colorLAB"], ref, atol=0.05)  # highlights don't move the color
+
+        # light print elements are not gloss
+        patterns = {"g1": {"id": "g1", "label": "trousers", "pattern": "dots", "confidence": 0.6}}
+        bottom = extract_outfit_features(rgb, SEG, patterns)["garments"][1]
+        self.assertEqual(bottom["glossIndex"], 0.1)
+
+    def test_dominant_color_is_the_mode(self):
+        rgb = _frame()
+        rgb[30:60, 120:200] = (240, 220, 60)  # large yellow logo, ~40% of the top's center
+        top = extract_outfit_features(rgb, SEG)["garments"][0]
+        ref = srgb_to_lab_reference(np.array([[RED]], dtype=np.uint8))[0, 0]
+        np.testing.assert_allclose(top["colorLAB"], ref, atol=0.05)
+
+    def test_mask_selects_garment_pixels(self):
+        # top box is mostly background; the mask marks the red garment inside it
+        rgb = np.full((240, 320, 3), 128, dtype=np.uint8)
+        rgb[20:120, 100:140] = RED
+        mask = np.zeros((50, 60), dtype=bool)
+        mask[:, :20] = True  # frame box is 120x100 (x 100..220), mask 60x50
+        seg = {"width": 640, "height": 480, "items": [dict(SEG["items"][0], mask=rle_encode(mask))]}
+        top = extract_outfit_features(rgb, seg)["garments"][0]
+        ref = srgb_to_lab_reference(np.array([[RED]], dtype=np.uint8))[0, 0]
+        np.testing.assert_allclose(top["colorLAB"], ref, atol=0.05)
+        # without the mask the central crop is mostly grey
+        plain = {"width": 640, "height": 480, "items": [SEG["items"][0]]}
+        self.assertLess(extract_outfit_features(rgb, plain)["garments"][0]["colorLAB"][1], 5.0)
+        # a malformed mask falls back to the central crop
+        bad = {"width": 640, "height": 480, "items": [dict(SEG["items"][0], mask={"size": [3, 3], "counts": "0"})]}
+        self.assertEqual(extract_outfit_features(rgb, bad)["garments"],
+                         extract_outfit_features(rgb, plain)["garments"])
+
+    def test_many_boxes_fast(self):
+        rng = np.random.default_rng(1)
+        rgb = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+        items = [{"id": f"g{i}", "bbox": [40 * i, 20 * i, 320, 400], "label": "trousers"} for i in range(8)]
+        seg = {"width": 640, "height": 480, "items": items}
+        extract_outfit_features(rgb, seg)
+        t0 = time.perf_counter()
+        f = extract_outfit_features(rgb, seg)
+        self.assertEqual(len(f["garments"]), 8)
+        self.assertLess(time.perf_counter() - t0, 0.25)  # a few ms in practice; loose for CI
+
+    def test_patterns_reused_by_id_and_label(self):
+        patterns = {"g0": {"id": "g0", "label": "short_sleeve_top", "pattern": "striped", "confidence": 0.7},
+                    "g1": {"id": "g1", "label": "skirt", "pattern": "plaid", "confidence": 0.9}}
+        top, bottom = extract_outfit_features(_frame(), SEG, patterns)["garments"]
+        self.assertEqual((top["patternType"], top["patternStrength"]), ("stripe", 0.7))
+        self.assertEqual((bottom["patternType"], bottom["patternStrength"]), ("none", 0.0))  # stale label
+
+    def test_label_maps(self):
+        self.assertEqual(garment_type("long_sleeve_outwear"), "outer")
+        self.assertEqual(garment_type("sling_dress"), "dress")
+        self.assertEqual(garment_type("shorts"), "bottom")
+        self.assertEqual(garment_type("bag"), "accessory")
+        self.assertEqual(pattern_type("polka_dots"), "dots")
+        self.assertEqual(pattern_type("solid"), "none")
+        self.assertEqual(pattern_type("geom"), "other")
+
+    def test_session_latest(self):
+        store = SessionStore()
+        s = store.get("a")
+        self.assertIsNone(s.latest())
+        rgb = _frame()
+        s.remember_frame(rgb, SEG)
+        s.remember_patterns([{"id": "g0", "label": "x", "pattern": "plaid"},
+                             {"id": "g1", "label": "y", "error": "timeout"}])
+        frame, seg, patterns = s.latest()
+        rgb[:] = 0  # later frames don't affect the snapshot
+        self.assertEqual(int(frame[60, 150, 0]), RED[0])
+        self.assertIs(seg, SEG)
+        self.assertEqual(list(patterns), ["g0"])
+        allocs = s.frames.allocations
+        s.remember_frame(rgb, SEG)
+        self.assertEqual(s.frames.allocations, allocs)
+
+
+if __name__ == "__main__":
+    unittest.main()
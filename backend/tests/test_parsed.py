@@ -0,0 +1,98 @@
+"""
+Unit tests for parse-once ParsedOutfit inputs.
+"""
+
+import copy
+import json
+import unittest
+
+from scoring import ParseError, ParsedOutfit, load_config, parse_outfit, score_outfit
+from scoring.calibrate import random_outfits
+from scoring.scorer import score_pattern_balance, score_repetition, score_texture_mix
+
+
+def _body():
+    return {
+        "outfitId": "abc123",
+        "garments": [
+            {"id": "top1", "type": "top", "areaPct": 0.31, "colorLAB": [62, -4, -8], "material": "cotton",
+             "patternType": "plaid", "patternStrength": 0.72, "glossIndex": 0.1},
+            {"id": "shoe1", "type": "accessory", "areaPct": 0.06, "colorLAB": [49, 1, 5], "material": "leather"},
+        ],
+        "colorClusters": [
+            {"lab": [48, 2, 4], "pct": 0.30},
+            {"lab": [60, -5, -7], "pct": 0.52},
+            {"lab": [70, -6, -10], "pct": 0.18},
+        ],
+        "thirdsArea": {"top": 0.35, "mid": 0.30, "bottom": 0.35},
+        "domainZ": {"skin": 0.2, "hue": 1.4, "texture": 0.5, "pattern": 0.1},
+        "extractionVersion": "segm-1.2.0-kmeans-3",
+        "body": {"waist": 16, "neck": 70},
+    }
+
+
+class TestParsedOutfit(unittest.TestCase):
+
+    def setUp(self):
+        self.cfg = load_config()
+
+    def test_scores_match_dict_path(self):
+        samples = [json.loads(json.dumps(f)) for f in random_outfits(300, seed=4)] + [_body()]
+        for f in samples:
+            self.assertEqual(score_outfit(parse_outfit(f), self.cfg), score_outfit(f, self.cfg))
+
+    def test_columns_and_sorted_clusters(self):
+        p = parse_outfit(_body())
+        self.assertIsInstance(p, ParsedOutfit)
+        self.assertEqual(len(p), 2)
+        self.assertEqual(p.lab.shape, (2, 3))
+        self.assertEqual(p.cluster_pct.tolist(), [0.52, 0.30, 0.18])
+        self.assertEqual(p.cluster_lab[0].tolist(), [60.0, -5.0, -7.0])
+        self.assertEqual(p.patterned.tolist(), [True, False])
+        self.assertEqual(p.pattern_types, ("plaid", "none"))
+        self.assertEqual((p.waist, p.neck), (16.0, 70.0))
+        self.assertFalse(hasattr(p, "__dict__"))
+
+    def test_subscore_functions_accept_parsed(self):
+        f = _body()
+        p = parse_outfit(f)
+        self.assertEqual(score_pattern_balance(p, self.cfg), score_pattern_balance(f["garments"], self.cfg))
+        self.assertEqual(score_texture_mix(p, self.cfg)[0], score_texture_mix(f["garments"], self.cfg)[0])
+        clusters = sorted(f["colorClusters"], key=lambda c: c["pct"], reverse=True)
+        self.assertEqual(score_repetition(p), score_repetition(f["garments"], clusters))
+
+    def test_round_trip_to_features(self):
+        p = parse_outfit(_body())
+        again = parse_outfit(p.to_features())
+        self.assertEqual(score_outfit(again, self.cfg), score_outfit(p, self.cfg))
+        self.assertEqual(p.to_features()["garments"][1]["patternType"], "none")
+
+    def test_errors_name_the_field(self):
+        cases = [
+            (lambda d: d.pop("outfitId"), "outfitId"),
+            (lambda d: d.update(garments={}), "garments"),
+            (lambda d: d["garments"][1].pop("material"), "garments[1].material"),
+            (lambda d: d["garments"][0]["colorLAB"].__setitem__(2, "x"), "garments[0].colorLAB[2]"),
+            (lambda d: d["garments"][0].update(colorLAB=[1, 2]), "garments[0].colorLAB"),
+            (lambda d: d["garments"][0].pop("patternStrength"), "garments[0].patternStrength"),
+            (lambda d: d["garments"][0].update(glossIndex=1.5), "garments[0].glossIndex"),
+            (lambda d: d["garments"][0].update(areaPct=True), "garments[0].areaPct"),
+            (lambda d: d["colorClusters"][2].update(pct=-0.1), "colorClusters[2].pct"),
+            (lambda d: d["colorClusters"].__setitem__(1, "red"), "colorClusters[1]"),
+            (lambda d: d["thirdsArea"].update(top=float("nan")), "thirdsArea.top"),
+            (lambda d: d["domainZ"].update(hue=None), "domainZ.hue"),
+            (lambda d: d.update(body={"waist": "16"}), "body.waist"),
+        ]
+        for mutate, path in cases:
+            data = copy.deepcopy(_body())
+            mutate(data)
+            with self.assertRaises(ParseError, msg=path) as ctx:
+                parse_outfit(data)
+            self.assertEqual(ctx.exception.path, path)
+            self.assertTrue(str(ctx.exception).startswith(path + ": "))
+        with self.assertRaises(ParseError):
+            parse_outfit([1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
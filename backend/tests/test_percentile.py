@@ -0,0 +1,90 @@
+"""
+Unit tests for streaming style score percentile ranks.
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from scoring.percentile import N_BINS, ScoreHistogram, ScoreRanks
+
+
+class TestScoreHistogram(unittest.TestCase):
+
+    def test_percentile_matches_sorted_data(self):
+        rng = np.random.default_rng(0)
+        scores = np.round(rng.uniform(0, 100, 5000), 1)
+        h = ScoreHistogram()
+        for s in scores:
+            h.add(float(s))
+        for q in (3.2, 50.0, 71.9, 99.9):
+            expected = 100.0 * ((scores < q).sum() + 0.5 * (scores == q).sum()) / scores.size
+            self.assertAlmostEqual(h.percentile(q), expected, places=9)
+        self.assertAlmostEqual(h.quantile(0.5), float(np.sort(scores)[2499]), places=6)
+
+    def test_ties_and_empty(self):
+        h = ScoreHistogram()
+        self.assertIsNone(h.percentile(50.0))
+        self.assertIsNone(h.quantile(0.5))
+        for s in (10.0, 20.0, 20.0, 30.0):
+            h.add(s)
+        self.assertEqual(h.percentile(20.0), 50.0)
+        self.assertEqual(h.percentile(5.0), 0.0)
+        self.assertEqual(h.percentile(100.0), 100.0)
+
+    def test_out_of_range_scores_are_clamped(self):
+        h = ScoreHistogram()
+        h.add(-3.0)
+        h.add(130.0)
+        self.assertEqual(int(h.counts[0]), 1)
+        self.assertEqual(int(h.counts[N_BINS - 1]), 1)
+
+    def test_snapshot_round_trip_and_merge(self):
+        h = ScoreHistogram()
+        for s in np.linspace(40, 90, 20000):
+            h.add(float(s))
+        blob = h.to_snapshot()
+        self.assertLess(len(blob), 4096)
+        back = ScoreHistogram.from_snapshot(blob)
+        np.testing.assert_array_equal(back.counts, h.counts)
+        back.merge(h)
+        self.assertEqual(back.total, 2 * h.total)
+        self.assertEqual(back.percentile(65.0), h.percentile(65.0))
+
+
+class TestScoreRanks(unittest.TestCase):
+
+    def test_record_includes_self_and_versions_are_separate(self):
+        ranks = ScoreRanks()
+        self.assertEqual(ranks.record("v1", 70.0), 50.0)
+        self.assertEqual(ranks.record("v1", 80.0), 75.0)
+        self.assertEqual(ranks.percentile("v1", 90.0), 100.0)
+        self.assertIsNone(ranks.percentile("v2", 70.0))
+        self.assertEqual(ranks.record("v2", 10.0), 50.0)
+        stats = ranks.stats()
+        self.assertEqual(stats["v1"]["count"], 2)
+        self.assertEqual(stats["v2"]["median"], 10.0)
+
+    def test_save_load_and_periodic_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "sub" / "ranks.json"
+            ranks = ScoreRanks(path, snapshot_every=3)
+            ranks.record("v1", 60.0)
+            ranks.record("v1", 61.0)
+            self.assertFalse(path.exists())
+            ranks.record("v1", 62.0)
+            self.assertTrue(path.exists())
+            ranks.record("v1", 63.0)
+            ranks.save()
+            data = json.loads(path.read_text())
+            self.assertEqual(set(data["versions"]), {"v1"})
+            again = ScoreRanks(path)
+            self.assertEqual(again.percentile("v1", 61.5), ranks.percentile("v1", 61.5))
+            self.assertEqual(again.stats()["v1"]["count"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
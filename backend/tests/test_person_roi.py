@@ -0,0 +1,46 @@
+"""
+Unit tests for person-ROI cropping and crop → video box mapping.
+"""
+
+import unittest
+import numpy as np
+
+from preprocess.person_roi import PersonRoiConfig, offset_boxes, person_roi
+from preprocess.utils import boxes_to_video_xywh
+
+
+class TestPersonRoi(unittest.TestCase):
+
+    def setUp(self):
+        self.mask = np.zeros((540, 960), dtype=np.uint8)
+        self.mask[100:500, 400:600] = 255   # 200x400 person
+
+    def test_padded_box(self):
+        cfg = PersonRoiConfig(pad=0.1, min_pad_px=8)
+        self.assertEqual(person_roi(self.mask, cfg), (380, 60, 620, 540))  # bottom clamped
+
+    def test_min_pad(self):
+        cfg = PersonRoiConfig(pad=0.0, min_pad_px=8)
+        self.assertEqual(person_roi(self.mask, cfg), (392, 92, 608, 508))
+
+    def test_no_roi(self):
+        self.assertIsNone(person_roi(np.zeros_like(self.mask)))
+        tiny = np.zeros_like(self.mask)
+        tiny[10:20, 10:20] = 255
+        self.assertIsNone(person_roi(tiny))
+        full = np.full_like(self.mask, 255)
+        self.assertIsNone(person_roi(full))
+
+    def test_crop_boxes_map_to_video(self):
+        x0, y0, x1, y1 = person_roi(self.mask, PersonRoiConfig(pad=0.1))
+        crop_boxes = np.array([[10.5, 20.0, 110.0, 220.0]], dtype=np.float32)
+        frame_boxes = offset_boxes(crop_boxes, x0, y0)
+        np.testing.assert_array_equal(frame_boxes, [[390.5, 80.0, 490.0, 280.0]])
+        # det-sized frame (960x540) → 1920x1080 video
+        xywh, keep = boxes_to_video_xywh(frame_boxes, 2.0, 2.0, 1920, 1080)
+        np.testing.assert_array_equal(xywh, [[781, 160, 199, 400]])
+        self.assertTrue(keep[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
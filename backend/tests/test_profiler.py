@@ -0,0 +1,92 @@
+"""
+Unit tests for the on-demand stage sampling profiler.
+"""
+
+import threading
+import time
+import unittest
+
+from services.profiler import StageProfiler
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _decode_step():
+    _spin(0.01)
+
+
+def _detect_step():
+    _spin(0.03)
+
+
+def _pipeline(prof, n_frames, stop):
+    for _ in range(n_frames):
+        if stop.is_set():
+            return
+        with prof.frame():
+            with prof.stage("decode"):
+                _decode_step()
+            with prof.stage("detect"):
+                _detect_step()
+
+
+class TestStageProfiler(unittest.TestCase):
+
+    def test_idle_is_a_shared_noop(self):
+        prof = StageProfiler()
+        self.assertIs(prof.stage("decode"), prof.stage("emit"))
+        self.assertIs(prof.frame(), prof.stage("decode"))
+        self.assertEqual(prof.status()["state"], "idle")
+        self.assertEqual(prof.collapsed(), "")
+
+    def test_samples_are_attributed_to_stages(self):
+        prof = StageProfiler(interval_s=0.002)
+        prof.start(frames=5)
+        stop = threading.Event()
+        worker = threading.Thread(target=_pipeline, args=(prof, 50, stop))
+        worker.start()
+        prof._thread.join(5)
+        stop.set()
+        worker.join()
+
+        status = prof.status()
+        self.assertEqual(status["state"], "done")
+        self.assertEqual(status["framesProfiled"], 5)
+        lines = prof.collapsed().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertGreater(int(count), 0)
+            self.assertIn(stack.split(";")[0], ("decode", "detect"))
+            self.assertNotIn("_pipeline", stack)  # frames above the stage entry are cut
+        self.assertTrue(any(l.startswith("detect;test_profiler.py:_detect_step;test_profiler.py:_spin")
+                            for l in lines))
+        by_stage = status["byStage"]
+        self.assertGreater(by_stage["detect"], by_stage.get("decode", 0))
+
+    def test_time_limit_and_single_run(self):
+        prof = StageProfiler(interval_s=0.002)
+        prof.start(seconds=0.05)
+        with self.assertRaises(RuntimeError):
+            prof.start(seconds=1.0)
+        prof._thread.join(2)
+        self.assertFalse(prof.active)
+        self.assertIsNone(prof.status()["framesProfiled"])
+        with self.assertRaises(ValueError):
+            prof.start()
+
+    def test_stop_ends_run_early(self):
+        prof = StageProfiler(interval_s=0.002)
+        prof.start(seconds=60.0)
+        t0 = time.monotonic()
+        prof.stop()
+        self.assertLess(time.monotonic() - t0, 1.0)
+        self.assertEqual(prof.status()["state"], "done")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Unit tests for COCO-style RLE garment masks.
+"""
+
+import unittest
+import numpy as np
+
+from preprocess.rle import (
+    counts_to_string, garment_masks, rle_area, rle_counts, rle_decode, rle_encode, string_to_counts,
+)
+
+
+class TestRle(unittest.TestCase):
+
+    def test_counts_are_column_major_zeros_first(self):
+        m = np.array([[0, 1, 1],
+                      [0, 1, 0]], dtype=bool)
+        # column-major: 0 0 | 1 1 | 1 0
+        self.assertEqual(rle_counts(m).tolist(), [2, 3, 1])
+        self.assertEqual(rle_counts(np.ones((2, 2), bool)).tolist(), [0, 4])
+        self.assertEqual(rle_encode(np.ones((2, 2), bool)), {"size": [2, 2], "counts": "04"})
+
+    def test_string_round_trip_with_negative_deltas(self):
+        for counts in ([5, 2, 3, 1], [0, 4], [100000, 1, 2, 99999, 7], [1]):
+            self.assertEqual(string_to_counts(counts_to_string(counts)).tolist(), counts)
+
+    def test_encode_decode_round_trip(self):
+        rng = np.random.default_rng(0)
+        for shape in ((1, 1), (7, 13), (64, 48)):
+            for p in (0.0, 0.3, 1.0):
+                m = rng.random(shape) < p
+                rle = rle_encode(m)
+                np.testing.assert_array_equal(rle_decode(rle), m)
+                self.assertEqual(rle_area(rle), int(m.sum()))
+
+    def test_blob_mask_is_compact(self):
+        yy, xx = np.mgrid[:64, :48]
+        m = (yy - 32) ** 2 / 30.0 ** 2 + (xx - 24) ** 2 / 20.0 ** 2 < 1.0
+        self.assertLess(len(rle_encode(m)["counts"]), 200)
+
+    def test_decode_rejects_wrong_size(self):
+        with self.assertRaises(ValueError):
+            rle_decode({"size": [3, 3], "counts": "04"})
+
+
+class TestGarmentMasks(unittest.TestCase):
+
+    def test_person_mask_intersected_with_boxes(self):
+        person = np.zeros((100, 200), np.uint8)
+        person[20:80, 50:150] = 255
+        boxes = np.array([[40, 10, 100, 60], [160, 0, 190, 30], [5, 5, 5, 50]], np.float32)
+        rles = garment_masks(boxes, person=person, max_side=1000)
+        crop = rle_decode(rles[0])
+        self.assertEqual(crop.shape, (50, 60))
+        np.testing.assert_array_equal(crop, person[10:60, 40:100] > 0)
+        self.assertEqual(rle_area(rles[1]), 0)   # box outside the person
+        self.assertIsNone(rles[2])               # empty box
+
+    def test_downsampled_to_max_side(self):
+        person = np.full((300, 400), 255, np.uint8)
+        rle = garment_masks(np.array([[0, 0, 400, 200]], np.float32), person=person, max_side=64)[0]
+        self.assertEqual(rle["size"], [32, 64])
+        self.assertEqual(rle_area(rle), 32 * 64)
+
+    def test_instance_masks_take_precedence(self):
+        inst = np.zeros((2, 40, 40), bool)
+        inst[0, 5:15, 5:15] = True
+        inst[1, 20:40, 0:10] = True
+        person = np.full((40, 40), 255, np.uint8)
+        boxes = np.array([[0, 0, 20, 20], [0, 20, 10, 40]], np.float32)
+        rles = garment_masks(boxes, masks=inst, person=person)
+        self.assertEqual(rle_area(rles[0]), 100)
+        self.assertEqual(rle_area(rles[1]), 200)
+        self.assertEqual(garment_masks(boxes), [None, None])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Unit tests for incremental what-if rescoring sessions.
+"""
+
+import copy
+import unittest
+
+from scoring import score_outfit, load_config, ScoringSession, ScoringSessionStore, OutfitFeatures
+
+
+def _outfit() -> OutfitFeatures:
+    return {
+        "outfitId": "abc123",
+        "garments": [
+            {"id": "top1", "type": "top", "areaPct": 0.31, "colorLAB": (62, -4, -8), "material": "cotton",
+             "patternType": "plaid", "patternStrength": 0.72, "glossIndex": 0.1},
+            {"id": "pant1", "type": "bottom", "areaPct": 0.41, "colorLAB": (50, 0, 0), "material": "denim",
+             "patternType": "none", "patternStrength": 0.0, "glossIndex": 0.05},
+            {"id": "shoe1", "type": "accessory", "areaPct": 0.06, "colorLAB": (60, -5, -7), "material": "leather",
+             "patternType": "none", "patternStrength": 0.0, "glossIndex": 0.8},
+            {"id": "bag1", "type": "accessory", "areaPct": 0.04, "colorLAB": (30, 20, 10), "material": "leather",
+             "patternType": "none", "patternStrength": 0.0, "glossIndex": 0.2},
+        ],
+        "colorClusters": [
+            {"lab": (48, 2, 4), "pct": 0.30},
+            {"lab": (60, -5, -7), "pct": 0.52},
+            {"lab": (70, -6, -10), "pct": 0.18},
+        ],
+        "thirdsArea": {"top": 0.35, "mid": 0.30, "bottom": 0.35},
+        "domainZ": {"skin": 0.2, "hue": 1.4, "texture": 0.5, "pattern": 0.1},
+        "extractionVersion": "segm-1.2.0-kmeans-3",
+        "body": None,
+    }
+
+
+class TestScoringSession(unittest.TestCase):
+    """Session results must match a full rescore after every patch."""
+
+    def setUp(self):
+        self.cfg = load_config()
+        self.session = ScoringSession(_outfit(), self.cfg)
+
+    def assertMatchesFullRescore(self, result):
+        expected = score_outfit(self.session.features(), self.cfg)
+        self.assertEqual(result["styleScore"], expected["styleScore"])
+        self.assertEqual(result["subscores"], expected["subscores"])
+        self.assertEqual(result["explanations"], expected["explanations"])
+
+    def test_initial_matches_score_outfit(self):
+        self.assertEqual(self.session.result()["subscores"], score_outfit(_outfit(), self.cfg)["subscores"])
+
+    def test_recolor_accessory_only_touches_repetition(self):
+        r = self.session.apply([{"op": "updateGarment", "id": "bag1", "fields": {"colorLAB": (48, 2, 4)}}])
+        self.assertEqual(self.session.last_recomputed, ["R"])
+        self.assertMatchesFullRescore(r)
+
+    def test_replace_garment(self):
+        top = {"id": "top1", "type": "top", "areaPct": 0.3, "colorLAB": (40, 30, 20), "material": "silk",
+               "patternType": "stripe", "patternStrength": 0.4, "glossIndex": 0.9}
+        r = self.session.apply([{"op": "upsertGarment", "garment": top}])
+        self.assertEqual(self.session.last_recomputed, ["P", "T"])
+        self.assertMatchesFullRescore(r)
+
+    def test_domain_z_only_touches_highlight(self):
+        r = self.session.apply([{"op": "set", "field": "domainZ",
+                                 "value": {"skin": 1.2, "hue": 1.4, "texture": 0.5, "pattern": 0.1}}])
+        self.assertEqual(self.session.last_recomputed, ["H"])
+        self.assertMatchesFullRescore(r)
+
+    def test_clusters_and_removal(self):
+        clusters = [{"lab": (30, 20, 10), "pct": 0.6}, {"lab": (50, 0, 0), "pct": 0.4}]
+        r = self.session.apply([
+            {"op": "set", "field": "colorClusters", "value": clusters},
+            {"op": "removeGarment", "id": "shoe1"},
+        ])
+        self.assertMatchesFullRescore(r)
+        r = self.session.apply([{"op": "removeGarment", "id": "bag1"}])
+        self.assertEqual(r["debug"]["repetition"], {"reason": "no_accessories"})
+        self.assertMatchesFullRescore(r)
+
+    def test_invalid_ops_leave_state_untouched(self):
+        before = copy.deepcopy(self.session.result())
+        with self.assertRaises(ValueError):
+            self.session.apply([
+                {"op": "removeGarment", "id": "top1"},
+                {"op": "removeGarment", "id": "nope"},
+            ])
+        with self.assertRaises(ValueError):
+            self.session.apply([{"op": "explode"}])
+        self.assertEqual(self.session.result(), before)
+
+    def test_failed_batch_rolls_back(self):
+        before, features = copy.deepcopy(self.session.result()), self.session.features()
+        # each op is valid against the pre-batch state, not after the ones before it
+        for ops in ([{"op": "removeGarment", "id": "bag1"}, {"op": "removeGarment", "id": "bag1"}],
+                    [{"op": "removeGarment", "id": "bag1"},
+                     {"op": "updateGarment", "id": "bag1", "fields": {"colorLAB": (48, 2, 4)}}],
+                    [{"op": "set", "field": "colorClusters", "value": [{"lab": (30, 20, 10), "pct": 1.0}]},
+                     {"op": "updateGarment", "id": "top1", "fields": {"material": None, "colorLAB": None}},
+                     {"op": "set", "field": "domainZ", "value": [1]}]):
+            with self.assertRaises(ValueError):
+                self.session.apply(ops)
+            self.assertEqual(self.session.result(), before)
+            self.assertEqual(self.session.features(), features)
+            self.assertMatchesFullRescore(self.session.result())
+        # still usable afterwards
+        self.assertMatchesFullRescore(self.session.apply([{"op": "removeGarment", "id": "bag1"}]))
+
+
+class TestScoringSessionStore(unittest.TestCase):
+    """Test the bounded session registry."""
+
+    def test_lru_eviction(self):
+        store = ScoringSessionStore(max_sessions=2)
+        a, _ = store.create(_outfit())
+        b, _ = store.create(_outfit())
+        store.get(a)
+        c, _ = store.create(_outfit())
+        self.assertIsNotNone(store.get(a))
+        self.assertIsNone(store.get(b))
+        self.assertIsNotNone(store.get(c))
+        self.assertTrue(store.drop(a))
+        self.assertFalse(store.drop(a))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Unit tests for the compact/delta segmentation protocol encoder.
+"""
+
+import unittest
+
+from services.seg_delta import SegDeltaConfig, SegDeltaEncoder
+
+
+def _seg(*items, width=1280, height=720):
+    return {
+        "width": width,
+        "height": height,
+        "items": [{"id": i, "bbox": list(b), "label": "shirt", "score": 0.9} for i, b in items],
+    }
+
+
+def _apply(state, msg):
+    """Reference client: rebuild {id: row} from a message."""
+    if msg["key"]:
+        return {r[0]: r for r in msg["items"]}
+    out = dict(state)
+    for gid in msg["del"]:
+        out.pop(gid, None)
+    for r in msg["upd"] + msg["add"]:
+        out[r[0]] = r
+    return out
+
+
+class TestSegDelta(unittest.TestCase):
+    """Test delta encoding against acknowledged client state."""
+
+    def test_first_frame_is_keyframe(self):
+        enc = SegDeltaEncoder()
+        msg = enc.encode(_seg(("g0", (10, 10, 50, 50))))
+        self.assertTrue(msg["key"])
+        self.assertEqual(msg["items"], [["g0", 10, 10, 50, 50, "shirt", 0.9]])
+
+    def test_small_moves_are_suppressed(self):
+        enc = SegDeltaEncoder(SegDeltaConfig(tolerance_px=4))
+        m1 = enc.encode(_seg(("g0", (10, 10, 50, 50)), ("g1", (100, 100, 40, 40))))
+        enc.ack(m1["seq"])
+        m2 = enc.encode(_seg(("g0", (12, 11, 50, 50)), ("g2", (300, 300, 20, 20))))
+        self.assertFalse(m2["key"])
+        self.assertEqual(m2["base"], m1["seq"])
+        self.assertEqual(m2["upd"], [])
+        self.assertEqual([r[0] for r in m2["add"]], ["g2"])
+        self.assertEqual(m2["del"], ["g1"])
+
+    def test_drift_is_measured_against_client_view(self):
+        enc = SegDeltaEncoder(SegDeltaConfig(tolerance_px=4))
+        state = {}
+        last = None
+        for x in (10, 13, 16, 19):  # 3px per frame, 9px total
+            enc.ack(last)
+            msg = enc.encode(_seg(("g0", (x, 10, 50, 50))))
+            state = _apply(state, msg)
+            last = msg["seq"]
+        self.assertLessEqual(abs(state["g0"][1] - 19), 4)
+
+    def test_quality_level_is_carried(self):
+        enc = SegDeltaEncoder()
+        m1 = enc.encode({**_seg(("g0", (10, 10, 50, 50))), "quality": "full"})
+        enc.ack(m1["seq"])
+        m2 = enc.encode({**_seg(("g0", (10, 10, 50, 50))), "quality": "no_blur"})
+        self.assertEqual((m1["quality"], m2["quality"]), ("full", "no_blur"))
+        self.assertNotIn("quality", enc.encode(_seg(("g0", (10, 10, 50, 50)))))
+
+    def test_imgsz_is_carried(self):
+        enc = SegDeltaEncoder()
+        m1 = enc.encode({**_seg(("g0", (10, 10, 50, 50))), "imgsz": 640})
+        enc.ack(m1["seq"])
+        m2 = enc.encode({**_seg(("g0", (10, 10, 50, 50))), "imgsz": 416})
+        self.assertEqual((m1["key"], m2["key"]), (True, False))
+        self.assertEqual((m1["imgsz"], m2["imgsz"]), (640, 416))
+
+    def test_mask_rides_along_and_toggling_resends(self):
+        enc = SegDeltaEncoder()
+        seg = _seg(("g0", (10, 10, 50, 50)))
+        m1 = enc.encode(seg)
+        enc.ack(m1["seq"])
+        rle = {"size": [2, 2], "counts": "04"}
+        seg["items"][0]["mask"] = rle
+        m2 = enc.encode(seg)
+        self.assertEqual(m2["upd"], [["g0", 10, 10, 50, 50, "shirt", 0.9, rle]])
+
+    def test_unknown_ack_forces_keyframe(self):
+        enc = SegDeltaEncoder()
+        enc.encode(_seg(("g0", (10, 10, 50, 50))))
+        enc.ack(999)
+        self.assertTrue(enc.encode(_seg(("g0", (10, 10, 50, 50))))["key"])
+
+    def test_periodic_keyframe(self):
+        enc = SegDeltaEncoder(SegDeltaConfig(keyframe_every=2))
+        keys = []
+        for _ in range(6):
+            msg = enc.encode(_seg(("g0", (10, 10, 50, 50))))
+            enc.ack(msg["seq"])
+            keys.append(msg["key"])
+        self.assertEqual(keys, [True, False, False, True, False, False])
+
+    def test_msgpack_roundtrip(self):
+        try:
+            import msgpack
+        except ImportError:
+            self.skipTest("msgpack not installed")
+        enc = SegDeltaEncoder(SegDeltaConfig(encoding="msgpack"))
+        msg = enc.encode(_seg(("g0", (10, 10, 50, 50))))
+        self.assertEqual(msgpack.unpackb(enc.pack(msg), raw=False), msg)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Unit tests for single-flight request coalescing.
+"""
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from scoring import load_config, score_outfit
+from scoring.calibrate import random_outfits
+from services.singleflight import SingleFlight, content_key
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_content_key(self):
+        self.assertEqual(content_key({"a": 1, "b": [1, 2]}), content_key({"b": [1, 2], "a": 1}))
+        self.assertNotEqual(content_key("ab", "c"), content_key("a", "bc"))
+        self.assertEqual(content_key(b"x"), content_key("x"))
+
+    def test_concurrent_identical_calls_share_one_run(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        runs = []
+
+        def work():
+            runs.append(1)
+            release.wait(5)
+            return {"v": 42}
+
+        with ThreadPoolExecutor(8) as ex:
+            futs = [ex.submit(flight.do, "k", work) for _ in range(8)]
+            while flight.metrics()["calls"] < 8:
+                time.sleep(0.001)
+            release.set()
+            results = [f.result() for f in futs]
+
+        self.assertEqual(len(runs), 1)
+        self.assertTrue(all(r == {"v": 42} for r, _ in results))
+        self.assertEqual(sum(shared for _, shared in results), 7)
+        self.assertEqual(flight.metrics(), {"calls": 8, "executions": 1, "coalesced": 7, "inFlight": 0})
+
+        # nothing is cached once the call is done
+        self.assertEqual(flight.do("k", lambda: 1), (1, False))
+
+    def test_errors_propagate_to_waiters(self):
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def boom():
+            started.set()
+            release.wait(5)
+            raise RuntimeError("vlm down")
+
+        with ThreadPoolExecutor(2) as ex:
+            leader = ex.submit(flight.do, "k", boom)
+            started.wait(5)
+            waiter = ex.submit(flight.do, "k", lambda: "unused")
+            while flight.metrics()["coalesced"] < 1:
+                time.sleep(0.001)
+            release.set()
+            for f in (leader, waiter):
+                with self.assertRaises(RuntimeError):
+                    f.result()
+        self.assertEqual(flight.metrics()["inFlight"], 0)
+
+    def test_join_and_settle(self):
+        flight = SingleFlight()
+        lead, leader = flight.join("k")
+        follow, follower = flight.join("k")
+        self.assertEqual((leader, follower), (True, False))
+        self.assertIs(follow, lead)
+        self.assertFalse(follow.done())
+        flight.settle("k", {"v": 1})
+        self.assertEqual(follow.result(), {"v": 1})
+        self.assertEqual(flight.metrics(), {"calls": 2, "executions": 1, "coalesced": 1, "inFlight": 0})
+
+        lead, _ = flight.join("k")  # a new call once settled
+        flight.settle("k", error=RuntimeError("vlm down"))
+        with self.assertRaises(RuntimeError):
+            lead.result()
+
+    def test_scoring_results_match(self):
+        cfg = load_config()
+        flight = SingleFlight()
+        f = random_outfits(1)[0]
+        key = content_key({k: v for k, v in f.items() if k != "outfitId"})
+        self.assertEqual(flight.do(key, lambda: score_outfit(f, cfg))[0], score_outfit(f, cfg))
+
+
+if __name__ == "__main__":
+    unittest.main()
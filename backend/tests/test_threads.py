@@ -0,0 +1,83 @@
+"""
+Unit tests for the CPU thread budget (config/threads.py).
+"""
+
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+try:
+    from config import threads
+except ImportError:  # config/__init__ loads defaults, which imports torch
+    threads = None
+
+
+@unittest.skipIf(threads is None, "torch not installed")
+class TestPlanThreadBudget(unittest.TestCase):
+
+    def test_split(self):
+        b = threads.plan_thread_budget(n_cpus=8, sessions=1, ai_workers=3)
+        self.assertEqual((b.torch_intra, b.torch_interop, b.opencv, b.ai_workers), (4, 1, 2, 3))
+        self.assertEqual(b.affinity, {})
+
+    def test_shared_across_sessions(self):
+        b = threads.plan_thread_budget(n_cpus=16, sessions=2)
+        self.assertEqual((b.torch_intra, b.opencv), (4, 2))
+        b = threads.plan_thread_budget(n_cpus=8, sessions=3)
+        self.assertEqual((b.torch_intra, b.opencv), (1, 1))  # never below one thread
+        b = threads.plan_thread_budget(n_cpus=1, sessions=0)
+        self.assertEqual((b.torch_intra, b.opencv), (1, 1))
+
+    def test_pin_splits_cpus(self):
+        with mock.patch.object(threads, "os", SimpleNamespace()):  # no sched_getaffinity
+            b = threads.plan_thread_budget(n_cpus=4, pin=True)
+        self.assertEqual(b.affinity, {"pipeline": (0, 1, 2), "ai": (3,)})
+        with mock.patch.object(threads, "os", SimpleNamespace()):
+            self.assertEqual(threads.plan_thread_budget(n_cpus=1, pin=True).affinity, {})
+
+
+@unittest.skipIf(threads is None, "torch not installed")
+class TestPinStage(unittest.TestCase):
+
+    def setUp(self):
+        self._active = threads._active
+        self.setaffinity = mock.Mock()
+        self.os = SimpleNamespace(sched_setaffinity=self.setaffinity)
+        patcher = mock.patch.object(threads, "os", self.os)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        threads._active = self._active
+
+    def _run(self, *stages):
+        # fresh thread: pin_stage remembers the stage per thread
+        t = threading.Thread(target=lambda: [threads.pin_stage(s) for s in stages])
+        t.start()
+        t.join()
+
+    def test_no_budget(self):
+        threads._active = None
+        self._run("pipeline")
+        self.setaffinity.assert_not_called()
+
+    def test_pinning_disabled(self):
+        threads._active = threads.ThreadBudget(4, 1, 2, 3)  # no affinity
+        self._run("pipeline", "ai")
+        self.setaffinity.assert_not_called()
+
+    def test_no_sched_setaffinity(self):
+        threads._active = threads.ThreadBudget(4, 1, 2, 3, affinity={"pipeline": (0, 1)})
+        del self.os.sched_setaffinity
+        self._run("pipeline")  # no AttributeError
+        self.setaffinity.assert_not_called()
+
+    def test_pins_once_per_thread(self):
+        threads._active = threads.ThreadBudget(4, 1, 2, 3, affinity={"pipeline": (0, 1), "ai": (2,)})
+        self._run("pipeline", "pipeline", "unknown", "ai")
+        self.assertEqual(self.setaffinity.call_args_list, [mock.call(0, (0, 1)), mock.call(0, (2,))])
+
+
+if __name__ == "__main__":
+    unittest.main()
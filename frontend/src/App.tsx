@@ -5,41 +5,56 @@ import ConnectionOverlay from "./components/ConnectionOverlay";
 import PatternModal, { type PatternItem } from "./components/PatternModal";
 import StyleScoreModal from "./components/StyleScoreModal";
 import { BoundingBoxOverlay } from "./components/BoundingBoxOverlay";
-import type { PatternResult, SegmentationPayload } from "./types/socket";
-import { createOutfitFeatures } from "./utils/outfitFeatures";
-import type { OutfitFeatures } from "./types/styleScore";
+import type {
+  CaptureHint,
+  PatternResult,
+  SegmentationPayload,
+  SegProtocolOptions,
+} from "./types/socket";
+import { scoreCurrent } from "./api/styleScore";
+import type { StyleScore } from "./types/styleScore";
+
+// Opt into the compact segmentation protocol with VITE_SEG_PROTOCOL=delta | delta-msgpack,
+// and into per-garment masks with VITE_SEG_MASKS=1
+const SEG_PROTOCOL: SegProtocolOptions = (() => {
+  const v = import.meta.env.VITE_SEG_PROTOCOL;
+  const masks = import.meta.env.VITE_SEG_MASKS === "1";
+  if (v === "delta") return { mode: "delta", encoding: "arrays", masks };
+  if (v === "delta-msgpack") return { mode: "delta", encoding: "msgpack", masks };
+  return { mode: "full", masks };
+})();
 
 export default function App() {
   const videoRef = useRef<HTMLVideoElement>(null);
   const inflight = useRef(false);
-  const { socket: socketRef, status } = useSocket({
+  // capture settings; updated by server "capture_hint" messages
+  const captureRef = useRef<CaptureHint>({ width: 640, quality: 0.75, maxFps: 30 });
+  const lastSentAt = useRef(0);
+  const [seg, setSeg] = useState<SegmentationPayload | null>(null);
+  const { socket: socketRef, status, sendFrame } = useSocket({
     url: "http://localhost:5000",
+    segProtocol: SEG_PROTOCOL,
+    onSegmentation: (data) => {
+      setSeg(data);
+      inflight.current = false;
+    },
   });
 
-  const [seg, setSeg] = useState<SegmentationPayload | null>(null);
   const [renderSize, setRenderSize] = useState({ w: 0, h: 0 });
 
   // Modal state
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [modalItems, setModalItems] = useState<PatternItem[]>([]);
   const [isScoreModalOpen, setIsScoreModalOpen] = useState(false);
-  const [outfitFeatures, setOutfitFeatures] = useState<OutfitFeatures | null>(null);
-  const [patternResults, setPatternResults] = useState<PatternResult[]>([]);
+  const [scoreRequest, setScoreRequest] = useState<(() => Promise<StyleScore>) | null>(null);
 
   // Socket event wiring
   useEffect(() => {
     const socket = socketRef.current;
     if (!socket) return;
 
-    const onSeg = (data: SegmentationPayload) => {
-      setSeg(data);
-      inflight.current = false;
-    };
-    const onPatterns = (res: PatternResult[]) => {
-      // Store pattern results for style scoring
-      setPatternResults(res);
-      
-      // merge results into modal items by id
+    // merge results into modal items by id (idempotent)
+    const mergeIntoModal = (res: PatternResult[]) =>
       setModalItems((prev) =>
         prev.map((it) => {
           const m = res.find((r: PatternResult) => r.id === it.id);
@@ -49,12 +64,14 @@ export default function App() {
                 pattern: m.pattern ?? "other",
                 confidence:
                   typeof m.confidence === "number" ? m.confidence : null,
-                error: null,
+                error: m.error ?? null,
               }
             : it;
         })
       );
-      // also annotate live labels if you want
+
+    // also annotate live labels if you want
+    const annotateSeg = (res: PatternResult[]) =>
       setSeg((s) =>
         s
           ? {
@@ -68,14 +85,33 @@ export default function App() {
             }
           : s
       );
+
+    // (the server also caches results for score_current)
+    const onPatterns = (res: PatternResult[]) => {
+      mergeIntoModal(res);
+      annotateSeg(res);
+    };
+    // streaming mode: one card fills in per finished VLM call
+    const onPatternResult = (res: PatternResult) => {
+      mergeIntoModal([res]);
+      annotateSeg([res]);
+    };
+    const onPatternsDone = (res: PatternResult[]) => mergeIntoModal(res);
+
+    const onCaptureHint = (hint: CaptureHint) => {
+      captureRef.current = hint;
     };
 
-    socket.on("segmentation", onSeg);
     socket.on("patterns", onPatterns);
+    socket.on("pattern_result", onPatternResult);
+    socket.on("patterns_done", onPatternsDone);
+    socket.on("capture_hint", onCaptureHint);
 
     return () => {
-      socket.off("segmentation", onSeg);
       socket.off("patterns", onPatterns);
+      socket.off("pattern_result", onPatternResult);
+      socket.off("patterns_done", onPatternsDone);
+      socket.off("capture_hint", onCaptureHint);
     };
   }, [socketRef]);
 
@@ -120,22 +156,25 @@ export default function App() {
 
       const vw = v.videoWidth,
         vh = v.videoHeight;
-      if (vw && vh && !inflight.current) {
-        const targetW = 640;
+      const { width, quality, maxFps } = captureRef.current;
+      const now = performance.now();
+      if (vw && vh && !inflight.current && now - lastSentAt.current >= 1000 / maxFps) {
+        const targetW = Math.min(width, vw);
         const scale = targetW / vw;
         const targetH = Math.round(vh * scale);
         canvas.width = targetW;
         canvas.height = targetH;
         ctx.drawImage(v, 0, 0, targetW, targetH);
-        const dataUrl = canvas.toDataURL("image/webp", 0.75);
+        const dataUrl = canvas.toDataURL("image/webp", quality);
         inflight.current = true;
-        socket.emit("frame", { dataUrl, srcW: vw, srcH: vh }); // 👈 send native size
+        lastSentAt.current = now;
+        sendFrame({ dataUrl, srcW: vw, srcH: vh }); // 👈 send native size
       }
       raf = requestAnimationFrame(tick);
     };
     raf = requestAnimationFrame(tick);
     return () => cancelAnimationFrame(raf);
-  }, [socketRef, status, isModalOpen, isScoreModalOpen]);
+  }, [socketRef, sendFrame, status, isModalOpen, isScoreModalOpen]);
 
   // measure render box
   useEffect(() => {
@@ -178,7 +217,8 @@ export default function App() {
     setIsModalOpen(true);
     socket.emit(
       "analyze_patterns",
-      crops.map(({ id, label, cropDataUrl }) => ({ id, label, cropDataUrl }))
+      crops.map(({ id, label, cropDataUrl }) => ({ id, label, cropDataUrl })),
+      { stream: true }
     );
   };
 
@@ -186,15 +226,12 @@ export default function App() {
     setIsModalOpen(false); // video + emission resumes via effects
   };
 
+  // One round trip: the server scores its latest segmented frame, reusing any
+  // pattern results from "Analyze Patterns" (not required)
   const openScoreModal = () => {
-    if (!seg || patternResults.length === 0) {
-      alert("Please analyze patterns first before scoring style.");
-      return;
-    }
-    
-    // Create outfit features from current segmentation and patterns
-    const features = createOutfitFeatures(seg, patternResults);
-    setOutfitFeatures(features);
+    const socket = socketRef.current;
+    if (!socket || !seg || seg.items.length === 0) return;
+    setScoreRequest(() => () => scoreCurrent(socket));
     setIsScoreModalOpen(true);
   };
 
@@ -265,18 +302,18 @@ export default function App() {
           </button>
           <button
             onClick={openScoreModal}
-            disabled={status !== "connected" || !seg || patternResults.length === 0}
+            disabled={status !== "connected" || !seg || seg.items.length === 0}
             style={{
               padding: "10px 14px",
               borderRadius: 10,
               border: "1px solid #444",
               background:
-                status === "connected" && seg && patternResults.length > 0
+                status === "connected" && seg && seg.items.length > 0
                   ? "#1a4d2e"
                   : "#333",
               color: "#fff",
               cursor:
-                status === "connected" && seg && patternResults.length > 0
+                status === "connected" && seg && seg.items.length > 0
                   ? "pointer"
                   : "not-allowed",
             }}
@@ -297,7 +334,7 @@ export default function App() {
       <StyleScoreModal
         open={isScoreModalOpen}
         onClose={closeScoreModal}
-        features={outfitFeatures}
+        request={scoreRequest}
       />
     </div>
   );
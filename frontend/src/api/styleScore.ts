@@ -2,7 +2,13 @@
  * API functions for style scoring
  */
 
+import type { Socket } from "socket.io-client";
 import type { OutfitFeatures, StyleScore } from "../types/styleScore";
+import type {
+  ClientToServerEvents,
+  ServerToClientEvents,
+  StyleScoreMessage,
+} from "../types/socket";
 
 const API_BASE_URL = "http://localhost:5000";
 
@@ -28,3 +34,40 @@ export async function scoreOutfit(
   return response.json();
 }
 
+
+const SCORE_CURRENT_TIMEOUT_MS = 10_000;
+
+/**
+ * Score the session's latest segmented frame over the socket ("score_current").
+ * The server extracts the features itself and reuses cached pattern results.
+ * The reply arrives through the event's acknowledgement, so concurrent requests
+ * each get their own; rejects on timeout or disconnect.
+ */
+export function scoreCurrent(
+  socket: Socket<ServerToClientEvents, ClientToServerEvents>,
+  outfitId?: string,
+  timeoutMs: number = SCORE_CURRENT_TIMEOUT_MS
+): Promise<StyleScore> {
+  return new Promise((resolve, reject) => {
+    let settled = false;
+    const settle = (fn: () => void) => {
+      if (settled) return;
+      settled = true;
+      socket.off("disconnect", onDisconnect);
+      fn();
+    };
+    const onDisconnect = () => settle(() => reject(new Error("Disconnected before the score arrived")));
+    if (!socket.connected) {
+      reject(new Error("Not connected"));
+      return;
+    }
+    socket.on("disconnect", onDisconnect);
+    socket.timeout(timeoutMs).emit("score_current", { outfitId }, (err: Error | null, res: StyleScoreMessage) =>
+      settle(() => {
+        if (err) reject(new Error(`No score within ${timeoutMs / 1000}s`));
+        else if (res.error !== undefined) reject(new Error(res.error));
+        else resolve(res);
+      })
+    );
+  });
+}
@@ -1,10 +1,13 @@
 import React, { memo } from "react";
+import type { RleMask } from "../types/socket";
+import { maskDataUrl } from "../utils/rle";
 
 export type BBox = [number, number, number, number];
 export type OverlayItem = {
   id: string;
   bbox: BBox; // [x, y, w, h] in NATURAL coords (seg.width/height)
   label?: string;
+  mask?: RleMask; // drawn stretched over bbox when present
 };
 
 type Props = {
@@ -16,6 +19,7 @@ type Props = {
   stroke?: string; // hex or css color
   strokeWidth?: number;
   showLabels?: boolean;
+  maskColor?: [number, number, number, number]; // RGBA fill for item masks
   className?: string; // optional extra classes
   style?: React.CSSProperties;
 };
@@ -29,6 +33,7 @@ function _Overlay({
   stroke = "white",
   strokeWidth = 2,
   showLabels = true,
+  maskColor = [0, 200, 0, 90],
   className,
   style,
 }: Props) {
@@ -58,6 +63,16 @@ function _Overlay({
           rh = h * sy;
         return (
           <g key={it.id}>
+            {it.mask && (
+              <image
+                href={maskDataUrl(it.mask, maskColor)}
+                x={rx}
+                y={ry}
+                width={rw}
+                height={rh}
+                preserveAspectRatio="none"
+              />
+            )}
             <rect
               x={rx}
               y={ry}
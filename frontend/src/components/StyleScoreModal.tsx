@@ -5,25 +5,23 @@ import type { StyleScore } from "../types/styleScore";
 export default function StyleScoreModal({
   open,
   onClose,
-  features,
+  request,
 }: {
   open: boolean;
   onClose: () => void;
-  features: any; // OutfitFeatures or null
+  request: (() => Promise<StyleScore>) | null; // e.g. scoreCurrent(socket)
 }) {
   const [score, setScore] = useState<StyleScore | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
-    if (open && features) {
+    if (open && request) {
       setLoading(true);
       setError(null);
       setScore(null);
 
-      // Import dynamically to avoid issues
-      import("../api/styleScore")
-        .then(({ scoreOutfit }) => scoreOutfit(features))
+      request()
         .then((result) => {
           setScore(result);
           setLoading(false);
@@ -38,7 +36,7 @@ export default function StyleScoreModal({
       setError(null);
       setLoading(false);
     }
-  }, [open, features]);
+  }, [open, request]);
 
   const getScoreColor = (score: number) => {
     if (score >= 80) return "#4ade80"; // green
@@ -54,9 +52,9 @@ export default function StyleScoreModal({
 
   return (
     <Modal open={open} title="Style Score" onClose={onClose}>
-      {!features ? (
+      {!request ? (
         <div style={{ color: "#aaa", textAlign: "center", padding: 20 }}>
-          No outfit data available. Please analyze patterns first.
+          No outfit data available yet.
         </div>
       ) : loading ? (
         <div
@@ -117,6 +115,11 @@ export default function StyleScoreModal({
               {score.styleScore.toFixed(1)}
             </div>
             <div style={{ color: "#aaa", fontSize: 14 }}>Style Score / 100</div>
+            {score.percentile != null && (
+              <div style={{ color: "#ccc", fontSize: 13, marginTop: 4 }}>
+                Higher than {score.percentile.toFixed(0)}% of outfits
+              </div>
+            )}
             <div style={{ color: "#666", fontSize: 12, marginTop: 4 }}>
               v{score.version}
             </div>
@@ -1,9 +1,14 @@
-import { useEffect, useRef, useState } from "react";
+import { useCallback, useEffect, useRef, useState } from "react";
 import { io, Socket } from "socket.io-client";
 import type {
   ClientToServerEvents,
+  FramePayload,
+  SegmentationDeltaMessage,
+  SegmentationPayload,
+  SegProtocolOptions,
   ServerToClientEvents,
 } from "../types/socket";
+import { SegDeltaDecoder } from "../utils/segDelta";
 
 export type ConnStatus = "connecting" | "connected" | "disconnected";
 
@@ -12,12 +17,18 @@ type UseSocketOptions = {
   path?: string;
   // If you want auth tokens later, pass them in here
   auth?: Record<string, unknown>;
+  // Opt-in compact/delta segmentation protocol (sent on every (re)connect)
+  segProtocol?: SegProtocolOptions;
+  // Called with the full segmentation payload, whichever protocol is active
+  onSegmentation?: (seg: SegmentationPayload) => void;
 };
 
 export function useSocket({
   url = "http://localhost:5000",
   path,
   auth,
+  segProtocol,
+  onSegmentation,
 }: UseSocketOptions = {}) {
   const [status, setStatus] = useState<ConnStatus>("connecting");
   const socketRef = useRef<Socket<
@@ -25,6 +36,13 @@ export function useSocket({
     ClientToServerEvents
   > | null>(null);
 
+  // refs so inline options/callbacks don't force a reconnect on every render
+  const segProtocolRef = useRef(segProtocol);
+  const onSegRef = useRef(onSegmentation);
+  segProtocolRef.current = segProtocol;
+  onSegRef.current = onSegmentation;
+  const deltaRef = useRef(new SegDeltaDecoder());
+
   useEffect(() => {
     const socket: Socket<ServerToClientEvents, ClientToServerEvents> = io(url, {
       path,
@@ -40,15 +58,30 @@ export function useSocket({
 
     socketRef.current = socket;
 
-    const onConnect = () => setStatus("connected");
+    const onConnect = () => {
+      setStatus("connected");
+      deltaRef.current.reset();
+      const proto = segProtocolRef.current;
+      if (proto && (proto.mode !== "full" || proto.masks)) socket.emit("seg_protocol", proto);
+    };
     const onDisconnect = () => setStatus("disconnected");
     const onConnectError = () => setStatus("disconnected");
     const onReconnectAttempt = () => setStatus("connecting");
     const onReconnect = () => setStatus("connected");
 
+    const onSeg = (data: SegmentationPayload) => onSegRef.current?.(data);
+    const onSegDelta = (data: SegmentationDeltaMessage | ArrayBuffer) => {
+      const seg = deltaRef.current.apply(data);
+      // unknown base: keep the frame loop going; the next ack (null)
+      // makes the server send a keyframe
+      onSegRef.current?.(seg ?? { width: 0, height: 0, items: [] });
+    };
+
     socket.on("connect", onConnect);
     socket.on("disconnect", onDisconnect);
     socket.on("connect_error", onConnectError);
+    socket.on("segmentation", onSeg);
+    socket.on("segmentation_delta", onSegDelta);
     socket.io.on("reconnect_attempt", onReconnectAttempt);
     socket.io.on("reconnect", onReconnect);
 
@@ -56,11 +89,18 @@ export function useSocket({
       socket.off("connect", onConnect);
       socket.off("disconnect", onDisconnect);
       socket.off("connect_error", onConnectError);
+      socket.off("segmentation", onSeg);
+      socket.off("segmentation_delta", onSegDelta);
       socket.io.off("reconnect_attempt", onReconnectAttempt);
       socket.io.off("reconnect", onReconnect);
       socket.disconnect();
     };
   }, [url, path, auth]);
 
-  return { socket: socketRef, status };
+  // Emits a frame, attaching the delta-protocol ack
+  const sendFrame = useCallback((payload: Omit<FramePayload, "ack">) => {
+    socketRef.current?.emit("frame", { ...payload, ack: deltaRef.current.ack });
+  }, []);
+
+  return { socket: socketRef, status, sendFrame };
 }
@@ -1,11 +1,19 @@
 import { DefaultEventsMap } from "socket.io/dist/typed-events";
+import type { OutfitFeatures, StyleScore } from "./styleScore";
 
 // Payloads from your backend
+// COCO-style RLE over the item's bbox (see utils/rle.ts)
+export interface RleMask {
+  size: [number, number]; // [height, width] of the mask crop
+  counts: string;
+}
+
 export interface SegmentationItem {
   id: string;
   bbox: [number, number, number, number];
   label: string;
   score?: number;
+  mask?: RleMask; // only when seg_protocol was sent with masks: true
 }
 
 export interface SegmentationPayload {
@@ -13,6 +21,38 @@ export interface SegmentationPayload {
   height: number;
   items: SegmentationItem[];
   error?: string;
+  // server degradation level this frame was processed at ("full", "no_blur", ...)
+  quality?: string;
+  // detector input size used for this frame
+  imgsz?: number;
+}
+
+// Compact row: [id, x, y, w, h, label, score, mask?]
+export type SegmentationRow =
+  | [string, number, number, number, number, string, number]
+  | [string, number, number, number, number, string, number, RleMask];
+
+export type SegmentationDeltaMessage =
+  | { seq: number; key: true; width: number; height: number; items: SegmentationRow[]; quality?: string; imgsz?: number }
+  | {
+      seq: number;
+      key: false;
+      base: number;
+      width: number;
+      height: number;
+      add: SegmentationRow[];
+      upd: SegmentationRow[];
+      del: string[];
+      quality?: string;
+      imgsz?: number;
+    };
+
+export interface SegProtocolOptions {
+  mode: "full" | "delta";
+  encoding?: "arrays" | "msgpack";
+  tolerancePx?: number;
+  keyframeEvery?: number;
+  masks?: boolean; // per-item RLE masks in segmentation payloads
 }
 
 export interface PatternResult {
@@ -20,6 +60,13 @@ export interface PatternResult {
   label: string;
   pattern: string;
   confidence?: number;
+  error?: string;
+  fallback?: "cache"; // budget ran out; last result for the same crop
+}
+
+export interface AnalyzeOptions {
+  stream?: boolean; // emit pattern_result per garment, then patterns_done
+  budgetMs?: number; // latency budget for the whole batch (server default VLM_BUDGET_MS)
 }
 
 export interface PatternRequest {
@@ -32,15 +79,40 @@ export interface FramePayload {
   dataUrl: string;
   srcW: number;
   srcH: number;
+  ack?: number | null; // last applied segmentation_delta seq (delta mode)
+}
+
+// Server-recommended capture settings (backpressure)
+export interface CaptureHint {
+  width: number; // capture width in px (height follows the video aspect)
+  quality: number; // WebP quality 0..1
+  maxFps: number;
 }
 
+// One-shot server-side scoring of the latest segmented frame
+export interface ScoreCurrentOptions {
+  outfitId?: string;
+}
+
+export type StyleScoreMessage =
+  | (StyleScore & { features: OutfitFeatures; error?: undefined })
+  | { error: string };
+
 // Socket.IO typing
 export interface ServerToClientEvents extends DefaultEventsMap {
   segmentation: (data: SegmentationPayload) => void;
   patterns: (results: PatternResult[]) => void;
+  pattern_result: (result: PatternResult) => void; // streaming mode, one per garment
+  patterns_done: (results: PatternResult[]) => void; // streaming mode, all results in input order
+  segmentation_delta: (data: SegmentationDeltaMessage | ArrayBuffer) => void;
+  seg_protocol: (ack: { mode: "full" | "delta"; encoding?: "arrays" | "msgpack"; masks?: boolean }) => void;
+  capture_hint: (hint: CaptureHint) => void;
 }
 
 export interface ClientToServerEvents extends DefaultEventsMap {
   frame: (dataUrl: FramePayload) => void;
-  analyze_patterns: (items: PatternRequest[]) => void;
+  analyze_patterns: (items: PatternRequest[], opts?: AnalyzeOptions) => void;
+  seg_protocol: (opts: SegProtocolOptions) => void;
+  // the reply comes back through the acknowledgement
+  score_current: (opts: ScoreCurrentOptions, ack: (res: StyleScoreMessage) => void) => void;
 }
@@ -84,5 +84,6 @@ export interface StyleScore {
   subscores: StyleScoreSubscores;
   explanations: string[];
   debug?: Record<string, unknown> | null;
+  percentile?: number | null; // 0..100 among past scores for this version (server-side)
 }
 
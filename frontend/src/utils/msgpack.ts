@@ -0,0 +1,135 @@
+/**
+ * Minimal MessagePack decoder.
+ *
+ * Covers the subset the backend emits (nil, bool, ints, floats, str, bin,
+ * array, map) so the compact segmentation protocol needs no extra dependency.
+ */
+
+const textDecoder = new TextDecoder();
+
+export function decodeMsgpack(input: ArrayBuffer | Uint8Array): unknown {
+  const bytes = input instanceof Uint8Array ? input : new Uint8Array(input);
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  let pos = 0;
+
+  const str = (n: number) => {
+    const s = textDecoder.decode(bytes.subarray(pos, pos + n));
+    pos += n;
+    return s;
+  };
+  const bin = (n: number) => {
+    const b = bytes.slice(pos, pos + n);
+    pos += n;
+    return b;
+  };
+  const arr = (n: number): unknown[] => {
+    const out = new Array(n);
+    for (let i = 0; i < n; i++) out[i] = read();
+    return out;
+  };
+  const map = (n: number): Record<string, unknown> => {
+    const out: Record<string, unknown> = {};
+    for (let i = 0; i < n; i++) {
+      const k = read();
+      out[String(k)] = read();
+    }
+    return out;
+  };
+
+  function read(): unknown {
+    const t = view.getUint8(pos++);
+    if (t <= 0x7f) return t; // positive fixint
+    if (t >= 0xe0) return t - 0x100; // negative fixint
+    if ((t & 0xe0) === 0xa0) return str(t & 0x1f); // fixstr
+    if ((t & 0xf0) === 0x90) return arr(t & 0x0f); // fixarray
+    if ((t & 0xf0) === 0x80) return map(t & 0x0f); // fixmap
+
+    let v: number;
+    switch (t) {
+      case 0xc0:
+        return null;
+      case 0xc2:
+        return false;
+      case 0xc3:
+        return true;
+      case 0xc4:
+        v = view.getUint8(pos);
+        pos += 1;
+        return bin(v);
+      case 0xc5:
+        v = view.getUint16(pos);
+        pos += 2;
+        return bin(v);
+      case 0xc6:
+        v = view.getUint32(pos);
+        pos += 4;
+        return bin(v);
+      case 0xca:
+        v = view.getFloat32(pos);
+        pos += 4;
+        return v;
+      case 0xcb:
+        v = view.getFloat64(pos);
+        pos += 8;
+        return v;
+      case 0xcc:
+        return view.getUint8(pos++);
+      case 0xcd:
+        v = view.getUint16(pos);
+        pos += 2;
+        return v;
+      case 0xce:
+        v = view.getUint32(pos);
+        pos += 4;
+        return v;
+      case 0xcf:
+        v = Number(view.getBigUint64(pos));
+        pos += 8;
+        return v;
+      case 0xd0:
+        return view.getInt8(pos++);
+      case 0xd1:
+        v = view.getInt16(pos);
+        pos += 2;
+        return v;
+      case 0xd2:
+        v = view.getInt32(pos);
+        pos += 4;
+        return v;
+      case 0xd3:
+        v = Number(view.getBigInt64(pos));
+        pos += 8;
+        return v;
+      case 0xd9:
+        return str(view.getUint8(pos++));
+      case 0xda:
+        v = view.getUint16(pos);
+        pos += 2;
+        return str(v);
+      case 0xdb:
+        v = view.getUint32(pos);
+        pos += 4;
+        return str(v);
+      case 0xdc:
+        v = view.getUint16(pos);
+        pos += 2;
+        return arr(v);
+      case 0xdd:
+        v = view.getUint32(pos);
+        pos += 4;
+        return arr(v);
+      case 0xde:
+        v = view.getUint16(pos);
+        pos += 2;
+        return map(v);
+      case 0xdf:
+        v = view.getUint32(pos);
+        pos += 4;
+        return map(v);
+      default:
+        throw new Error(`msgpack: unsupported type 0x${t.toString(16)}`);
+    }
+  }
+
+  return read();
+}
@@ -0,0 +1,91 @@
+/**
+ * Decoder for COCO-style RLE garment masks
+ * (see backend/preprocess/rle.py for the encoding).
+ *
+ * A mask covers its item's bbox: `size` is the [height, width] of the
+ * (downsampled) crop, counts run column-major starting with zeros.
+ */
+
+import type { RleMask } from "../types/socket";
+
+/** Compressed counts string → run lengths (pycocotools `rleFrString`). */
+export function stringToCounts(s: string): number[] {
+  const counts: number[] = [];
+  let p = 0;
+  while (p < s.length) {
+    let x = 0;
+    let k = 0;
+    let more = true;
+    while (more) {
+      const c = s.charCodeAt(p) - 48;
+      x |= (c & 0x1f) << (5 * k);
+      more = (c & 0x20) !== 0;
+      p++;
+      k++;
+      if (!more && c & 0x10) x |= -1 << (5 * k);
+    }
+    if (counts.length > 2) x += counts[counts.length - 2];
+    counts.push(x);
+  }
+  return counts;
+}
+
+/** RLE → row-major Uint8Array (1 = garment) of length height * width. */
+export function decodeRle(rle: RleMask): Uint8Array {
+  const [h, w] = rle.size;
+  const out = new Uint8Array(h * w);
+  const counts = stringToCounts(rle.counts);
+  let i = 0; // column-major pixel index
+  for (let r = 0; r < counts.length; r++) {
+    const n = counts[r];
+    if (r % 2 === 1) {
+      for (let j = i; j < i + n; j++) {
+        const col = (j / h) | 0;
+        out[(j - col * h) * w + col] = 1;
+      }
+    }
+    i += n;
+  }
+  return out;
+}
+
+/** Pixels set in the mask, without decoding it. */
+export function rleArea(rle: RleMask): number {
+  const counts = stringToCounts(rle.counts);
+  let area = 0;
+  for (let r = 1; r < counts.length; r += 2) area += counts[r];
+  return area;
+}
+
+// rendered masks by "h,w,color,counts": boxes that barely move keep the same mask string
+const cache = new Map<string, string>();
+const CACHE_MAX = 64;
+
+/** Mask as a PNG data URL, `color` where set and transparent elsewhere (for <image> overlays). */
+export function maskDataUrl(rle: RleMask, color: [number, number, number, number]): string {
+  const key = `${rle.size[0]},${rle.size[1]},${color.join(",")},${rle.counts}`;
+  const hit = cache.get(key);
+  if (hit !== undefined) return hit;
+
+  const [h, w] = rle.size;
+  const canvas = document.createElement("canvas");
+  canvas.width = w;
+  canvas.height = h;
+  const ctx = canvas.getContext("2d");
+  if (!ctx) return "";
+  const img = ctx.createImageData(w, h);
+  const mask = decodeRle(rle);
+  for (let i = 0; i < mask.length; i++) {
+    if (!mask[i]) continue;
+    img.data[i * 4] = color[0];
+    img.data[i * 4 + 1] = color[1];
+    img.data[i * 4 + 2] = color[2];
+    img.data[i * 4 + 3] = color[3];
+  }
+  ctx.putImageData(img, 0, 0);
+  const url = canvas.toDataURL("image/png");
+
+  if (cache.size >= CACHE_MAX) cache.delete(cache.keys().next().value as string);
+  cache.set(key, url);
+  return url;
+}
@@ -0,0 +1,74 @@
+/**
+ * Client side of the compact/delta segmentation protocol
+ * (see backend/services/seg_delta.py for the wire format).
+ */
+
+import type {
+  SegmentationDeltaMessage,
+  SegmentationItem,
+  SegmentationPayload,
+  SegmentationRow,
+} from "../types/socket";
+import { decodeMsgpack } from "./msgpack";
+
+const HISTORY = 8;
+
+function rowToItem(r: SegmentationRow): SegmentationItem {
+  const [id, x, y, w, h, label, score] = r;
+  const item: SegmentationItem = { id, bbox: [x, y, w, h], label, score };
+  if (r.length > 7) item.mask = r[7];
+  return item;
+}
+
+export class SegDeltaDecoder {
+  // seq -> item set after applying that seq (deltas may reference any recent base)
+  private states = new Map<number, SegmentationPayload>();
+  private lastSeq: number | null = null;
+
+  /** Seq to acknowledge on the next frame; null asks the server for a keyframe. */
+  get ack(): number | null {
+    return this.lastSeq;
+  }
+
+  reset() {
+    this.states.clear();
+    this.lastSeq = null;
+  }
+
+  /**
+   * Apply a message (object or msgpack bytes). Returns the reconstructed
+   * payload. When the delta's base is unknown the last known state (or null)
+   * is returned and the next ack requests a keyframe.
+   */
+  apply(raw: SegmentationDeltaMessage | ArrayBuffer | Uint8Array): SegmentationPayload | null {
+    const msg = (
+      raw instanceof ArrayBuffer || raw instanceof Uint8Array ? decodeMsgpack(raw) : raw
+    ) as SegmentationDeltaMessage;
+
+    let next: SegmentationPayload;
+    if (msg.key) {
+      next = { width: msg.width, height: msg.height, items: msg.items.map(rowToItem) };
+    } else {
+      const base = this.states.get(msg.base);
+      if (!base) {
+        const latest = this.lastSeq !== null ? this.states.get(this.lastSeq) : undefined;
+        this.lastSeq = null;
+        return latest ?? null;
+      }
+      const byId = new Map(base.items.map((it) => [it.id, it]));
+      for (const id of msg.del) byId.delete(id);
+      for (const r of msg.upd) byId.set(r[0], rowToItem(r));
+      for (const r of msg.add) byId.set(r[0], rowToItem(r));
+      next = { width: msg.width, height: msg.height, items: [...byId.values()] };
+    }
+    if (msg.quality !== undefined) next.quality = msg.quality;
+    if (msg.imgsz !== undefined) next.imgsz = msg.imgsz;
+
+    this.states.set(msg.seq, next);
+    for (const s of this.states.keys()) {
+      if (s <= msg.seq - HISTORY) this.states.delete(s);
+    }
+    this.lastSeq = msg.seq;
+    return next;
+  }
+}